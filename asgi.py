@@ -0,0 +1,23 @@
+"""
+This script initializes the ASGI application.
+
+It loads environment variables from a .env file and creates the ASGI application instance with the
+specified configuration, to be served by an ASGI server.
+
+Functions:
+    create_asgi_app(config_name): Factory function to create an ASGI application instance.
+
+Environment Variables:
+    FLASK_CONFIG: The configuration name to be used for the Flask application.
+
+Usage:
+    Serve the application with an ASGI server, e.g. ``uvicorn asgi:app``. Ensure that the .env file
+    contains the necessary environment variables, including FLASK_CONFIG.
+"""
+
+from dotenv import load_dotenv
+from src.asgi import create_asgi_app
+import os
+load_dotenv()
+
+app = create_asgi_app(os.environ.get('FLASK_CONFIG'))
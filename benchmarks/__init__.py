@@ -0,0 +1,13 @@
+"""
+This package contains the benchmark suite for the repository and service hot paths.
+
+Modules:
+    seed: Seeds a database with a reproducible set of orders.
+    cases: Defines the benchmarked operations.
+    runner: Runs the benchmarks against seeded databases and writes the results as JSON.
+    compare: Compares two result files and reports regressions.
+
+Usage:
+    python -m benchmarks --sizes 10000,100000 --output benchmark-results.json
+    python -m benchmarks.compare baseline.json benchmark-results.json
+"""
@@ -0,0 +1,319 @@
+"""
+This module defines the benchmarked operations of the repository and the services.
+
+Classes:
+    BenchmarkContext: The database size and working directory a benchmark runs with.
+    Benchmark: A named operation with optional untimed setup and teardown steps.
+
+Variables:
+    BENCHMARKS (list): All benchmarks, in the order they are run.
+
+Usage:
+    Each benchmark runs inside an application context bound to a seeded database. Operations that
+    change orders either roll back or restore the seeded data in their teardown step, so the results
+    of later benchmarks do not depend on the earlier ones.
+"""
+
+import os
+import random
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import select, update
+
+from src.database.db import get_session
+from src.database.models import Order
+from src.routes.services import (hdf5_service, import_pipeline, order_statistic_service, report_service, repository,
+                                 rollup_service, xml_service)
+from src.routes.services.order_cache import get_order_cache
+from src.routes.services.rollup_service import apply_rollup_deltas
+from src.routes.services.status_count_service import apply_status_deltas
+from src.schemas.orders import OrderSchema
+
+# Number of orders touched by the benchmarks working on a sample of orders
+SAMPLE_SIZE = 1000
+PAGE_SIZE = 100
+
+
+class BenchmarkContext:
+    """
+    The database size and working directory a benchmark runs with.
+
+    Attributes:
+        size (int): The number of seeded orders.
+        work_dir (str): A directory for the files written and read by the benchmarks.
+        sample_ids (List[int]): A reproducible random sample of existing order IDs.
+    """
+
+    def __init__(self, size: int, work_dir: str, seed: int = 0):
+        self.size = size
+        self.work_dir = work_dir
+        self.sample_ids = random.Random(seed).sample(range(1, size + 1), min(SAMPLE_SIZE, size))
+
+    def path(self, name: str) -> str:
+        """
+        Returns the path of a file in the working directory.
+
+        Args:
+            name (str): The file name.
+
+        Returns:
+            str: The path of the file.
+        """
+        return os.path.join(self.work_dir, name)
+
+
+class Benchmark:
+    """
+    A named operation with optional untimed setup and teardown steps.
+
+    Attributes:
+        name (str): The name of the benchmark, '<module>.<operation>'.
+        run (Callable[[BenchmarkContext, Any], int]): The timed operation; it receives the context and the
+                                                      value returned by setup, and returns the number of
+                                                      orders it processed.
+        setup (Optional[Callable[[BenchmarkContext], Any]]): Prepares the input of the operation.
+        teardown (Optional[Callable[[BenchmarkContext, Any], None]]): Restores the seeded data.
+    """
+
+    def __init__(self, name: str, run: Callable[[BenchmarkContext, Any], int],
+                 setup: Optional[Callable[[BenchmarkContext], Any]] = None,
+                 teardown: Optional[Callable[[BenchmarkContext, Any], None]] = None):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.teardown = teardown
+
+
+def _count(iterable) -> int:
+    """
+    Consumes an iterable and returns the number of items.
+
+    Args:
+        iterable: The iterable to consume.
+
+    Returns:
+        int: The number of items.
+    """
+    return sum(1 for _ in iterable)
+
+
+def _rollback(context: BenchmarkContext, state: Any) -> None:
+    """
+    Rolls back the changes a benchmark left uncommitted.
+
+    Args:
+        context (BenchmarkContext): The benchmark context.
+        state (Any): The value returned by the setup step.
+    """
+    get_session().rollback()
+
+
+def _new_orders(context: BenchmarkContext) -> List[OrderSchema]:
+    """
+    Builds new orders for the insert benchmarks.
+
+    Args:
+        context (BenchmarkContext): The benchmark context.
+
+    Returns:
+        List[OrderSchema]: The orders.
+    """
+    return [OrderSchema(name=f'New order {i}', status='New') for i in range(SAMPLE_SIZE)]
+
+
+def _sample_rows(context: BenchmarkContext) -> List[Dict[str, Any]]:
+    """
+    Reads the sampled orders as dictionaries, for the upsert benchmark.
+
+    Args:
+        context (BenchmarkContext): The benchmark context.
+
+    Returns:
+        List[Dict[str, Any]]: The sampled orders.
+    """
+    rows = get_session().execute(select(*repository.order_columns()).where(Order.id.in_(context.sample_ids)))
+    return [row._asdict() for row in rows]
+
+
+def _sample_statuses(context: BenchmarkContext) -> Dict[int, str]:
+    """
+    Reads the statuses of the sampled orders, so the status update benchmark can restore them.
+
+    Args:
+        context (BenchmarkContext): The benchmark context.
+
+    Returns:
+        Dict[int, str]: The status of each sampled order, by order ID.
+    """
+    return dict(get_session().execute(select(Order.id, Order.status).where(Order.id.in_(context.sample_ids))).all())
+
+
+def _restore_statuses(context: BenchmarkContext, statuses: Dict[int, str]) -> None:
+    """
+    Restores the statuses of the sampled orders and their status and rollup counters.
+
+    Args:
+        context (BenchmarkContext): The benchmark context.
+        statuses (Dict[int, str]): The original status of each sampled order, by order ID.
+    """
+    db = get_session()
+    current = {id: (creation_date, status) for id, creation_date, status
+               in db.execute(select(Order.id, Order.creation_date, Order.status).where(Order.id.in_(statuses)))}
+    deltas = {}
+    rollup_deltas = {}
+    for id, status in statuses.items():
+        creation_date, current_status = current[id]
+        deltas[current_status] = deltas.get(current_status, 0) - 1
+        deltas[status] = deltas.get(status, 0) + 1
+        rollup_deltas[creation_date, current_status] = rollup_deltas.get((creation_date, current_status), 0) - 1
+        rollup_deltas[creation_date, status] = rollup_deltas.get((creation_date, status), 0) + 1
+    apply_status_deltas(db, deltas)
+    apply_rollup_deltas(db, rollup_deltas)
+    for status in set(statuses.values()):
+        ids = [id for id, original in statuses.items() if original == status]
+        db.execute(update(Order).where(Order.id.in_(ids)).values(status=status),
+                   execution_options={'synchronize_session': False})
+    db.commit()
+
+
+def _clear_order_cache(context: BenchmarkContext) -> None:
+    """
+    Empties the order cache, so every lookup of the cache benchmark starts as a miss.
+
+    Args:
+        context (BenchmarkContext): The benchmark context.
+    """
+    get_order_cache().clear()
+
+
+def _write_hdf5_input(context: BenchmarkContext) -> str:
+    """
+    Exports the seeded orders to an HDF5 file for the import benchmark.
+
+    Args:
+        context (BenchmarkContext): The benchmark context.
+
+    Returns:
+        str: The path of the HDF5 file.
+    """
+    path = context.path('import.hdf5')
+    hdf5_service.write_orders_hdf5(path)
+    return path
+
+
+def _write_xml_input(context: BenchmarkContext) -> str:
+    """
+    Exports the seeded orders to an XML file for the import benchmark.
+
+    Args:
+        context (BenchmarkContext): The benchmark context.
+
+    Returns:
+        str: The path of the XML file.
+    """
+    path = context.path('import.xml')
+    with open(path, 'wb') as f:
+        xml_service.write_orders_xml(f)
+    return path
+
+
+def _write_xml(context: BenchmarkContext, state: Any) -> int:
+    """
+    Exports all orders to an XML file.
+
+    Args:
+        context (BenchmarkContext): The benchmark context.
+        state (Any): Unused.
+
+    Returns:
+        int: The number of exported orders.
+    """
+    with open(context.path('orders.xml'), 'wb') as f:
+        return xml_service.write_orders_xml(f)
+
+
+def _get_orders_by_id(context: BenchmarkContext, state: Any) -> int:
+    """
+    Looks up each sampled order by its ID, in a fresh session.
+
+    Args:
+        context (BenchmarkContext): The benchmark context.
+        state (Any): Unused.
+
+    Returns:
+        int: The number of looked up orders.
+    """
+    for id in context.sample_ids:
+        repository.get_order(id)
+    return len(context.sample_ids)
+
+
+def _get_order_dicts(context: BenchmarkContext, state: Any) -> int:
+    """
+    Looks up each sampled order twice through the order cache, a miss followed by a hit.
+
+    Args:
+        context (BenchmarkContext): The benchmark context.
+        state (Any): Unused.
+
+    Returns:
+        int: The number of lookups.
+    """
+    for _ in range(2):
+        for id in context.sample_ids:
+            repository.get_order_dict(id)
+    return 2 * len(context.sample_ids)
+
+
+BENCHMARKS = [
+    Benchmark('repository.get_orders',
+              lambda context, state: len(repository.get_orders(limit=PAGE_SIZE, after_id=context.size // 2))),
+    Benchmark('repository.get_orders_filtered',
+              lambda context, state: len(repository.get_orders(
+                  limit=PAGE_SIZE, sort='-creation_date', statuses=['New'], date_from=datetime(2024, 1, 1)))),
+    Benchmark('repository.get_order_rows',
+              lambda context, state: len(repository.get_order_rows(('id', 'status'), limit=SAMPLE_SIZE))),
+    Benchmark('repository.iter_orders', lambda context, state: _count(repository.iter_orders())),
+    Benchmark('repository.iter_order_rows',
+              lambda context, state: _count(repository.iter_order_rows(('id', 'status')))),
+    Benchmark('repository.get_order', _get_orders_by_id),
+    Benchmark('repository.get_order_dict', _get_order_dicts, setup=_clear_order_cache),
+    Benchmark('repository.add_orders', lambda context, orders: len(repository.add_orders(get_session(), orders)),
+              setup=_new_orders, teardown=_rollback),
+    Benchmark('repository.update_status',
+              lambda context, state: repository.update_status(context.sample_ids, 'In Progress',
+                                                              return_orders=False)['updated_count'],
+              setup=_sample_statuses, teardown=_restore_statuses),
+    Benchmark('repository.upsert_orders',
+              lambda context, rows: sum(repository.upsert_orders(get_session(), rows).values()),
+              setup=_sample_rows, teardown=_rollback),
+    Benchmark('hdf5_service.write_orders_hdf5',
+              lambda context, state: hdf5_service.write_orders_hdf5(context.path('orders.hdf5'))),
+    Benchmark('hdf5_service.import_orders_from_hdf5',
+              lambda context, path: sum(hdf5_service.import_orders_from_hdf5(path).values()),
+              setup=_write_hdf5_input),
+    Benchmark('xml_service.write_orders_xml', _write_xml),
+    Benchmark('xml_service.import_orders_from_xml',
+              lambda context, path: sum(xml_service.import_orders_from_xml(path).values()),
+              setup=_write_xml_input),
+    Benchmark('import_pipeline.import_orders_from_hdf5_pipeline',
+              lambda context, path: sum(import_pipeline.import_orders_from_hdf5_pipeline(path).values()),
+              setup=_write_hdf5_input),
+    Benchmark('import_pipeline.import_orders_from_xml_pipeline',
+              lambda context, path: sum(import_pipeline.import_orders_from_xml_pipeline(path).values()),
+              setup=_write_xml_input),
+    Benchmark('report_service.write_orders_xlsx',
+              lambda context, state: report_service.write_orders_xlsx(context.path('orders_report.xlsx'))),
+    Benchmark('order_statistic_service.get_order_statistics',
+              lambda context, state: len(order_statistic_service.get_order_statistics())),
+    Benchmark('order_statistic_service.get_order_statistics_by_period',
+              lambda context, state: len(order_statistic_service.get_order_statistics_by_period('month'))),
+    Benchmark('rollup_service.get_order_timeseries_day',
+              lambda context, state: len(rollup_service.get_order_timeseries('day'))),
+    Benchmark('rollup_service.get_order_timeseries_hour_range',
+              lambda context, state: len(rollup_service.get_order_timeseries(
+                  'hour', datetime(2024, 6, 1), datetime(2024, 7, 1)))),
+    Benchmark('order_statistic_service.get_creation_date_range_by_status',
+              lambda context, state: len(order_statistic_service.get_creation_date_range_by_status())),
+]
@@ -0,0 +1,111 @@
+"""
+This module compares two benchmark result files and reports regressions.
+
+A benchmark regresses if its median wall time grew by more than --threshold (a fraction, 0.2 by default),
+if it executes more SQL statements, or if its peak memory grew by more than --memory-threshold.
+The exit status is 1 if any benchmark regressed, so the comparison can gate a CI job.
+
+Functions:
+    compare(baseline, current, threshold, memory_threshold): Compares two results documents.
+    main(argv): Command line entry point, see ``python -m benchmarks.compare --help``.
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+
+def _by_key(document: Dict[str, Any]) -> Dict[tuple, Dict[str, Any]]:
+    """
+    Indexes the results of a document by size and benchmark name.
+
+    Args:
+        document (Dict[str, Any]): The results document.
+
+    Returns:
+        Dict[tuple, Dict[str, Any]]: The results, by (size, benchmark).
+    """
+    return {(result['size'], result['benchmark']): result for result in document['results']}
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.2,
+            memory_threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    Compares the results of the benchmarks present in both documents.
+
+    Args:
+        baseline (Dict[str, Any]): The results document to compare against.
+        current (Dict[str, Any]): The new results document.
+        threshold (float): The relative growth of the median wall time that counts as a regression.
+                           Defaults to 0.2.
+        memory_threshold (float): The relative growth of the peak memory that counts as a regression.
+                                  Defaults to 0.2.
+
+    Returns:
+        List[Dict[str, Any]]: One comparison per benchmark with the 'size', 'benchmark', 'time_ratio',
+        'queries' before and after, 'memory_ratio' and the list of 'regressions'.
+    """
+    baseline_results = _by_key(baseline)
+    comparisons = []
+    for key, result in _by_key(current).items():
+        before = baseline_results.get(key)
+        if before is None:
+            continue
+        time_ratio = result['wall_time']['median'] / max(before['wall_time']['median'], 1e-9)
+        memory_ratio = result['peak_memory_bytes'] / max(before['peak_memory_bytes'], 1)
+        regressions = []
+        if time_ratio > 1 + threshold:
+            regressions.append('time')
+        if result['queries'] > before['queries']:
+            regressions.append('queries')
+        if memory_ratio > 1 + memory_threshold:
+            regressions.append('memory')
+        comparisons.append({
+            'size': key[0],
+            'benchmark': key[1],
+            'time_ratio': time_ratio,
+            'queries': (before['queries'], result['queries']),
+            'memory_ratio': memory_ratio,
+            'regressions': regressions
+        })
+    return comparisons
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Compares two benchmark result files from the command line.
+
+    Args:
+        argv (Optional[List[str]]): The command line arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: 1 if any benchmark regressed, else 0.
+    """
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.compare',
+                                     description='Compare two benchmark result files.')
+    parser.add_argument('baseline', help='results of the baseline commit')
+    parser.add_argument('current', help='results to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative wall time growth that counts as a regression (default: %(default)s)')
+    parser.add_argument('--memory-threshold', type=float, default=0.2,
+                        help='relative peak memory growth that counts as a regression (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    print(f"{baseline['metadata'].get('commit')} -> {current['metadata'].get('commit')}")
+    comparisons = compare(baseline, current, threshold=args.threshold, memory_threshold=args.memory_threshold)
+    for comparison in comparisons:
+        queries_before, queries_after = comparison['queries']
+        print(f"{comparison['size']:>9} {comparison['benchmark']:<60} time x{comparison['time_ratio']:<6.2f} "
+              f"queries {queries_before}->{queries_after:<6} memory x{comparison['memory_ratio']:<6.2f} "
+              f"{'REGRESSION: ' + ', '.join(comparison['regressions']) if comparison['regressions'] else ''}")
+    return 1 if any(comparison['regressions'] for comparison in comparisons) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
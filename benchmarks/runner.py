@@ -0,0 +1,272 @@
+"""
+This module runs the benchmark suite against seeded databases and writes the results as JSON.
+
+For every database size, the orders are seeded into a file-backed SQLite database (one file per size,
+reused while it holds the expected number of orders) or into the PostgreSQL database given with
+--database-url. Each benchmark is run --repeat times to measure the wall time, counting the SQL
+statements of the first run, and once more under tracemalloc to measure the peak Python memory.
+
+Functions:
+    measure(benchmark, context, engine, repeat): Runs one benchmark and returns its measurements.
+    run_suite(sizes, ...): Runs the selected benchmarks for every size and returns the results document.
+    main(argv): Command line entry point, see ``python -m benchmarks --help``.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from fnmatch import fnmatch
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from benchmarks.cases import BENCHMARKS, Benchmark, BenchmarkContext
+from benchmarks.seed import count_orders, seed_orders
+from src import config
+from src.app import create_app, db
+from src.database.db import remove_session
+
+DEFAULT_SIZES = (10000, 100000, 1000000)
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), 'order-management-benchmarks')
+
+
+class QueryCounter:
+    """
+    Counts the SQL statements executed on an engine.
+
+    Attributes:
+        count (int): The number of statements executed since the last reset.
+    """
+
+    def __init__(self, engine: Engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args: Any) -> None:
+        """
+        Increments the counter; registered as a 'before_cursor_execute' event listener.
+        """
+        self.count += 1
+
+
+def _run_once(benchmark: Benchmark, context: BenchmarkContext, trace_memory: bool = False) -> Dict[str, Any]:
+    """
+    Runs a benchmark once, timing only its operation.
+
+    Args:
+        benchmark (Benchmark): The benchmark.
+        context (BenchmarkContext): The benchmark context.
+        trace_memory (bool): Whether to measure the peak memory of the operation with tracemalloc.
+                             Defaults to False.
+
+    Returns:
+        Dict[str, Any]: The 'rows' processed, the 'wall_time' in seconds and, if traced, the 'peak_memory' in bytes.
+    """
+    state = benchmark.setup(context) if benchmark.setup is not None else None
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    rows = benchmark.run(context, state)
+    wall_time = time.perf_counter() - start
+    result = {'rows': rows, 'wall_time': wall_time}
+    if trace_memory:
+        result['peak_memory'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    if benchmark.teardown is not None:
+        benchmark.teardown(context, state)
+    remove_session()
+    return result
+
+
+def measure(benchmark: Benchmark, context: BenchmarkContext, counter: QueryCounter, repeat: int) -> Dict[str, Any]:
+    """
+    Runs a benchmark and returns its measurements.
+
+    Args:
+        benchmark (Benchmark): The benchmark.
+        context (BenchmarkContext): The benchmark context.
+        counter (QueryCounter): The statement counter of the benchmarked engine.
+        repeat (int): The number of timed runs.
+
+    Returns:
+        Dict[str, Any]: The number of 'rows' processed, the min, median and max 'wall_time' in seconds,
+        the number of SQL 'queries' of one run and the 'peak_memory_bytes' of one run.
+    """
+    wall_times = []
+    queries = None
+    for _ in range(repeat):
+        counter.count = 0
+        run = _run_once(benchmark, context)
+        # Setup and teardown statements are not part of the operation
+        if queries is None:
+            queries = _count_operation_queries(benchmark, context, counter)
+        wall_times.append(run['wall_time'])
+    traced = _run_once(benchmark, context, trace_memory=True)
+    return {
+        'rows': run['rows'],
+        'wall_time': {'min': min(wall_times), 'median': statistics.median(wall_times), 'max': max(wall_times)},
+        'queries': queries,
+        'peak_memory_bytes': traced['peak_memory']
+    }
+
+
+def _count_operation_queries(benchmark: Benchmark, context: BenchmarkContext, counter: QueryCounter) -> int:
+    """
+    Counts the SQL statements of a benchmark operation, excluding its setup and teardown.
+
+    Args:
+        benchmark (Benchmark): The benchmark.
+        context (BenchmarkContext): The benchmark context.
+        counter (QueryCounter): The statement counter of the benchmarked engine.
+
+    Returns:
+        int: The number of statements executed by the operation.
+    """
+    state = benchmark.setup(context) if benchmark.setup is not None else None
+    counter.count = 0
+    benchmark.run(context, state)
+    queries = counter.count
+    if benchmark.teardown is not None:
+        benchmark.teardown(context, state)
+    remove_session()
+    return queries
+
+
+def _git_revision() -> Dict[str, Any]:
+    """
+    Returns the git commit the benchmarks run on.
+
+    Returns:
+        Dict[str, Any]: The 'commit' hash and whether the working tree is 'dirty', or None values outside git.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                capture_output=True, text=True, check=True).stdout
+        return {'commit': commit.strip(), 'dirty': bool(status.strip())}
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+
+
+def _create_benchmark_app(database_url: str):
+    """
+    Creates the application bound to the benchmark database.
+
+    Args:
+        database_url (str): The URL of the benchmark database.
+
+    Returns:
+        Flask: The application.
+    """
+    config.config_by_name['benchmark'] = type('BenchmarkConfig', (config.Config,), {
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'JOB_EXECUTOR': 'sync'
+    })
+    return create_app('benchmark')
+
+
+def run_suite(sizes: Sequence[int], database_url: Optional[str] = None, data_dir: str = DEFAULT_DATA_DIR,
+              patterns: Sequence[str] = ('*',), repeat: int = 3, reseed: bool = False, seed: int = 0,
+              log=print) -> Dict[str, Any]:
+    """
+    Runs the selected benchmarks for every database size.
+
+    Args:
+        sizes (Sequence[int]): The numbers of orders to seed.
+        database_url (Optional[str]): The database to benchmark; one SQLite file per size in ``data_dir``
+                                      if None. Defaults to None.
+        data_dir (str): The directory of the SQLite databases. Defaults to DEFAULT_DATA_DIR.
+        patterns (Sequence[str]): Shell-style patterns selecting benchmarks by name. Defaults to all.
+        repeat (int): The number of timed runs of each benchmark. Defaults to 3.
+        reseed (bool): Whether to seed the database even if it already holds the expected number of orders.
+                       Defaults to False.
+        seed (int): The seed of the generated orders and the sampled IDs. Defaults to 0.
+        log (Callable[[str], None]): Receives progress messages. Defaults to print.
+
+    Returns:
+        Dict[str, Any]: The results document, with the run 'metadata' and one entry per size and benchmark
+        in 'results'.
+    """
+    benchmarks = [benchmark for benchmark in BENCHMARKS if any(fnmatch(benchmark.name, p) for p in patterns)]
+    os.makedirs(data_dir, exist_ok=True)
+    document = {
+        'metadata': {
+            **_git_revision(),
+            'started_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': None,
+            'repeat': repeat,
+            'seed': seed
+        },
+        'results': []
+    }
+
+    for size in sizes:
+        url = database_url or f"sqlite:///{os.path.join(data_dir, f'orders_{size}.sqlite')}"
+        app = _create_benchmark_app(url)
+        with app.app_context(), tempfile.TemporaryDirectory(dir=data_dir) as work_dir:
+            engine = db.engine
+            document['metadata']['database'] = engine.dialect.name
+            if reseed or count_orders(engine) != size:
+                log(f'Seeding {size} orders into {engine.url.render_as_string(hide_password=True)}')
+                seed_orders(engine, size, seed=seed)
+            counter = QueryCounter(engine)
+            context = BenchmarkContext(size, work_dir, seed=seed)
+            for benchmark in benchmarks:
+                result = measure(benchmark, context, counter, repeat)
+                document['results'].append({'size': size, 'benchmark': benchmark.name, **result})
+                log(f"{size:>9} {benchmark.name:<60} {result['wall_time']['median']:>10.4f}s "
+                    f"{result['queries']:>7} queries {result['peak_memory_bytes'] / 2 ** 20:>9.1f} MiB")
+            engine.dispose()
+    return document
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the benchmark suite from the command line.
+
+    Args:
+        argv (Optional[List[str]]): The command line arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: The exit status.
+    """
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='comma-separated numbers of orders to seed (default: %(default)s)')
+    parser.add_argument('--database-url', help='benchmark this database, e.g. a PostgreSQL URL, instead of SQLite '
+                                               'files; its orders are replaced by the seeded ones')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR,
+                        help='directory of the SQLite databases and work files (default: %(default)s)')
+    parser.add_argument('--benchmark', action='append', dest='patterns',
+                        help="run only benchmarks matching this pattern, e.g. 'repository.*'; may be repeated")
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per benchmark (default: %(default)s)')
+    parser.add_argument('--reseed', action='store_true', help='seed the databases even if they are already seeded')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the generated data (default: %(default)s)')
+    parser.add_argument('--output', default='benchmark-results.json',
+                        help='path of the JSON results file (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    try:
+        sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    except ValueError:
+        parser.error('--sizes must be a comma-separated list of integers')
+    if not sizes or min(sizes) < 1 or args.repeat < 1:
+        parser.error('--sizes and --repeat must be positive')
+
+    document = run_suite(sizes, database_url=args.database_url, data_dir=args.data_dir,
+                         patterns=args.patterns or ('*',), repeat=args.repeat, reseed=args.reseed, seed=args.seed)
+    with open(args.output, 'w') as f:
+        json.dump(document, f, indent=2)
+    print(f"Wrote {len(document['results'])} results to {args.output}", file=sys.stderr)
+    return 0
@@ -0,0 +1,77 @@
+"""
+This module seeds a database with a reproducible set of orders for benchmarking.
+
+Functions:
+    seed_orders(engine, size, seed, chunk_size): Replaces the orders with ``size`` generated orders.
+    count_orders(engine): Returns the number of orders in the database.
+"""
+
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.engine import Engine
+
+from src.database.models import Base, Order, OrderRollup, OrderStatusCount
+from src.routes.services.rollup_service import hour_bucket
+
+STATUSES = ('New', 'In Progress', 'Completed')
+# Orders are spread over the two years before this date
+SEED_END_DATE = datetime(2024, 7, 1)
+SEED_CHUNK_SIZE = 10000
+
+
+def count_orders(engine: Engine) -> int:
+    """
+    Returns the number of orders in the database, or 0 if the tables do not exist yet.
+
+    Args:
+        engine (Engine): The database engine.
+
+    Returns:
+        int: The number of orders.
+    """
+    Base.metadata.create_all(engine)
+    with engine.connect() as connection:
+        return connection.scalar(select(func.count()).select_from(Order))
+
+
+def seed_orders(engine: Engine, size: int, seed: int = 0, chunk_size: int = SEED_CHUNK_SIZE) -> None:
+    """
+    Replaces all orders with ``size`` generated orders and rebuilds the status and rollup counters.
+
+    The orders are generated from a seeded random generator, so the same size and seed always
+    produce the same data. They are inserted with multi-row inserts in chunks of ``chunk_size``.
+
+    Args:
+        engine (Engine): The database engine.
+        size (int): The number of orders to generate.
+        seed (int): The seed of the random generator. Defaults to 0.
+        chunk_size (int): The number of orders inserted per statement. Defaults to SEED_CHUNK_SIZE.
+    """
+    rng = random.Random(seed)
+    span_seconds = int(timedelta(days=730).total_seconds())
+    Base.metadata.create_all(engine)
+    rollups = Counter()
+    with engine.begin() as connection:
+        connection.execute(delete(OrderStatusCount))
+        connection.execute(delete(OrderRollup))
+        connection.execute(delete(Order))
+        for start in range(0, size, chunk_size):
+            rows = [{
+                'id': id,
+                'name': f'Order {id}',
+                'description': f'Benchmark order {id}' if rng.random() < 0.8 else None,
+                'creation_date': SEED_END_DATE - timedelta(seconds=rng.randrange(span_seconds)),
+                'status': rng.choice(STATUSES)
+            } for id in range(start + 1, min(start + chunk_size, size) + 1)]
+            connection.execute(insert(Order), rows)
+            rollups.update((hour_bucket(row['creation_date']), row['status']) for row in rows)
+        connection.execute(insert(OrderStatusCount).from_select(
+            ['status', 'count'],
+            select(Order.status, func.count()).group_by(Order.status)
+        ))
+        rows = [{'bucket': bucket, 'status': status, 'count': count} for (bucket, status), count in rollups.items()]
+        for start in range(0, len(rows), chunk_size):
+            connection.execute(insert(OrderRollup), rows[start:start + chunk_size])
@@ -0,0 +1,36 @@
+"""add indexes for filtering orders
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 07:36:50.232302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('ix_orders_status', ['status']),
+    ('ix_orders_creation_date', ['creation_date']),
+    ('ix_orders_status_creation_date', ['status', 'creation_date']),
+)
+
+
+def upgrade():
+    # Build the indexes concurrently on PostgreSQL so the orders table stays writable,
+    # which has to happen outside a transaction
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, 'orders', columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='orders', postgresql_concurrently=True)
@@ -0,0 +1,33 @@
+"""add updated_at to orders
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 11:02:14.518730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('orders', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    # Existing orders count as changed when they were created, so the first delta export
+    # from an old watermark still includes them
+    orders = sa.table('orders', sa.column('creation_date', sa.DateTime()), sa.column('updated_at', sa.DateTime()))
+    op.execute(orders.update().values(updated_at=sa.func.coalesce(orders.c.creation_date, sa.func.current_timestamp())))
+    with op.get_context().autocommit_block():
+        op.create_index('ix_orders_updated_at', 'orders', ['updated_at'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_orders_updated_at', table_name='orders', postgresql_concurrently=True)
+    op.drop_column('orders', 'updated_at')
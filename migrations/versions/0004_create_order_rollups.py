@@ -0,0 +1,30 @@
+"""create order rollups table
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 16:41:27.302915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('order_rollups',
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('bucket', 'status')
+    )
+    # Existing orders are counted by running 'flask orders backfill-rollups' after the upgrade
+
+
+def downgrade():
+    op.drop_table('order_rollups')
@@ -0,0 +1,33 @@
+"""create order status counts table
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 19:05:12.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('order_status_counts',
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('status')
+    )
+    # The counters start from the current orders, in the same transaction as the table creation
+    op.execute(
+        'INSERT INTO order_status_counts (status, count) '
+        'SELECT status, COUNT(*) FROM orders GROUP BY status'
+    )
+
+
+def downgrade():
+    op.drop_table('order_status_counts')
@@ -1,10 +1,16 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from src.commands import orders_cli, serve_command, startup_report_command
 from src.config import config_by_name
+from src.database import db as database
+from src.database.models import Base
+from src.json_provider import JSONProvider
+from src import metrics
 from src.routes.endpoints import api_orders_bp
+from src.routes.services import job_service, order_cache
 
-db = SQLAlchemy()
+db = SQLAlchemy(metadata=Base.metadata)
 migrate = Migrate()
 
 
@@ -13,7 +19,9 @@ def create_app(config_name: str) -> Flask:
     Factory function to create a Flask application instance.
 
     This function sets up the Flask application with the specified configuration, initializes
-    the SQLAlchemy and Flask-Migrate extensions, and registers the application blueprints.
+    the SQLAlchemy and Flask-Migrate extensions, and registers the application blueprints and CLI commands.
+    The engine configured by Flask-SQLAlchemy (including SQLALCHEMY_ENGINE_OPTIONS pool settings) backs
+    the request-scoped sessions used by the services, which are closed when the application context ends.
 
     Args:
         config_name (str): The configuration name to be used for the Flask application. This
@@ -24,10 +32,19 @@ def create_app(config_name: str) -> Flask:
     """
     app = Flask(__name__)
     app.config.from_object(config_by_name[config_name])
+    app.json = JSONProvider(app)
 
     db.init_app(app)
     migrate.init_app(app, db)
+    with app.app_context():
+        database.init_app(app, db.engine)
+        metrics.init_app(app, db.engine)
+    job_service.init_app(app)
+    order_cache.init_app(app)
 
     app.register_blueprint(api_orders_bp)
+    app.cli.add_command(orders_cli)
+    app.cli.add_command(serve_command)
+    app.cli.add_command(startup_report_command)
 
     return app
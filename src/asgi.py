@@ -0,0 +1,253 @@
+"""
+This module provides the ASGI serving mode of the application.
+
+The order CRUD endpoints are served natively by coroutines running on SQLAlchemy's asyncio engine, so many
+in-flight requests share one event loop while they wait on the database. All other requests are handed to
+the Flask application through asgiref's WSGI adapter.
+
+Classes:
+    AsyncOrderApp: ASGI application serving the async endpoints and handing the other requests to Flask.
+
+Functions:
+    create_asgi_app(config_name): Factory function to create an ASGI application instance.
+
+Usage:
+    Serve the application created by create_asgi_app with an ASGI server, e.g. ``uvicorn asgi:app``.
+"""
+
+import io
+import sys
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import Flask, Response, request
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from werkzeug.exceptions import HTTPException
+
+from src.app import create_app
+from src.database.db import get_async_engine
+from src.routes.endpoints.async_order_endpoints import ASYNC_ENDPOINTS, AsyncEndpoint
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def _build_environ(scope: Scope, body: bytes = b'') -> Dict[str, Any]:
+    """
+    Builds the WSGI environ of an HTTP request from its ASGI scope.
+
+    Args:
+        scope (Scope): The ASGI scope of the request.
+        body (bytes): The request body. Defaults to b''.
+
+    Returns:
+        Dict[str, Any]: The WSGI environ.
+    """
+    script_name = scope.get('root_path', '').encode('utf8').decode('latin1')
+    path_info = scope['path'].encode('utf8').decode('latin1')
+    if path_info.startswith(script_name):
+        path_info = path_info[len(script_name):]
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': script_name,
+        'PATH_INFO': path_info,
+        'QUERY_STRING': scope.get('query_string', b'').decode('ascii'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.input_terminated': True,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin1').upper().replace('-', '_')
+        key = name if name in ('CONTENT_TYPE', 'CONTENT_LENGTH') else f'HTTP_{name}'
+        value = value.decode('latin1')
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+async def _read_body(receive: Receive) -> bytes:
+    """
+    Reads the whole body of an HTTP request.
+
+    Args:
+        receive (Receive): The ASGI receive channel of the request.
+
+    Returns:
+        bytes: The request body.
+    """
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] != 'http.request':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    return b''.join(chunks)
+
+
+def _replay_body(body: bytes) -> Receive:
+    """
+    Returns an ASGI receive channel yielding an already read request body.
+
+    Args:
+        body (bytes): The request body.
+
+    Returns:
+        Receive: The receive channel.
+    """
+    async def receive() -> Dict[str, Any]:
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+    return receive
+
+
+async def _send_response(response: Response, send: Send) -> None:
+    """
+    Sends a Flask response over an ASGI connection.
+
+    Args:
+        response (Response): The response.
+        send (Send): The ASGI send channel of the request.
+    """
+    headers = [(name.lower().encode('latin1'), value.encode('latin1')) for name, value in response.headers.items()]
+    await send({'type': 'http.response.start', 'status': response.status_code, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': response.get_data()})
+
+
+class AsyncOrderApp:
+    """
+    ASGI application serving the async order endpoints natively and handing the other requests to Flask.
+
+    A native request is handled in a Flask request context built from its ASGI scope, so the endpoint uses
+    the usual ``request``, ``current_app`` and ``g`` objects, and the application's before and after request
+    hooks, such as the request metrics, run as they do for WSGI requests. Its database work goes through an
+    AsyncSession of the asyncio engine, which is disposed when the server shuts down. Requests to the other
+    endpoints run the Flask application on a worker thread.
+
+    Attributes:
+        flask_app (Flask): The Flask application.
+        engine (AsyncEngine): The asyncio engine of the async endpoints.
+        sessionmaker (async_sessionmaker): The factory of the sessions of the async endpoints.
+        wsgi_app (WsgiToAsgi): The Flask application wrapped as an ASGI application.
+    """
+
+    def __init__(self, flask_app: Flask, engine: AsyncEngine):
+        self.flask_app = flask_app
+        self.engine = engine
+        self.sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        self.wsgi_app = WsgiToAsgi(flask_app)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Handles an ASGI connection.
+
+        Args:
+            scope (Scope): The ASGI scope of the connection.
+            receive (Receive): The ASGI receive channel.
+            send (Send): The ASGI send channel.
+        """
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        endpoint = self._match(scope) if scope['type'] == 'http' else None
+        if endpoint is None:
+            await self.wsgi_app(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        response = await self._dispatch(endpoint, _build_environ(scope, body))
+        if response is None:
+            await self.wsgi_app(scope, _replay_body(body), send)
+            return
+        await _send_response(response, send)
+
+    def _match(self, scope: Scope) -> Optional[AsyncEndpoint]:
+        """
+        Finds the async endpoint serving an HTTP request.
+
+        Args:
+            scope (Scope): The ASGI scope of the request.
+
+        Returns:
+            Optional[AsyncEndpoint]: The async endpoint, or None if the request is handled by Flask.
+        """
+        try:
+            endpoint, _ = self.flask_app.url_map.bind_to_environ(_build_environ(scope)).match()
+        except HTTPException:
+            return None
+        return ASYNC_ENDPOINTS.get(endpoint)
+
+    async def _dispatch(self, endpoint: AsyncEndpoint, environ: Dict[str, Any]) -> Optional[Response]:
+        """
+        Runs an async endpoint in a Flask request context, along with the application's request hooks.
+
+        Args:
+            endpoint (AsyncEndpoint): The async endpoint.
+            environ (Dict[str, Any]): The WSGI environ of the request.
+
+        Returns:
+            Optional[Response]: The response, or None if the endpoint hands the request to Flask.
+        """
+        app = self.flask_app
+        with app.request_context(environ):
+            try:
+                try:
+                    rv = app.preprocess_request()
+                    if rv is None:
+                        async with self.sessionmaker() as db:
+                            rv = await endpoint(db, **request.view_args)
+                        if rv is None:
+                            return None
+                except Exception as e:
+                    rv = app.handle_user_exception(e)
+                return app.finalize_request(rv)
+            except Exception as e:
+                return app.make_response(app.handle_exception(e))
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        """
+        Handles the ASGI lifespan protocol, disposing the asyncio engine on shutdown.
+
+        Args:
+            receive (Receive): The ASGI receive channel.
+            send (Send): The ASGI send channel.
+        """
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def create_asgi_app(config_name: str) -> AsyncOrderApp:
+    """
+    Factory function to create an ASGI application instance.
+
+    The Flask application is created by create_app. The asyncio engine connects to ASYNC_DATABASE_URI or,
+    if it is not set, to SQLALCHEMY_DATABASE_URI with the asyncio driver of its dialect, and is configured
+    with ASYNC_ENGINE_OPTIONS.
+
+    Args:
+        config_name (str): The configuration name to be used for the Flask application.
+
+    Returns:
+        AsyncOrderApp: The ASGI application.
+    """
+    flask_app = create_app(config_name)
+    database_url = flask_app.config['ASYNC_DATABASE_URI'] or flask_app.config['SQLALCHEMY_DATABASE_URI']
+    engine = get_async_engine(database_url, **flask_app.config['ASYNC_ENGINE_OPTIONS'])
+    return AsyncOrderApp(flask_app, engine)
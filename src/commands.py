@@ -0,0 +1,106 @@
+"""
+This module defines the Flask CLI commands for maintaining the order management database.
+
+Commands:
+    flask orders rebuild-status-counts: Rebuilds the status counters from the orders table.
+    flask orders backfill-rollups: Rebuilds the hourly rollup counters from the orders table.
+    flask orders cleanup-jobs: Fails abandoned background jobs and deletes expired job artifacts.
+    flask serve: Serves the application with pre-forked worker processes.
+    flask startup-report: Reports the startup time, memory and per-module import cost of the application.
+
+Usage:
+    The commands are registered on the application by create_app and run with the 'flask' executable.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Optional
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from src.routes.services.job_service import cleanup_jobs
+from src.routes.services.rollup_service import backfill_order_rollups
+from src.routes.services.status_count_service import rebuild_status_counts
+from src.server import PreforkServer
+from src.startup_report import format_startup_report, measure_startup
+
+orders_cli = AppGroup('orders', help='Maintain the order management database.')
+
+
+@orders_cli.command('rebuild-status-counts')
+def rebuild_status_counts_command() -> None:
+    """
+    Rebuilds the status counters from scratch by counting the orders in each status.
+    """
+    status_counts = rebuild_status_counts()
+    for status, count in sorted(status_counts.items()):
+        click.echo(f'{status}: {count}')
+    click.echo(f'Rebuilt counters for {len(status_counts)} statuses.')
+
+
+@orders_cli.command('backfill-rollups')
+@click.option('--from', 'date_from', type=click.DateTime(), help='Only rebuild the hours from this datetime on.')
+def backfill_rollups_command(date_from: Optional[datetime]) -> None:
+    """
+    Rebuilds the hourly rollup counters of order trends from the orders table.
+    """
+    result = backfill_order_rollups(date_from)
+    click.echo(f"Counted {result['orders']} orders in {result['buckets']} hourly buckets.")
+
+
+@orders_cli.command('cleanup-jobs')
+def cleanup_jobs_command() -> None:
+    """
+    Fails the background jobs abandoned by their process and deletes the expired job artifacts.
+    """
+    result = cleanup_jobs(current_app.config['JOB_STALE_TIMEOUT'], current_app.config['JOB_ARTIFACT_TTL'])
+    click.echo(f"Failed {result['failed']} abandoned jobs, deleted {result['deleted_artifacts']} expired artifacts.")
+
+
+@click.command('serve')
+@click.option('--host', default='127.0.0.1', show_default=True, help='The interface to bind to.')
+@click.option('--port', default=8000, show_default=True, help='The port to bind to.')
+@click.option('--workers', type=int, help='The number of worker processes. Defaults to SERVE_WORKERS.')
+@click.option('--max-requests', type=int,
+              help='Recycle a worker after this many requests; 0 never recycles. Defaults to SERVE_MAX_REQUESTS.')
+@click.option('--max-memory', type=int,
+              help='Recycle a worker using more than this many MiB; 0 never recycles. Defaults to SERVE_MAX_MEMORY_MB.')
+def serve_command(host: str, port: int, workers: Optional[int], max_requests: Optional[int],
+                  max_memory: Optional[int]) -> None:
+    """
+    Serves the application with pre-forked worker processes.
+    """
+    config = current_app.config
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(process)d] %(levelname)s %(name)s: %(message)s')
+    PreforkServer(
+        current_app._get_current_object(),
+        host,
+        port,
+        workers=workers if workers is not None else config['SERVE_WORKERS'],
+        max_requests=max_requests if max_requests is not None else config['SERVE_MAX_REQUESTS'],
+        max_requests_jitter=config['SERVE_MAX_REQUESTS_JITTER'],
+        max_memory=(max_memory if max_memory is not None else config['SERVE_MAX_MEMORY_MB']) * 2 ** 20,
+        graceful_timeout=config['SERVE_GRACEFUL_TIMEOUT']
+    ).run()
+
+
+@click.command('startup-report')
+@click.option('--config', 'config_name', default=lambda: os.environ.get('FLASK_CONFIG', 'development'),
+              help='The configuration the application is created with. Defaults to FLASK_CONFIG.')
+@click.option('--top', default=15, show_default=True, help='The number of packages and modules to list.')
+@click.option('--max-seconds', type=float, help='Fail if the startup takes longer than this many seconds.')
+@click.option('--max-rss', type=float, help='Fail if the peak resident memory exceeds this many MiB.')
+@click.option('--json', 'as_json', is_flag=True, help='Print the measurements as JSON.')
+def startup_report_command(config_name: str, top: int, max_seconds: Optional[float], max_rss: Optional[float],
+                           as_json: bool) -> None:
+    """
+    Reports the startup time, memory and per-module import cost of the application, measured in a new process.
+    """
+    report = measure_startup(config_name, top=top)
+    click.echo(json.dumps(report, indent=2) if as_json else format_startup_report(report, max_seconds))
+    if max_seconds is not None and report['startup_seconds'] > max_seconds:
+        raise click.ClickException(f"Startup took {report['startup_seconds']:.3f} s, over the {max_seconds} s budget")
+    if max_rss is not None and report['max_rss_mib'] > max_rss:
+        raise click.ClickException(f"Peak RSS is {report['max_rss_mib']:.1f} MiB, over the {max_rss} MiB budget")
@@ -3,7 +3,8 @@ This module defines configuration classes for different environments and loads e
 
 Classes:
     Config: Base configuration class with common settings.
-    DevelopmentConfig: Configuration class for development environment with PostgreSQL database settings.
+    DevelopmentConfig: Configuration class for development environment with PostgreSQL database and
+                       connection pool settings, for the synchronous and the asyncio engine.
     TestingConfig: Configuration class for testing environment with SQLite in-memory database settings.
 
 Variables:
@@ -14,6 +15,7 @@ Usage:
 """
 
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -21,6 +23,44 @@ load_dotenv()
 
 class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    ORDERS_PAGE_SIZE = int(os.getenv('ORDERS_PAGE_SIZE', 100))
+    ORDERS_MAX_PAGE_SIZE = int(os.getenv('ORDERS_MAX_PAGE_SIZE', 1000))
+    ORDERS_STREAM_BATCH_SIZE = int(os.getenv('ORDERS_STREAM_BATCH_SIZE', 1000))
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+    EXPORT_WATERMARK_LAG = float(os.getenv('EXPORT_WATERMARK_LAG', 60))
+    EXPORT_SPOOL_MAX_SIZE = int(os.getenv('EXPORT_SPOOL_MAX_SIZE', 8 * 1024 * 1024))
+    EXPORT_GZIP_LEVEL = int(os.getenv('EXPORT_GZIP_LEVEL', 6))
+    IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', 1000))
+    IMPORT_PIPELINE_WORKERS = int(os.getenv('IMPORT_PIPELINE_WORKERS', os.cpu_count() or 1))
+    BULK_CREATE_BATCH_SIZE = int(os.getenv('BULK_CREATE_BATCH_SIZE', 1000))
+    ORDER_CACHE_SIZE = int(os.getenv('ORDER_CACHE_SIZE', 1024))
+    # The cache is process-local: under several server workers, a write only invalidates the cache of the
+    # worker that made it, so the others serve the old order and ETag until their entry expires. The TTL is
+    # then capped to ORDER_CACHE_PREFORK_TTL; 0 disables the cache.
+    ORDER_CACHE_TTL = float(os.getenv('ORDER_CACHE_TTL', 60))
+    ORDER_CACHE_PREFORK_TTL = float(os.getenv('ORDER_CACHE_PREFORK_TTL', 1))
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    METRICS_SERVER_TIMING = os.getenv('METRICS_SERVER_TIMING', 'false').lower() in ('1', 'true', 'yes')
+    HDF5_COMPRESSION = os.getenv('HDF5_COMPRESSION', 'gzip')
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 30000))
+    ASYNC_DATABASE_URI = os.getenv('ASYNC_DATABASE_URI')
+    ASYNC_ENGINE_OPTIONS = {}
+    SERVE_WORKERS = int(os.getenv('SERVE_WORKERS', 2 * (os.cpu_count() or 1) + 1))
+    SERVE_MAX_REQUESTS = int(os.getenv('SERVE_MAX_REQUESTS', 0))
+    SERVE_MAX_REQUESTS_JITTER = int(os.getenv('SERVE_MAX_REQUESTS_JITTER', 0))
+    SERVE_MAX_MEMORY_MB = int(os.getenv('SERVE_MAX_MEMORY_MB', 0))
+    SERVE_GRACEFUL_TIMEOUT = float(os.getenv('SERVE_GRACEFUL_TIMEOUT', 30))
+    JOB_EXECUTOR = os.getenv('JOB_EXECUTOR', 'thread')
+    JOB_MAX_WORKERS = int(os.getenv('JOB_MAX_WORKERS', 2))
+    JOB_MAX_PENDING = int(os.getenv('JOB_MAX_PENDING', 10))
+    JOB_ARTIFACT_DIR = os.getenv('JOB_ARTIFACT_DIR', os.path.join(os.getcwd(), 'jobs'))
+    JOB_STALE_TIMEOUT = float(os.getenv('JOB_STALE_TIMEOUT', 1800))
+    JOB_ARTIFACT_TTL = float(os.getenv('JOB_ARTIFACT_TTL', 24 * 3600))
 
 
 class DevelopmentConfig(Config):
@@ -29,11 +69,29 @@ class DevelopmentConfig(Config):
         f"{os.environ.get('POSTGRES_PASSWORD')}@"
         f"{os.environ.get('DB_HOST_IP')}:5432/{os.getenv('POSTGRES_DB')}"
     )
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': Config.DB_POOL_SIZE,
+        'max_overflow': Config.DB_MAX_OVERFLOW,
+        'pool_timeout': Config.DB_POOL_TIMEOUT,
+        'pool_recycle': Config.DB_POOL_RECYCLE,
+        'pool_pre_ping': Config.DB_POOL_PRE_PING,
+        'connect_args': {'options': f'-c statement_timeout={Config.DB_STATEMENT_TIMEOUT_MS}'}
+    }
+    ASYNC_ENGINE_OPTIONS = {
+        'pool_size': Config.DB_POOL_SIZE,
+        'max_overflow': Config.DB_MAX_OVERFLOW,
+        'pool_timeout': Config.DB_POOL_TIMEOUT,
+        'pool_recycle': Config.DB_POOL_RECYCLE,
+        'pool_pre_ping': Config.DB_POOL_PRE_PING,
+        'connect_args': {'server_settings': {'statement_timeout': str(Config.DB_STATEMENT_TIMEOUT_MS)}}
+    }
 
 
 class TestingConfig(Config):
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
     TESTING = True
+    JOB_EXECUTOR = 'sync'
+    JOB_ARTIFACT_DIR = os.path.join(tempfile.gettempdir(), 'order-management-jobs')
 
 
 config_by_name = {
@@ -3,8 +3,16 @@ This module provides the SQLAlchemy database setup and utility functions for cre
 and managing database sessions.
 
 Functions:
-    get_engine(database_url): Returns a SQLAlchemy engine instance.
+    get_engine(database_url, **engine_options): Returns a SQLAlchemy engine instance.
+    get_async_database_url(database_url): Returns the database URL using the asyncio driver of its dialect.
+    get_async_engine(database_url, **engine_options): Returns a SQLAlchemy asyncio engine instance.
     get_db(): Generator function that provides a database session for dependency injection.
+    get_session(): Returns the database session scoped to the current thread and request.
+    remove_session(exception): Closes the scoped session and returns its connection to the pool.
+    init_app(app, app_engine): Binds the sessions to the application's engine and closes them on teardown.
+    dispose_engine_after_fork(): Gives a forked child process its own connection pool.
+    get_pool_status(): Returns statistics about the connection pool of the engine.
+    get_insert(db): Returns the dialect-specific INSERT construct supporting ON CONFLICT clauses.
 
 Environment Variables:
     DATABASE_URL: The URL for the database connection.
@@ -18,8 +26,11 @@ Usage:
 """
 
 import sqlalchemy
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from typing import Callable, Dict, Optional, Union
+from flask import Flask
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
 from dotenv import load_dotenv
 import os
 
@@ -33,8 +44,11 @@ SQLALCHEMY_DATABASE_URL = os.getenv(
     f"{os.environ.get('DB_HOST_IP')}:5432/"
     f"{os.getenv('POSTGRES_DB')}")
 
+# The asyncio driver used for each supported database dialect
+ASYNC_DRIVERS = {'postgresql': 'asyncpg', 'sqlite': 'aiosqlite'}
 
-def get_engine(database_url=None) -> sqlalchemy.engine:
+
+def get_engine(database_url=None, **engine_options) -> sqlalchemy.engine:
     """
     Returns a SQLAlchemy engine instance.
 
@@ -43,19 +57,59 @@ def get_engine(database_url=None) -> sqlalchemy.engine:
 
     Args:
         database_url (str, optional): The database URL to use for creating the engine. Defaults to None.
+        **engine_options: Additional keyword arguments passed to create_engine, such as pool settings.
 
     Returns:
         sqlalchemy.engine.Engine: The SQLAlchemy engine instance.
     """
     if database_url is None:
         database_url = SQLALCHEMY_DATABASE_URL
-    return create_engine(database_url)
+    return create_engine(database_url, **engine_options)
+
+
+def get_async_database_url(database_url: Optional[str] = None) -> str:
+    """
+    Returns the database URL using the asyncio driver of its dialect.
+
+    A PostgreSQL URL is switched to asyncpg and a SQLite URL to aiosqlite; the rest of the URL is kept.
+
+    Args:
+        database_url (Optional[str]): The database URL. Defaults to None (SQLALCHEMY_DATABASE_URL).
+
+    Returns:
+        str: The database URL for the asyncio driver.
+
+    Raises:
+        ValueError: If the database dialect is not supported.
+    """
+    url = make_url(database_url or SQLALCHEMY_DATABASE_URL)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Unsupported database dialect '{backend}'")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def get_async_engine(database_url: Optional[str] = None, **engine_options) -> AsyncEngine:
+    """
+    Returns a SQLAlchemy asyncio engine instance.
+
+    Args:
+        database_url (Optional[str]): The database URL, with a synchronous or asyncio driver.
+                                      Defaults to None (SQLALCHEMY_DATABASE_URL).
+        **engine_options: Additional keyword arguments passed to create_async_engine, such as pool settings.
+
+    Returns:
+        AsyncEngine: The asyncio engine, using the driver given by get_async_database_url.
+    """
+    return create_async_engine(get_async_database_url(database_url), **engine_options)
 
 
 engine = get_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+db_session = scoped_session(SessionLocal)
+
 
 def get_db():
     """
@@ -72,3 +126,109 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_session() -> Session:
+    """
+    Returns the database session scoped to the current thread.
+
+    Within a Flask application the session lives for the duration of the request (the application
+    context) and is closed on teardown by remove_session, so all repository and service calls made
+    while handling a request share one session and one pooled connection.
+
+    Returns:
+        Session: The scoped SQLAlchemy session.
+    """
+    return db_session()
+
+
+def remove_session(exception: Optional[BaseException] = None) -> None:
+    """
+    Closes the scoped session of the current thread and returns its connection to the pool.
+
+    Registered as an application context teardown handler by init_app; call it explicitly
+    when using get_session outside of a Flask application context, e.g. in a background thread.
+
+    Args:
+        exception (Optional[BaseException]): The exception that ended the application context, if any.
+    """
+    db_session.remove()
+
+
+def init_app(app: Flask, app_engine: sqlalchemy.engine.Engine) -> None:
+    """
+    Binds the database sessions to the application's engine and closes them on teardown.
+
+    Args:
+        app (Flask): The Flask application.
+        app_engine (sqlalchemy.engine.Engine): The engine configured for the application.
+    """
+    global engine
+    engine = app_engine
+    db_session.remove()
+    SessionLocal.configure(bind=app_engine)
+    app.teardown_appcontext(remove_session)
+
+
+def dispose_engine_after_fork() -> None:
+    """
+    Gives a forked child process its own connection pool.
+
+    The connections pooled by the parent process and the session of the current thread are dropped
+    without being closed, as they still belong to the parent; the child opens new connections on demand.
+    Call it in a child process before it uses the database.
+    """
+    db_session.registry.clear()
+    engine.dispose(close=False)
+
+
+def get_pool_status() -> Dict[str, Union[str, int, None]]:
+    """
+    Returns statistics about the connection pool of the engine the sessions are bound to.
+
+    Counters that the pool implementation does not provide are reported as None.
+
+    Returns:
+        Dict[str, Union[str, int, None]]: The pool class, its size, the number of checked in,
+        checked out and overflow connections, and the pool's own status summary.
+    """
+    pool = SessionLocal.kw['bind'].engine.pool
+
+    def counter(name: str) -> Optional[int]:
+        method = getattr(pool, name, None)
+        return method() if callable(method) else None
+
+    return {
+        'pool_class': type(pool).__name__,
+        'size': counter('size'),
+        'checked_in': counter('checkedin'),
+        'checked_out': counter('checkedout'),
+        'overflow': counter('overflow'),
+        'status': pool.status()
+    }
+
+
+def get_insert(db: Session) -> Callable:
+    """
+    Returns the dialect-specific INSERT construct for the database the session is bound to.
+
+    Unlike the generic ``sqlalchemy.insert``, the returned construct supports
+    ``on_conflict_do_update`` and ``on_conflict_do_nothing``.
+
+    Args:
+        db (Session): The database session.
+
+    Returns:
+        Callable: The ``insert`` function of the PostgreSQL or SQLite dialect.
+
+    Raises:
+        ValueError: If the database dialect is not supported.
+    """
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"Unsupported database dialect '{dialect_name}'")
+    return insert
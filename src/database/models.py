@@ -3,15 +3,20 @@ This module defines the SQLAlchemy ORM model for the 'Order' entity and provides
 method to convert the model instances to dictionaries.
 
 Classes:
-    Order: Represents the 'orders' table in the database with columns for id, name, description, creation_date, and status.
+    Order: Represents the 'orders' table in the database with columns for id, name, description, creation_date, status
+           and updated_at.
+    OrderStatusCount: Represents the 'order_status_counts' table holding the number of orders in each status.
+    OrderRollup: Represents the 'order_rollups' table holding the number of orders created per hour and status.
+    Job: Represents the 'jobs' table tracking background exports, imports and reports.
 
 Usage:
     Import this module to define and interact with the 'Order' table in the database.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Boolean, Column, Index, Integer, String, DateTime, Text
 from sqlalchemy.orm import declarative_base
 from datetime import datetime
+import json
 
 Base = declarative_base()
 
@@ -26,14 +31,19 @@ class Order(Base):
         description (str): A description of the order.
         creation_date (datetime): The creation date of the order, defaults to the current UTC datetime.
         status (str): The status of the order.
+        updated_at (datetime): When the order was created or last changed, in UTC; set by every write path.
     """
     __tablename__ = 'orders'
+    __table_args__ = (
+        Index('ix_orders_status_creation_date', 'status', 'creation_date'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50), nullable=False)
     description = Column(String(200))
-    creation_date = Column(DateTime, default=datetime.utcnow)
-    status = Column(String(20), nullable=False)
+    creation_date = Column(DateTime, default=datetime.utcnow, index=True)
+    status = Column(String(20), nullable=False, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     def to_dict(self) -> dict:
         """
@@ -47,5 +57,103 @@ class Order(Base):
             'name': self.name,
             'description': self.description,
             'creation_date': self.creation_date,
-            'status': self.status
+            'status': self.status,
+            'updated_at': self.updated_at
+        }
+
+
+class OrderStatusCount(Base):
+    """
+    Represents the 'order_status_counts' table in the database.
+
+    The counters are maintained incrementally by every write path, in the same transaction
+    as the change to the 'orders' table, so order statistics can be read without scanning the orders.
+
+    Attributes:
+        status (str): The order status, the primary key.
+        count (int): The number of orders in the status.
+    """
+    __tablename__ = 'order_status_counts'
+
+    status = Column(String(20), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class OrderRollup(Base):
+    """
+    Represents the 'order_rollups' table in the database.
+
+    The counters are maintained incrementally by every write path, in the same transaction
+    as the change to the 'orders' table, so order trends can be read without scanning the orders.
+
+    Attributes:
+        bucket (datetime): The start of the hour the orders were created in, in UTC; part of the primary key.
+        status (str): The order status; part of the primary key.
+        count (int): The number of orders created in the hour that are in the status.
+    """
+    __tablename__ = 'order_rollups'
+
+    bucket = Column(DateTime, primary_key=True)
+    status = Column(String(20), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class Job(Base):
+    """
+    Represents the 'jobs' table in the database.
+
+    Attributes:
+        id (str): The primary key of the job, a UUID.
+        kind (str): The kind of work the job does, e.g. 'export_xml' or 'import_hdf5'.
+        params (str): The JSON encoded parameters of the job.
+        status (str): The status of the job: 'queued', 'running', 'completed', 'failed' or 'cancelled'.
+        progress (int): The number of orders processed so far.
+        total (int): The total number of orders to process, if known.
+        result (str): The JSON encoded result of a completed job.
+        error (str): The error message of a failed job.
+        artifact_path (str): The path of the file produced by the job, if any.
+        cancel_requested (bool): Whether cancellation of the running job was requested.
+        worker (str): The '<host>:<pid>' of the process the job was submitted to, which runs it.
+        heartbeat_at (datetime): When the job was submitted, started or last reported progress.
+        created_at (datetime): When the job was submitted.
+        started_at (datetime): When the job started running.
+        finished_at (datetime): When the job completed, failed or was cancelled.
+    """
+    __tablename__ = 'jobs'
+
+    id = Column(String(36), primary_key=True)
+    kind = Column(String(50), nullable=False)
+    params = Column(Text)
+    status = Column(String(20), nullable=False, index=True)
+    progress = Column(Integer, nullable=False, default=0)
+    total = Column(Integer)
+    result = Column(Text)
+    error = Column(Text)
+    artifact_path = Column(String(500))
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    worker = Column(String(100))
+    heartbeat_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    def to_dict(self) -> dict:
+        """
+        Converts the Job instance to a dictionary.
+
+        Returns:
+            dict: A dictionary representation of the Job instance.
+        """
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': self.progress,
+            'total': self.total,
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'has_artifact': self.artifact_path is not None,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
         }
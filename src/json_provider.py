@@ -0,0 +1,34 @@
+"""
+This module defines the JSON provider of the Flask application.
+
+Classes:
+    JSONProvider: Serializes dates and datetimes in ISO 8601 format instead of Flask's default HTTP date format.
+
+Usage:
+    Assign an instance to ``app.json`` when creating the Flask application.
+"""
+
+from datetime import date
+from typing import Any
+from flask.json.provider import DefaultJSONProvider
+
+
+class JSONProvider(DefaultJSONProvider):
+    """
+    The default Flask JSON provider, serializing dates and datetimes in ISO 8601 format.
+    """
+
+    @staticmethod
+    def default(o: Any) -> Any:
+        """
+        Converts a value the JSON encoder cannot serialize by itself.
+
+        Args:
+            o (Any): The value to convert.
+
+        Returns:
+            Any: The ISO 8601 string of a date or datetime, or the value converted by Flask's default provider.
+        """
+        if isinstance(o, date):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
@@ -0,0 +1,457 @@
+"""
+This module collects per-request and database metrics and renders them in the Prometheus text format.
+
+Request latency is recorded by before/after request hooks on the application, and by a teardown hook for
+requests ended by an unhandled exception. SQL statements, failed ones included, are timed through SQLAlchemy
+engine events on every engine, and attributed to the request being handled, if any.
+Connection pool checkout waits are timed by wrapping the ``raw_connection`` method of the application's
+engine, which outlives the pools that ``Engine.dispose`` replaces, e.g. after a server worker is forked.
+The metrics live in the memory of each process, so under the prefork server every worker reports its own
+counters, which restart from zero when the worker is recycled.
+JSON serialization is timed by wrapping the application's JSON provider.
+
+Classes:
+    Histogram: A Prometheus-style histogram with cumulative buckets, per label set.
+    Counter: A Prometheus-style counter, per label set.
+    MetricsRegistry: The metrics of one application.
+    RequestMetrics: The database and serialization time spent on the current request.
+
+Functions:
+    init_app(app, engine): Installs the request hooks and the database instrumentation.
+    get_metrics(): Returns the metrics registry of the current application.
+    render_metrics(): Renders the metrics of the current application in the Prometheus text format.
+
+Usage:
+    create_app calls init_app; the metrics are served by the '/api/metrics' endpoint. Set
+    METRICS_SERVER_TIMING to add a 'Server-Timing' header with the db/serialization split to each response.
+"""
+
+import functools
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from flask import Flask, Response, current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.database.db import get_pool_status
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+# Key of the connection info holding the start times of the statements being executed
+STATEMENT_START_TIMES = 'metrics_statement_start_times'
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """
+    A Prometheus-style histogram with cumulative buckets, per label set.
+
+    Attributes:
+        name (str): The metric name.
+        help (str): The metric description.
+        buckets (Tuple[float, ...]): The upper bounds of the buckets, in ascending order.
+    """
+
+    def __init__(self, name: str, help: str, buckets: Iterable[float]):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._series: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        Records a value.
+
+        Args:
+            value (float): The observed value.
+            **labels (str): The labels of the series.
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            # One counter per bucket, then the +Inf bucket and the sum
+            series = self._series.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        """
+        Renders the histogram in the Prometheus text format.
+
+        Returns:
+            List[str]: The lines of the histogram.
+        """
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted(self._series.items())
+        for labels, values in series:
+            for bound, count in zip(self.buckets + ('+Inf',), values):
+                lines.append(f'{self.name}_bucket{_format_labels(labels + (("le", _format_number(bound)),))} {count}')
+            lines.append(f'{self.name}_sum{_format_labels(labels)} {_format_number(values[-1])}')
+            lines.append(f'{self.name}_count{_format_labels(labels)} {values[len(self.buckets)]}')
+        return lines
+
+
+class Counter:
+    """
+    A Prometheus-style counter, per label set.
+
+    Attributes:
+        name (str): The metric name.
+        help (str): The metric description.
+    """
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._series: Dict[Labels, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """
+        Increments the counter.
+
+        Args:
+            amount (float): The increment. Defaults to 1.
+            **labels (str): The labels of the series.
+        """
+        with self._lock:
+            self._series[tuple(sorted(labels.items()))] += amount
+
+    def render(self) -> List[str]:
+        """
+        Renders the counter in the Prometheus text format.
+
+        Returns:
+            List[str]: The lines of the counter.
+        """
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            series = sorted(self._series.items())
+        lines.extend(f'{self.name}{_format_labels(labels)} {_format_number(value)}' for labels, value in series)
+        return lines
+
+
+def _format_labels(labels: Labels) -> str:
+    """
+    Formats a label set, escaping the label values.
+
+    Args:
+        labels (Labels): The label names and values.
+
+    Returns:
+        str: The label set, e.g. '{method="GET",status="200"}', or '' if there are no labels.
+    """
+    if not labels:
+        return ''
+    escaped = (f'{name}="{_escape_label_value(str(value))}"' for name, value in labels)
+    return '{' + ','.join(escaped) + '}'
+
+
+def _escape_label_value(value: str) -> str:
+    """
+    Escapes backslashes, double quotes and line feeds in a label value.
+
+    Args:
+        value (str): The label value.
+
+    Returns:
+        str: The escaped label value.
+    """
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_number(value: Any) -> str:
+    """
+    Formats a sample value or bucket bound.
+
+    Args:
+        value (Any): The number, or '+Inf'.
+
+    Returns:
+        str: The formatted number.
+    """
+    if isinstance(value, str):
+        return value
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+    The metrics of one application.
+
+    Attributes:
+        request_duration (Histogram): Request latency by method, endpoint and status code.
+        request_statements (Histogram): SQL statements per request by method and endpoint.
+        request_db_duration (Histogram): Database time per request by method and endpoint.
+        statements (Counter): All SQL statements, including those outside requests.
+        statement_duration (Counter): The total time of all SQL statements.
+        pool_checkout_wait (Histogram): The time spent waiting for a pooled connection.
+    """
+
+    def __init__(self):
+        self.request_duration = Histogram(
+            'http_request_duration_seconds', 'Request latency by method, endpoint and status code.', LATENCY_BUCKETS)
+        self.request_statements = Histogram(
+            'http_request_db_statements', 'SQL statements executed per request.', STATEMENT_COUNT_BUCKETS)
+        self.request_db_duration = Histogram(
+            'http_request_db_duration_seconds', 'Time spent executing SQL statements per request.', LATENCY_BUCKETS)
+        self.statements = Counter('db_statements_total', 'SQL statements executed.')
+        self.statement_duration = Counter('db_statement_duration_seconds_total', 'Time spent executing SQL statements.')
+        self.pool_checkout_wait = Histogram(
+            'db_pool_checkout_wait_seconds', 'Time spent waiting to check out a pooled connection.', LATENCY_BUCKETS)
+
+
+class RequestMetrics:
+    """
+    The database and serialization time spent on the current request.
+
+    Attributes:
+        start (float): The performance counter value when the request started.
+        statements (int): The number of SQL statements executed.
+        db_time (float): The time spent executing SQL statements, in seconds.
+        serialization_time (float): The time spent serializing JSON, in seconds.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.statements = 0
+        self.db_time = 0.0
+        self.serialization_time = 0.0
+
+
+def get_metrics() -> Optional[MetricsRegistry]:
+    """
+    Returns the metrics registry of the current application.
+
+    Returns:
+        Optional[MetricsRegistry]: The registry, or None outside an application context or if metrics are disabled.
+    """
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('metrics')
+
+
+def _request_metrics() -> Optional[RequestMetrics]:
+    """
+    Returns the metrics of the request being handled.
+
+    Returns:
+        Optional[RequestMetrics]: The request metrics, or None outside a request.
+    """
+    if not has_request_context():
+        return None
+    return g.get('request_metrics')
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(connection, cursor, statement, parameters, context, executemany) -> None:
+    """
+    Records the start time of a SQL statement.
+    """
+    connection.info.setdefault(STATEMENT_START_TIMES, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(connection, cursor, statement, parameters, context, executemany) -> None:
+    """
+    Records the duration of a SQL statement in the application and request metrics.
+    """
+    _record_statement(connection)
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(exception_context) -> None:
+    """
+    Records the duration of a failed SQL statement, so its start time does not stay on the connection
+    and skew the timing of the next statements.
+    """
+    if exception_context.connection is not None and exception_context.statement is not None:
+        _record_statement(exception_context.connection)
+
+
+def _record_statement(connection) -> None:
+    """
+    Records the duration of the SQL statement that last started on a connection.
+
+    Args:
+        connection (Connection): The connection the statement ran on.
+    """
+    start_times = connection.info.get(STATEMENT_START_TIMES)
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+    metrics = get_metrics()
+    if metrics is None:
+        return
+    metrics.statements.inc()
+    metrics.statement_duration.inc(elapsed)
+    request_metrics = _request_metrics()
+    if request_metrics is not None:
+        request_metrics.statements += 1
+        request_metrics.db_time += elapsed
+
+
+def _instrument_pool(app: Flask, engine: Engine) -> None:
+    """
+    Times the connection checkouts of the engine's pool.
+
+    The engine's ``raw_connection`` method, through which every connection is checked out, is wrapped rather
+    than the pool itself: ``Engine.dispose`` replaces the pool, and pool events have no hook for the start
+    of a checkout.
+
+    Args:
+        app (Flask): The Flask application owning the metrics.
+        engine (Engine): The engine whose checkouts are timed.
+    """
+    raw_connection = engine.raw_connection
+
+    @functools.wraps(raw_connection)
+    def timed_raw_connection(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return raw_connection(*args, **kwargs)
+        finally:
+            app.extensions['metrics'].pool_checkout_wait.observe(time.perf_counter() - start)
+
+    engine.raw_connection = timed_raw_connection
+
+
+def _instrument_json(app: Flask) -> None:
+    """
+    Times the JSON serialization of the application's JSON provider.
+
+    Args:
+        app (Flask): The Flask application.
+    """
+    dumps = app.json.dumps
+
+    @functools.wraps(dumps)
+    def timed_dumps(*args: Any, **kwargs: Any) -> str:
+        start = time.perf_counter()
+        try:
+            return dumps(*args, **kwargs)
+        finally:
+            request_metrics = _request_metrics()
+            if request_metrics is not None:
+                request_metrics.serialization_time += time.perf_counter() - start
+
+    app.json.dumps = timed_dumps
+
+
+def _start_request() -> None:
+    """
+    Starts measuring the current request; registered as a before request hook.
+    """
+    g.request_metrics = RequestMetrics()
+
+
+def _record_request(status_code: int) -> Optional[Tuple[RequestMetrics, float]]:
+    """
+    Records the metrics of the current request, once.
+
+    Args:
+        status_code (int): The status code of the response.
+
+    Returns:
+        Optional[Tuple[RequestMetrics, float]]: The request metrics and the duration of the request in seconds,
+        or None if the request is not measured or was already recorded.
+    """
+    request_metrics = g.pop('request_metrics', None) if has_request_context() else None
+    if request_metrics is None:
+        return None
+    duration = time.perf_counter() - request_metrics.start
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    metrics = current_app.extensions['metrics']
+    metrics.request_duration.observe(duration, method=request.method, endpoint=endpoint, status=str(status_code))
+    metrics.request_statements.observe(request_metrics.statements, method=request.method, endpoint=endpoint)
+    metrics.request_db_duration.observe(request_metrics.db_time, method=request.method, endpoint=endpoint)
+    return request_metrics, duration
+
+
+def _finish_request(response: Response) -> Response:
+    """
+    Records the metrics of the current request; registered as an after request hook.
+
+    For streamed responses, the time spent streaming the body is not included.
+
+    Args:
+        response (Response): The response.
+
+    Returns:
+        Response: The response, with a 'Server-Timing' header if METRICS_SERVER_TIMING is enabled.
+    """
+    recorded = _record_request(response.status_code)
+    if recorded is None:
+        return response
+    request_metrics, duration = recorded
+
+    if current_app.config['METRICS_SERVER_TIMING']:
+        app_time = max(duration - request_metrics.db_time - request_metrics.serialization_time, 0.0)
+        response.headers['Server-Timing'] = ', '.join([
+            f'db;dur={request_metrics.db_time * 1000:.3f};desc="{request_metrics.statements} statements"',
+            f'serialize;dur={request_metrics.serialization_time * 1000:.3f}',
+            f'app;dur={app_time * 1000:.3f}',
+            f'total;dur={duration * 1000:.3f}'
+        ])
+    return response
+
+
+def _teardown_request(exception: Optional[BaseException]) -> None:
+    """
+    Records the request as a 500 if no response was finished for it, e.g. on an unhandled exception;
+    registered as a teardown request hook.
+
+    Args:
+        exception (Optional[BaseException]): The unhandled exception, if any.
+    """
+    _record_request(500)
+
+
+def init_app(app: Flask, engine: Engine) -> None:
+    """
+    Installs the request hooks and the database instrumentation, if METRICS_ENABLED is set.
+
+    Args:
+        app (Flask): The Flask application.
+        engine (Engine): The engine configured for the application.
+    """
+    if not app.config['METRICS_ENABLED']:
+        return
+    app.extensions['metrics'] = MetricsRegistry()
+    _instrument_pool(app, engine)
+    _instrument_json(app)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_teardown_request)
+
+
+def render_metrics() -> str:
+    """
+    Renders the metrics of the current application and the connection pool gauges in the Prometheus text format.
+
+    Returns:
+        str: The metrics exposition.
+    """
+    metrics = current_app.extensions['metrics']
+    lines = []
+    for metric in (metrics.request_duration, metrics.request_statements, metrics.request_db_duration,
+                   metrics.statements, metrics.statement_duration, metrics.pool_checkout_wait):
+        lines.extend(metric.render())
+
+    pool_status = get_pool_status()
+    for key, help in (('size', 'Configured size of the connection pool.'),
+                      ('checked_out', 'Connections currently checked out of the pool.'),
+                      ('checked_in', 'Idle connections in the pool.'),
+                      ('overflow', 'Overflow connections of the pool.')):
+        if pool_status[key] is not None:
+            lines.extend([f'# HELP db_pool_{key} {help}', f'# TYPE db_pool_{key} gauge',
+                          f'db_pool_{key} {pool_status[key]}'])
+    return '\n'.join(lines) + '\n'
@@ -3,6 +3,9 @@ from .order_endpoints import crud_bp
 from .report_endpoints import report_bp
 from .hdf5_endpoints import hdf5_bp
 from .xml_endpoints import xml_bp
+from .line_format_endpoints import lines_bp
+from .monitoring_endpoints import monitoring_bp
+from .job_endpoints import job_bp
 
 
 api_orders_bp = Blueprint('api_orders', __name__, url_prefix='/api')
@@ -11,4 +14,7 @@ api_orders_bp = Blueprint('api_orders', __name__, url_prefix='/api')
 api_orders_bp.register_blueprint(crud_bp)
 api_orders_bp.register_blueprint(report_bp)
 api_orders_bp.register_blueprint(hdf5_bp)
-api_orders_bp.register_blueprint(xml_bp)
\ No newline at end of file
+api_orders_bp.register_blueprint(xml_bp)
+api_orders_bp.register_blueprint(lines_bp)
+api_orders_bp.register_blueprint(monitoring_bp)
+api_orders_bp.register_blueprint(job_bp)
@@ -0,0 +1,134 @@
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from flask import Response, current_app, jsonify, request
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.routes.endpoints.order_endpoints import fields_arg, order_list_args, orders_page_response
+from src.routes.endpoints.query_args import bool_arg, int_arg
+from src.routes.services.async_repository import add_order, delete_order, edit_order, get_order_dict, get_order_rows
+from src.schemas.orders import OrderSchema
+
+# An async endpoint, called with the request's session and view arguments; None hands the request to Flask
+AsyncEndpoint = Callable[..., Awaitable[Optional[Response | Tuple[Response, int]]]]
+
+
+async def add_order_endpoint(db: AsyncSession) -> Tuple[Response, int]:
+    """
+    Async API endpoint to add a new order, served like crud.add_order_endpoint.
+
+    Args:
+        db (AsyncSession): The database session of the request.
+
+    Returns:
+        Tuple[Response, int]: A Flask response object with the created order details or an error message.
+    """
+    try:
+        data = request.get_json()
+        order = OrderSchema(**data)
+        response = await add_order(db, order)
+        return jsonify(response.to_dict()), 201
+    except ValidationError as e:
+        return jsonify(e.errors()), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+
+
+async def get_orders_endpoint(db: AsyncSession) -> Optional[Tuple[Response, int]]:
+    """
+    Async API endpoint to retrieve a page of orders, served like crud.get_orders_endpoint.
+
+    Streamed listings ('stream=true') are left to the Flask endpoint.
+
+    Args:
+        db (AsyncSession): The database session of the request.
+
+    Returns:
+        Optional[Tuple[Response, int]]: A Flask response object with the list of orders or an error message,
+        or None for a streamed listing.
+    """
+    try:
+        after_id = int_arg('after_id', minimum=0)
+        fields = fields_arg()
+        list_args = order_list_args()
+        if bool_arg('stream'):
+            return None
+
+        limit = int_arg('limit', default=current_app.config['ORDERS_PAGE_SIZE'], minimum=1,
+                        maximum=current_app.config['ORDERS_MAX_PAGE_SIZE'])
+        rows = await get_order_rows(db, fields, limit=limit + 1, after_id=after_id, **list_args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return orders_page_response(rows, fields, limit), 200
+
+
+async def get_order_endpoint(db: AsyncSession, id: int) -> Response | Tuple[Response, int]:
+    """
+    Async API endpoint to retrieve a single order by its ID, served like crud.get_order_endpoint.
+
+    Args:
+        db (AsyncSession): The database session of the request.
+        id (int): The ID of the order to retrieve.
+
+    Returns:
+        Response | Tuple[Response, int]: A Flask response object with the order details or an error message.
+    """
+    try:
+        fields = fields_arg()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        order = await get_order_dict(db, id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+    response = jsonify({field: order[field] for field in fields})
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+async def edit_order_endpoint(db: AsyncSession, id: int) -> Tuple[Response, int]:
+    """
+    Async API endpoint to edit an existing order, served like crud.edit_order_endpoint.
+
+    Args:
+        db (AsyncSession): The database session of the request.
+        id (int): The ID of the order to be edited.
+
+    Returns:
+        Tuple[Response, int]: A Flask response object with the updated order details or an error message.
+    """
+    try:
+        data = request.get_json()
+        updated_order = OrderSchema(**data)
+        response = await edit_order(db, id, updated_order)
+        return jsonify(response.to_dict()), 200
+    except ValidationError as e:
+        return jsonify(e.errors()), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+
+
+async def delete_order_endpoint(db: AsyncSession, id: int) -> Tuple[Response, int]:
+    """
+    Async API endpoint to delete an order by its ID, served like crud.delete_order_endpoint.
+
+    Args:
+        db (AsyncSession): The database session of the request.
+        id (int): The ID of the order to delete.
+
+    Returns:
+        Tuple[Response, int]: A Flask response object with the deleted order details or an error message.
+    """
+    try:
+        response = await delete_order(db, id)
+        return jsonify(response.to_dict()), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+
+
+# The Flask endpoints served natively by the async endpoints in the ASGI serving mode
+ASYNC_ENDPOINTS: Dict[str, AsyncEndpoint] = {
+    'api_orders.crud.add_order_endpoint': add_order_endpoint,
+    'api_orders.crud.get_orders_endpoint': get_orders_endpoint,
+    'api_orders.crud.get_order_endpoint': get_order_endpoint,
+    'api_orders.crud.edit_order_endpoint': edit_order_endpoint,
+    'api_orders.crud.delete_order_endpoint': delete_order_endpoint
+}
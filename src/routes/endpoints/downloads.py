@@ -0,0 +1,34 @@
+"""
+This module provides a helper for sending exports produced into spooled buffers as file downloads.
+
+Functions:
+    send_export(buffer, download_name): Streams an export buffer to the client as an attachment.
+
+Usage:
+    Return the response of send_export from an endpoint; the buffer is closed when the response is closed.
+"""
+
+import os
+from typing import BinaryIO
+from flask import Response, send_file
+
+
+def send_export(buffer: BinaryIO, download_name: str) -> Response:
+    """
+    Streams an export buffer to the client as an attachment.
+
+    The buffer is sent in blocks and closed, which releases its memory or temporary file,
+    once the response has been sent or the client has disconnected.
+
+    Args:
+        buffer (BinaryIO): The seekable buffer holding the export.
+        download_name (str): The file name offered to the client, which also determines the MIME type.
+
+    Returns:
+        Response: A Flask response object that sends the export as an attachment.
+    """
+    size = buffer.seek(0, os.SEEK_END)
+    buffer.seek(0)
+    response = send_file(buffer, as_attachment=True, download_name=download_name)
+    response.content_length = size
+    return response
@@ -1,7 +1,13 @@
 import os
 from typing import Tuple
-from flask import Blueprint, request, jsonify, send_file, Response
-from src.routes.services.hdf5_service import export_orders_to_hdf5, import_orders_from_hdf5
+from flask import Blueprint, request, jsonify, Response, current_app
+from src.routes.endpoints.downloads import send_export
+from src.routes.endpoints.job_endpoints import job_accepted_response, save_upload_for_job
+from src.routes.endpoints.query_args import bool_arg, choice_arg, datetime_arg
+from src.routes.services.format_backends import get_backend
+from src.routes.services.import_pipeline import import_orders_from_hdf5_pipeline
+from src.routes.services.job_service import JobLimitExceeded, submit_job
+from src.routes.services.repository import get_changes_window
 
 hdf5_bp = Blueprint('hdf5', __name__)
 
@@ -11,15 +17,46 @@ def export_orders_to_hdf5_endpoint() -> Response | Tuple[Response, int]:
     """
     API endpoint to export orders to an HDF5 file.
 
-    This endpoint calls the export_orders_to_hdf5 function to create the HDF5 file,
-    then sends the file as an attachment for download.
+    This endpoint calls the export_orders_to_hdf5 function to stream the orders into a chunked HDF5 file
+    in a per-request spooled buffer, then streams the buffer as an attachment and discards it.
+    The 'compression' query parameter ('gzip', 'lzf' or 'none') overrides the configured HDF5_COMPRESSION.
+    With 'since', only the orders changed after that watermark are exported. The 'X-Watermark' header
+    holds the watermark of the next delta export.
+
+    With 'async=true', the export runs as a background job instead: the response is '202 Accepted'
+    with the job details, and the file is downloaded from the job once it has completed.
 
     Returns:
         Response: A Flask response object that sends the HDF5 file as an attachment.
     """
     try:
-        file_path = export_orders_to_hdf5()
-        return send_file(file_path, as_attachment=True, download_name=os.path.basename(file_path))
+        hdf5_service = get_backend('hdf5')
+        compression = choice_arg('compression', hdf5_service.COMPRESSIONS + ('none',),
+                                 default=current_app.config['HDF5_COMPRESSION'])
+        since, until, watermark = get_changes_window(datetime_arg('since'), current_app.config['EXPORT_WATERMARK_LAG'])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except ImportError as e:
+        return jsonify({"error": str(e)}), 500
+
+    try:
+        block_size = current_app.config['EXPORT_BATCH_SIZE']
+        compression = None if compression == 'none' else compression
+        if bool_arg('async'):
+            response, status = job_accepted_response(submit_job('export_hdf5', {
+                'batch_size': block_size, 'compression': compression, 'since': since and since.isoformat(),
+                'until': until and until.isoformat(), 'watermark': watermark.isoformat()
+            }))
+        else:
+            buffer = hdf5_service.export_orders_to_hdf5(block_size=block_size, compression=compression, since=since,
+                                                        until=until,
+                                                        spool_max_size=current_app.config['EXPORT_SPOOL_MAX_SIZE'])
+            response = send_export(buffer, 'orders.hdf5')
+            status = 200
+        response.headers['X-Watermark'] = watermark.isoformat()
+        return response, status
+    except JobLimitExceeded as e:
+        return jsonify({"error": str(e)}), 429
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -30,18 +67,37 @@ def import_orders_from_hdf5_endpoint() -> Tuple[Response, int]:
     API endpoint to import orders from an HDF5 file.
 
     This endpoint reads the HDF5 file from the request, saves it to the 'uploads' directory,
-    and calls the import_orders_from_hdf5 function to import the orders.
+    and calls the import_orders_from_hdf5 function to upsert the orders in batches.
+
+    With 'pipeline=true', row slices are parsed on IMPORT_PIPELINE_WORKERS worker processes
+    while the orders are written, see import_orders_from_hdf5_pipeline.
+
+    With 'async=true', the import runs as a background job instead: the response is '202 Accepted'
+    with the job details, and the result is available from the job once it has completed.
 
     Returns:
-        Tuple[Response, int]: A Flask response object with a success message.
+        Tuple[Response, int]: A Flask response object with a success message and the number of
+        inserted, updated, unchanged and rejected orders.
     """
     try:
         file = request.files['file']
+        batch_size = current_app.config['IMPORT_BATCH_SIZE']
+        pipeline_workers = current_app.config['IMPORT_PIPELINE_WORKERS'] if bool_arg('pipeline') else None
+        if bool_arg('async'):
+            file_path = save_upload_for_job(file)
+            return job_accepted_response(submit_job('import_hdf5', {
+                'file_path': file_path, 'batch_size': batch_size, 'pipeline_workers': pipeline_workers
+            }))
         file_path = os.path.join('uploads', file.filename)
         if not os.path.exists('uploads'):
             os.makedirs('uploads')
         file.save(file_path)
-        import_orders_from_hdf5(file_path)
-        return jsonify({"message": "Orders imported successfully"}), 200
+        if pipeline_workers is not None:
+            result = import_orders_from_hdf5_pipeline(file_path, batch_size=batch_size, workers=pipeline_workers)
+        else:
+            result = get_backend('hdf5').import_orders_from_hdf5(file_path, batch_size=batch_size)
+        return jsonify({"message": "Orders imported successfully", **result}), 200
+    except JobLimitExceeded as e:
+        return jsonify({"error": str(e)}), 429
     except Exception as e:
         return jsonify({"error": str(e)}), 500
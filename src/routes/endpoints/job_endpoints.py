@@ -0,0 +1,103 @@
+import os
+import uuid
+from typing import Tuple
+from flask import Blueprint, jsonify, send_file, url_for, Response
+from werkzeug.datastructures import FileStorage
+from werkzeug.utils import secure_filename
+from src.database.models import Job
+from src.routes.services.job_service import ARTIFACT_NAMES, cancel_job, get_job
+
+job_bp = Blueprint('jobs', __name__)
+
+
+def job_accepted_response(job: Job) -> Tuple[Response, int]:
+    """
+    Builds the response for a job submitted to run in the background.
+
+    Args:
+        job (Job): The submitted job.
+
+    Returns:
+        Tuple[Response, int]: A Flask response object with the job details, a 'Location' header
+        pointing to the job status endpoint, and the 202 status code.
+    """
+    response = jsonify(job.to_dict())
+    response.headers['Location'] = url_for('api_orders.jobs.get_job_endpoint', job_id=job.id)
+    return response, 202
+
+
+def save_upload_for_job(file: FileStorage) -> str:
+    """
+    Saves an uploaded file to the 'uploads' directory under a unique name, for an import job to read later.
+
+    Args:
+        file (FileStorage): The uploaded file.
+
+    Returns:
+        str: The path of the saved file.
+    """
+    if not os.path.exists('uploads'):
+        os.makedirs('uploads')
+    file_path = os.path.join('uploads', f'{uuid.uuid4().hex}_{secure_filename(file.filename)}')
+    file.save(file_path)
+    return file_path
+
+
+@job_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job_endpoint(job_id: str) -> Tuple[Response, int]:
+    """
+    API endpoint to retrieve the status and progress of a background job.
+
+    Args:
+        job_id (str): The ID of the job.
+
+    Returns:
+        Tuple[Response, int]: A Flask response object with the job details or an error message.
+    """
+    try:
+        job = get_job(job_id)
+        return jsonify(job.to_dict()), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+
+
+@job_bp.route('/jobs/<job_id>/download', methods=['GET'])
+def download_job_artifact_endpoint(job_id: str) -> Response | Tuple[Response, int]:
+    """
+    API endpoint to download the file produced by a completed export or report job.
+
+    Args:
+        job_id (str): The ID of the job.
+
+    Returns:
+        Response: A Flask response object that sends the artifact as an attachment, or an error message
+        if the job does not exist or has no artifact (yet).
+    """
+    try:
+        job = get_job(job_id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+
+    if job.status != 'completed' or job.artifact_path is None or not os.path.exists(job.artifact_path):
+        return jsonify({"error": f"Job {job_id} has no artifact to download", "status": job.status}), 409
+    return send_file(job.artifact_path, as_attachment=True, download_name=ARTIFACT_NAMES[job.kind])
+
+
+@job_bp.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job_endpoint(job_id: str) -> Tuple[Response, int]:
+    """
+    API endpoint to cancel a background job.
+
+    A queued job is cancelled immediately; a running job stops at its next progress report.
+
+    Args:
+        job_id (str): The ID of the job.
+
+    Returns:
+        Tuple[Response, int]: A Flask response object with the job details or an error message.
+    """
+    try:
+        job = cancel_job(job_id)
+        return jsonify(job.to_dict()), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
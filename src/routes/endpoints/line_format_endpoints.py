@@ -0,0 +1,77 @@
+import itertools
+from typing import Tuple
+from flask import Blueprint, request, jsonify, Response, current_app, stream_with_context
+from src.routes.endpoints.query_args import choice_arg, datetime_arg
+from src.routes.services.line_format_service import gzip_chunks, import_orders_from_lines, iter_orders_lines
+from src.routes.services.repository import get_changes_window
+
+lines_bp = Blueprint('lines', __name__)
+
+MIMETYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+@lines_bp.route('/orders/export/<any(csv, ndjson):format>', methods=['GET'])
+def export_orders_to_lines_endpoint(format: str) -> Response | Tuple[Response, int]:
+    """
+    API endpoint to export orders to a CSV or NDJSON file.
+
+    The document is generated while it is sent: orders are read from a server-side database cursor,
+    encoded batch by batch and, with 'compression=gzip', compressed on the fly, so neither the server
+    nor a buffer ever holds the whole export. The first batch is produced before the response starts,
+    so database errors are still reported as a JSON error. With 'since', only the orders changed after
+    that watermark are exported. The 'X-Watermark' header holds the watermark of the next delta export.
+
+    Args:
+        format (str): The format of the file, 'csv' or 'ndjson'.
+
+    Returns:
+        Response: A Flask response object that streams the file as an attachment.
+    """
+    try:
+        compression = choice_arg('compression', ('gzip', 'none'), default='none')
+        since, until, watermark = get_changes_window(datetime_arg('since'), current_app.config['EXPORT_WATERMARK_LAG'])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        chunks = iter_orders_lines(format, batch_size=current_app.config['EXPORT_BATCH_SIZE'], since=since,
+                                   until=until)
+        download_name = f'orders.{format}'
+        mimetype = MIMETYPES[format]
+        if compression == 'gzip':
+            chunks = gzip_chunks(chunks, level=current_app.config['EXPORT_GZIP_LEVEL'])
+            download_name += '.gz'
+            mimetype = 'application/gzip'
+        first = next(chunks, b'')
+        response = Response(stream_with_context(itertools.chain([first], chunks)), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename={download_name}'
+        response.headers['X-Watermark'] = watermark.isoformat()
+        return response, 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@lines_bp.route('/orders/import/<any(csv, ndjson):format>', methods=['POST'])
+def import_orders_from_lines_endpoint(format: str) -> Tuple[Response, int]:
+    """
+    API endpoint to import orders from a CSV or NDJSON file.
+
+    The document is either uploaded as the 'file' field of a multipart form or sent as the raw request body,
+    and may be gzip-compressed. It is read straight from the request, without being saved, and the orders
+    are committed in batches, see import_orders_from_lines.
+
+    Args:
+        format (str): The format of the file, 'csv' or 'ndjson'.
+
+    Returns:
+        Tuple[Response, int]: A Flask response object with a success message and the number of
+        inserted, updated, unchanged and rejected orders.
+    """
+    try:
+        stream = request.files['file'].stream if 'file' in request.files else request.stream
+        result = import_orders_from_lines(stream, format, batch_size=current_app.config['IMPORT_BATCH_SIZE'])
+        return jsonify({"message": "Orders imported successfully", **result}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,48 @@
+from typing import Tuple
+from flask import Blueprint, jsonify, Response
+from src.database.db import get_pool_status
+from src.metrics import get_metrics, render_metrics
+from src.routes.services.order_cache import get_order_cache
+
+monitoring_bp = Blueprint('monitoring', __name__)
+
+
+@monitoring_bp.route('/monitoring/pool', methods=['GET'])
+def get_pool_status_endpoint() -> Tuple[Response, int]:
+    """
+    API endpoint to retrieve statistics about the database connection pool.
+
+    This endpoint returns the pool class, its size and the number of checked in, checked out
+    and overflow connections, for monitoring pool saturation.
+
+    Returns:
+        Tuple[Response, int]: A Flask response object with the pool statistics.
+    """
+    return jsonify(get_pool_status()), 200
+
+
+@monitoring_bp.route('/monitoring/cache', methods=['GET'])
+def get_cache_stats_endpoint() -> Tuple[Response, int]:
+    """
+    API endpoint to retrieve statistics about the order cache.
+
+    This endpoint returns the number of cache hits and misses, the hit ratio and the number of cached orders.
+
+    Returns:
+        Tuple[Response, int]: A Flask response object with the cache statistics.
+    """
+    return jsonify(get_order_cache().stats()), 200
+
+
+@monitoring_bp.route('/metrics', methods=['GET'])
+def get_metrics_endpoint() -> Response | Tuple[Response, int]:
+    """
+    API endpoint to retrieve the request, SQL and connection pool metrics in the Prometheus text format.
+
+    Returns:
+        Response | Tuple[Response, int]: A Flask response object with the metrics exposition,
+        or an error message if metrics are disabled.
+    """
+    if get_metrics() is None:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
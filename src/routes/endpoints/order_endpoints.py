@@ -1,8 +1,13 @@
-from typing import Tuple
-from flask import Blueprint, request, jsonify, Response
-from src.routes.services.repository import add_order, get_orders, get_order, edit_order, delete_order, update_status
+import itertools
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+from flask import Blueprint, request, jsonify, Response, current_app, stream_with_context, url_for
+from src.routes.services.repository import (ORDER_FIELDS, ORDER_SORTS, add_order, get_order_rows, iter_order_rows,
+                                            get_order_dict, edit_order, delete_order, order_columns, update_status)
+from src.routes.endpoints.query_args import int_arg, bool_arg, choice_arg, datetime_arg, list_arg
+from src.routes.services.bulk_order_service import bulk_create_orders, iter_ndjson_records
 from src.schemas.orders import OrderSchema
 from pydantic import ValidationError
+from sqlalchemy import Row
 
 crud_bp = Blueprint('crud', __name__)
 
@@ -29,39 +34,197 @@ def add_order_endpoint() -> Tuple[Response, int]:
         return jsonify({"error": str(e)}), 404
 
 
+@crud_bp.route('/orders/bulk', methods=['POST'])
+def bulk_add_orders_endpoint() -> Tuple[Response, int]:
+    """
+    API endpoint to add many orders at once.
+
+    The request body is either a JSON array of orders or, with the 'application/x-ndjson' content type,
+    one order per line, which is read from the request stream line by line. Orders are validated as
+    they are read and inserted in transactions of BULK_CREATE_BATCH_SIZE orders. Invalid records are
+    skipped and reported with their line number, or their 1-based position in a JSON array. If the import
+    fails part way, the error is returned with the IDs of the orders already committed.
+
+    Returns:
+        Tuple[Response, int]: A Flask response object with the IDs of the created orders and the
+        validation errors, or an error message.
+    """
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        records = iter_ndjson_records(request.stream)
+    else:
+        data = request.get_json(silent=True)
+        if not isinstance(data, list):
+            return jsonify({"error": "Request body must be a JSON array or NDJSON"}), 400
+        records = enumerate(data, start=1)
+
+    try:
+        result = bulk_create_orders(records, batch_size=current_app.config['BULK_CREATE_BATCH_SIZE'])
+        if 'error' in result:
+            return jsonify(result), 500
+        return jsonify(result), 201 if result['created_count'] else 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def fields_arg() -> Tuple[str, ...]:
+    """
+    Reads the 'fields' projection query parameter.
+
+    Returns:
+        Tuple[str, ...]: The requested fields without duplicates, or all ORDER_FIELDS if none were requested.
+
+    Raises:
+        ValueError: If a requested field is not supported.
+    """
+    fields = tuple(dict.fromkeys(list_arg('fields'))) or ORDER_FIELDS
+    order_columns(fields)
+    return fields
+
+
+def order_list_args() -> Dict[str, Any]:
+    """
+    Reads the filter and sort query parameters of the order list.
+
+    Returns:
+        Dict[str, Any]: The 'sort' order and the 'statuses', 'date_from', 'date_to' and 'name_prefix' filters.
+
+    Raises:
+        ValueError: If a parameter is invalid.
+    """
+    return {
+        'sort': choice_arg('sort', ORDER_SORTS, default='id'),
+        'statuses': list_arg('status'),
+        'date_from': datetime_arg('date_from'),
+        'date_to': datetime_arg('date_to'),
+        'name_prefix': request.args.get('name_prefix') or None
+    }
+
+
+def orders_page_response(rows: Sequence[Row], fields: Sequence[str], limit: int) -> Response:
+    """
+    Builds the response holding a page of the order list.
+
+    Args:
+        rows (Sequence[Row]): The rows of the page, with one extra row if more orders are available.
+        fields (Sequence[str]): The fields of each order.
+        limit (int): The page size.
+
+    Returns:
+        Response: The JSON response, with the 'Link' and 'X-Next-Cursor' headers if more orders are available.
+    """
+    response = jsonify([dict(zip(fields, row)) for row in rows[:limit]])
+    if len(rows) > limit:
+        next_cursor = rows[limit - 1].id
+        next_url = url_for('.get_orders_endpoint', **{**request.args.to_dict(flat=False), 'limit': limit,
+                                                      'after_id': next_cursor})
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+        response.headers['X-Next-Cursor'] = str(next_cursor)
+    return response
+
+
+def _stream_orders_json(fields: Sequence[str], after_id: Optional[int], batch_size: int,
+                        list_args: Dict[str, Any]) -> Iterator[str]:
+    """
+    Yields all orders as chunks of a JSON array.
+
+    Orders are serialized straight from the rows as they come off the database cursor, one chunk
+    per batch, so the full result set is never held in memory.
+
+    Args:
+        fields (Sequence[str]): The fields of each order to stream.
+        after_id (Optional[int]): Only orders with an ID greater than this are streamed.
+        batch_size (int): The number of orders fetched and written per chunk.
+        list_args (Dict[str, Any]): The sort order and filters of the order list.
+
+    Yields:
+        str: The next chunk of the JSON array.
+    """
+    dumps = current_app.json.dumps
+    chunk = []
+    separator = '['
+    for row in iter_order_rows(fields, after_id=after_id, batch_size=batch_size, **list_args):
+        chunk.append(dumps(dict(zip(fields, row))))
+        if len(chunk) == batch_size:
+            yield separator + ','.join(chunk)
+            separator = ','
+            chunk = []
+    if chunk:
+        yield separator + ','.join(chunk)
+        separator = ','
+    yield '[]' if separator == '[' else ']'
+
+
 @crud_bp.route('/orders', methods=['GET'])
 def get_orders_endpoint() -> Tuple[Response, int]:
     """
-    API endpoint to retrieve all orders.
+    API endpoint to retrieve orders.
+
+    By default, this endpoint returns a single page of orders using keyset pagination.
+    The page size is set with the 'limit' query parameter and the page start with 'after_id'.
+    If more orders are available, the response carries a 'Link' header with rel="next"
+    and an 'X-Next-Cursor' header holding the 'after_id' of the next page.
+
+    Orders are filtered with the 'status' (repeated or comma-separated), 'date_from', 'date_to' and
+    'name_prefix' query parameters and sorted with 'sort' (one of ORDER_SORTS), all in SQL.
 
-    This endpoint fetches all orders from the database and returns them as a JSON response.
+    With 'stream=true', all orders after 'after_id' are streamed as a single JSON array
+    straight from a server-side database cursor. The first chunk is produced before the
+    response starts, so invalid arguments are still reported as a JSON error.
+
+    The 'fields' query parameter (comma-separated) projects each order onto the given fields. Only
+    those columns, plus the ID used as the pagination cursor, are selected, and the orders are
+    serialized straight from the rows without building ORM objects.
 
     Returns:
-        Tuple[Response, int]: A Flask response object with the list of orders.
+        Tuple[Response, int]: A Flask response object with the list of orders or an error message.
     """
-    response = get_orders()
-    orders = [order.to_dict() for order in response]
-    return jsonify(orders), 200
+    try:
+        after_id = int_arg('after_id', minimum=0)
+        fields = fields_arg()
+        list_args = order_list_args()
+        if bool_arg('stream'):
+            batch_size = current_app.config['ORDERS_STREAM_BATCH_SIZE']
+            chunks = _stream_orders_json(fields, after_id, batch_size, list_args)
+            # The query runs on the first chunk, so its errors are reported before the response starts
+            first = next(chunks)
+            body = stream_with_context(itertools.chain([first], chunks))
+            return Response(body, mimetype='application/json'), 200
+
+        limit = int_arg('limit', default=current_app.config['ORDERS_PAGE_SIZE'], minimum=1,
+                         maximum=current_app.config['ORDERS_MAX_PAGE_SIZE'])
+        rows = get_order_rows(fields, limit=limit + 1, after_id=after_id, **list_args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return orders_page_response(rows, fields, limit), 200
 
 
 @crud_bp.route('/orders/<int:id>', methods=['GET'])
-def get_order_endpoint(id: int) -> Tuple[Response, int]:
+def get_order_endpoint(id: int) -> Response | Tuple[Response, int]:
     """
     API endpoint to retrieve a single order by its ID.
 
+    The order is read through the order cache. The response carries an 'ETag' header; a request
+    whose 'If-None-Match' header matches it gets '304 Not Modified' without a body.
+    The 'fields' query parameter (comma-separated) projects the order onto the given fields.
+
     Args:
         id (int): The ID of the order to retrieve.
 
     Returns:
-        Tuple[Response, int]: A Flask response object with the order details or an error message.
+        Response | Tuple[Response, int]: A Flask response object with the order details or an error message.
     """
     try:
-        response = get_order(id)
-        if response is None:
-            raise ValueError(f"Order with id {id} does not exist")
-        return jsonify(response.to_dict()), 200
+        fields = fields_arg()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        order = get_order_dict(id)
     except ValueError as e:
         return jsonify({"error": str(e)}), 404
+    response = jsonify({field: order[field] for field in fields})
+    response.add_etag()
+    return response.make_conditional(request)
 
 
 @crud_bp.route('/orders/<int:id>', methods=['PUT'])
@@ -110,7 +273,9 @@ def update_status_endpoint() -> Tuple[Response, int]:
     API endpoint to update the status of multiple orders.
 
     This endpoint reads the order IDs and new status from the request, updates the orders,
-    and returns the details of updated and not found orders.
+    and returns the details of updated and not found orders. If the request sets
+    'return_orders' to false, only the number of updated orders is returned instead of their details.
+    Any other value than a JSON boolean is rejected, so that e.g. "false" is not read as true.
 
     Returns:
         Tuple[Response, int]: A Flask response object with the details of updated and not found orders.
@@ -119,14 +284,18 @@ def update_status_endpoint() -> Tuple[Response, int]:
         data = request.get_json()
         order_ids = data['order_ids']
         new_status = data['status']
-        result = update_status(order_ids, new_status)
+        return_orders = data.get('return_orders', True)
+        if not isinstance(return_orders, bool):
+            return jsonify({"error": "'return_orders' must be a JSON boolean"}), 400
+        result = update_status(order_ids, new_status, return_orders=return_orders)
 
-        updated_orders = [order.to_dict() for order in result["updated_orders"]]
-        not_found_orders = result["not_found_orders"]
+        response = {
+            "updated_count": result["updated_count"],
+            "not_found_orders": result["not_found_orders"]
+        }
+        if return_orders:
+            response["updated_orders"] = [order.to_dict() for order in result["updated_orders"]]
 
-        return jsonify({
-            "updated_orders": updated_orders,
-            "not_found_orders": not_found_orders
-        }), 200
+        return jsonify(response), 200
     except ValidationError as e:
         return jsonify(e.errors()), 400
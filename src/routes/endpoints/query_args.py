@@ -0,0 +1,120 @@
+"""
+This module provides helpers for reading and validating query string parameters of the current request.
+
+Functions:
+    int_arg(name, default, minimum, maximum): Reads an integer query parameter.
+    bool_arg(name): Reads a boolean flag from the query string.
+    datetime_arg(name): Reads an ISO 8601 date or datetime query parameter.
+    choice_arg(name, choices, default): Reads a query parameter restricted to a set of values.
+    list_arg(name): Reads a repeated or comma-separated query parameter.
+
+Usage:
+    Import these helpers in endpoint modules and turn the ValueError they raise into a 400 response.
+"""
+
+from datetime import datetime
+from typing import Iterable, List, Optional
+from flask import request
+
+
+def int_arg(name: str, default: Optional[int] = None, minimum: Optional[int] = None,
+            maximum: Optional[int] = None) -> Optional[int]:
+    """
+    Reads an integer query parameter from the current request.
+
+    Args:
+        name (str): The name of the query parameter.
+        default (Optional[int]): The value returned when the parameter is missing. Defaults to None.
+        minimum (Optional[int]): The smallest accepted value. Defaults to None.
+        maximum (Optional[int]): The largest accepted value. Defaults to None.
+
+    Returns:
+        Optional[int]: The parsed value, or the default if the parameter is missing.
+
+    Raises:
+        ValueError: If the parameter is not an integer or is out of range.
+    """
+    raw = request.args.get(name)
+    if raw is None or raw == '':
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"Query parameter '{name}' must be an integer")
+    if minimum is not None and value < minimum:
+        raise ValueError(f"Query parameter '{name}' must be at least {minimum}")
+    if maximum is not None and value > maximum:
+        raise ValueError(f"Query parameter '{name}' must be at most {maximum}")
+    return value
+
+
+def bool_arg(name: str) -> bool:
+    """
+    Reads a boolean flag from the query string of the current request.
+
+    Args:
+        name (str): The name of the query parameter.
+
+    Returns:
+        bool: True if the parameter is set to '1', 'true' or 'yes', else False.
+    """
+    return request.args.get(name, '').lower() in ('1', 'true', 'yes')
+
+
+def datetime_arg(name: str) -> Optional[datetime]:
+    """
+    Reads an ISO 8601 date or datetime query parameter from the current request.
+
+    Args:
+        name (str): The name of the query parameter.
+
+    Returns:
+        Optional[datetime]: The parsed value, or None if the parameter is missing.
+
+    Raises:
+        ValueError: If the parameter is not a valid ISO 8601 date or datetime.
+    """
+    raw = request.args.get(name)
+    if raw is None or raw == '':
+        return None
+    try:
+        return datetime.fromisoformat(raw)
+    except ValueError:
+        raise ValueError(f"Query parameter '{name}' must be an ISO 8601 date or datetime")
+
+
+def choice_arg(name: str, choices: Iterable[str], default: Optional[str] = None) -> Optional[str]:
+    """
+    Reads a query parameter whose value must be one of the given choices.
+
+    Args:
+        name (str): The name of the query parameter.
+        choices (Iterable[str]): The accepted values.
+        default (Optional[str]): The value returned when the parameter is missing. Defaults to None.
+
+    Returns:
+        Optional[str]: The parameter value, or the default if the parameter is missing.
+
+    Raises:
+        ValueError: If the parameter is not one of the accepted values.
+    """
+    raw = request.args.get(name)
+    if raw is None or raw == '':
+        return default
+    choices = tuple(choices)
+    if raw not in choices:
+        raise ValueError(f"Query parameter '{name}' must be one of: {', '.join(choices)}")
+    return raw
+
+
+def list_arg(name: str) -> List[str]:
+    """
+    Reads a query parameter that may be repeated or hold comma-separated values.
+
+    Args:
+        name (str): The name of the query parameter.
+
+    Returns:
+        List[str]: The non-empty values, in the order given.
+    """
+    return [value.strip() for raw in request.args.getlist(name) for value in raw.split(',') if value.strip()]
@@ -1,7 +1,13 @@
 from typing import Tuple
-from flask import Blueprint, jsonify, send_file, Response
-from src.routes.services.order_statistic_service import get_order_statistics
-from src.routes.services.report_service import generate_report_xlsx
+from flask import Blueprint, jsonify, Response, current_app
+from src.routes.endpoints.downloads import send_export
+from src.routes.endpoints.job_endpoints import job_accepted_response
+from src.routes.endpoints.query_args import bool_arg, choice_arg, datetime_arg
+from src.routes.services.format_backends import get_backend
+from src.routes.services.job_service import JobLimitExceeded, submit_job
+from src.routes.services.order_statistic_service import (PERIODS, get_order_statistics, get_order_statistics_by_period,
+                                                         get_creation_date_range_by_status)
+from src.routes.services.rollup_service import GRANULARITIES, get_order_timeseries
 
 report_bp = Blueprint('reports', __name__)
 
@@ -11,14 +17,59 @@ def get_order_statistics_endpoint() -> Tuple[Response, int]:
     """
     API endpoint to retrieve statistics about the orders.
 
-    This endpoint returns statistics such as the count of each status.
+    This endpoint returns statistics such as the count of each status. Additional dimensions
+    can be requested with query parameters:
+        - 'period' ('day', 'week' or 'month'): the count of each status per period.
+        - 'date_range' (bool): the oldest and newest creation date of the orders in each status.
+    Both are restricted to the creation date range given by 'date_from' (inclusive) and 'date_to' (exclusive).
+    When any dimension is requested, the status counts are returned under the 'status_counts' key.
 
     Returns:
         Tuple[Response, int]: A Flask response object with the order statistics.
     """
+    try:
+        period = choice_arg('period', PERIODS)
+        with_date_range = bool_arg('date_range')
+        date_from = datetime_arg('date_from')
+        date_to = datetime_arg('date_to')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         statistics = get_order_statistics()
-        return jsonify(statistics), 200
+        if period is None and not with_date_range:
+            return jsonify(statistics), 200
+
+        response = {"status_counts": statistics}
+        if period is not None:
+            response["period_counts"] = get_order_statistics_by_period(period, date_from, date_to)
+        if with_date_range:
+            response["date_range"] = get_creation_date_range_by_status(date_from, date_to)
+        return jsonify(response), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@report_bp.route('/orders/statistics/timeseries', methods=['GET'])
+def get_order_timeseries_endpoint() -> Tuple[Response, int]:
+    """
+    API endpoint to retrieve the number of orders created per hour, day or week, by status.
+
+    The counts are read from the hourly rollup counters, restricted to the hours from the one holding 'from'
+    (inclusive) up to 'to' (exclusive), and summed per 'granularity' ('hour', 'day' or 'week', default 'day').
+
+    Returns:
+        Tuple[Response, int]: A Flask response object mapping the start of each period to its status counts.
+    """
+    try:
+        granularity = choice_arg('granularity', GRANULARITIES, default='day')
+        date_from = datetime_arg('from')
+        date_to = datetime_arg('to')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        return jsonify(get_order_timeseries(granularity, date_from, date_to)), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -28,14 +79,23 @@ def generate_report_endpoint() -> Response | Tuple[Response, int]:
     """
     API endpoint to generate an XLSX report containing all orders in the system.
 
-    This endpoint calls the generate_report_xlsx function to create the report,
-    then sends the report file as an attachment for download.
+    This endpoint calls the generate_report_xlsx function to stream the orders into a write-only
+    workbook in a per-request spooled buffer, then streams the buffer as an attachment and discards it.
+
+    With 'async=true', the report is generated as a background job instead: the response is '202 Accepted'
+    with the job details, and the report is downloaded from the job once it has completed.
 
     Returns:
         Response: A Flask response object that sends the XLSX report as an attachment.
     """
     try:
-        report_path = generate_report_xlsx()
-        return send_file(report_path, as_attachment=True, download_name='orders_report.xlsx')
+        batch_size = current_app.config['EXPORT_BATCH_SIZE']
+        if bool_arg('async'):
+            return job_accepted_response(submit_job('report', {'batch_size': batch_size}))
+        buffer = get_backend('xlsx').generate_report_xlsx(batch_size=batch_size,
+                                                          spool_max_size=current_app.config['EXPORT_SPOOL_MAX_SIZE'])
+        return send_export(buffer, 'orders_report.xlsx')
+    except JobLimitExceeded as e:
+        return jsonify({"error": str(e)}), 429
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -0,0 +1,151 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.models import Order
+from src.routes.services.order_cache import get_order_cache, mark_orders_changed
+from src.routes.services.repository import order_columns, orders_query
+from src.routes.services.rollup_service import apply_rollup_deltas
+from src.routes.services.status_count_service import apply_status_deltas
+from src.schemas.orders import OrderSchema
+
+
+async def add_order(db: AsyncSession, order: OrderSchema) -> Order:
+    """
+    Adds a new order to the database; the asyncio variant of repository.add_order.
+
+    Args:
+        db (AsyncSession): The database session.
+        order (OrderSchema): The order details to be added.
+
+    Returns:
+        Order: The newly created order object.
+    """
+    now = datetime.utcnow()
+    new_order = Order(
+        name=order.name,
+        description=order.description,
+        status=order.status,
+        creation_date=order.creation_date or now,
+        updated_at=now
+    )
+    db.add(new_order)
+    await db.run_sync(apply_status_deltas, {new_order.status: 1})
+    await db.run_sync(apply_rollup_deltas, {(new_order.creation_date, new_order.status): 1})
+    await db.commit()
+    await db.refresh(new_order)
+    return new_order
+
+
+async def get_order_rows(db: AsyncSession, fields: Optional[Sequence[str]] = None, limit: Optional[int] = None,
+                         after_id: Optional[int] = None, sort: str = 'id', **filters: Any) -> List[Row]:
+    """
+    Retrieves a page of orders as plain rows holding only the requested columns; the asyncio variant
+    of repository.get_order_rows.
+
+    Args:
+        db (AsyncSession): The database session.
+        fields (Optional[Sequence[str]]): The requested fields. Defaults to None (all fields).
+        limit (Optional[int]): The maximum number of orders to return. Defaults to None (no limit).
+        after_id (Optional[int]): Only orders after the order with this ID in the sort order are returned.
+                                  Defaults to None.
+        sort (str): The sort order, one of ORDER_SORTS. Defaults to 'id'.
+        **filters (Any): 'statuses', 'date_from', 'date_to', 'name_prefix', 'updated_after' and 'updated_until'
+                         filters.
+
+    Returns:
+        List[Row]: The rows, with the columns returned by order_columns.
+
+    Raises:
+        ValueError: If a field or the sort order is not supported or the cursor order does not exist.
+    """
+    query = await db.run_sync(orders_query, *order_columns(fields), after_id=after_id, sort=sort, **filters)
+    if limit is not None:
+        query = query.limit(limit)
+    return (await db.execute(query)).all()
+
+
+async def get_order_dict(db: AsyncSession, id: int) -> Dict[str, Any]:
+    """
+    Retrieves a single order by its ID as a dictionary, reading through the order cache; the asyncio
+    variant of repository.get_order_dict.
+
+    Args:
+        db (AsyncSession): The database session.
+        id (int): The ID of the order to retrieve.
+
+    Returns:
+        Dict[str, Any]: A dictionary representation of the order.
+
+    Raises:
+        ValueError: If the order with the given ID does not exist.
+    """
+    cache = get_order_cache()
+    order = cache.get(id) if cache is not None else None
+    if order is None:
+        version = cache.version if cache is not None else None
+        row = (await db.execute(select(*order_columns()).where(Order.id == id))).first()
+        if row is None:
+            raise ValueError(f'Order {id} not found')
+        order = row._asdict()
+        if cache is not None:
+            cache.set(id, order, version)
+    return order
+
+
+async def edit_order(db: AsyncSession, id: int, updated_order: OrderSchema) -> Order:
+    """
+    Edits an existing order with the provided updated order details; the asyncio variant of
+    repository.edit_order.
+
+    Args:
+        db (AsyncSession): The database session.
+        id (int): The ID of the order to be edited.
+        updated_order (OrderSchema): The updated order details.
+
+    Returns:
+        Order: The updated order object.
+
+    Raises:
+        ValueError: If the order with the given ID does not exist.
+    """
+    order = await db.get(Order, id)
+    if order is None:
+        raise ValueError(f'Order {id} not found')
+    if order.status != updated_order.status:
+        await db.run_sync(apply_status_deltas, {order.status: -1, updated_order.status: 1})
+        await db.run_sync(apply_rollup_deltas, {(order.creation_date, order.status): -1,
+                                                (order.creation_date, updated_order.status): 1})
+    order.name = updated_order.name
+    order.description = updated_order.description
+    order.status = updated_order.status
+    order.updated_at = datetime.utcnow()
+    mark_orders_changed(db.sync_session, [id])
+    await db.commit()
+    await db.refresh(order)
+    return order
+
+
+async def delete_order(db: AsyncSession, id: int) -> Order:
+    """
+    Deletes an order by its ID; the asyncio variant of repository.delete_order.
+
+    Args:
+        db (AsyncSession): The database session.
+        id (int): The ID of the order to delete.
+
+    Returns:
+        Order: The deleted order object.
+
+    Raises:
+        ValueError: If the order with the given ID does not exist.
+    """
+    order = await db.get(Order, id)
+    if order is None:
+        raise ValueError(f'Order {id} not found')
+    await db.delete(order)
+    await db.run_sync(apply_status_deltas, {order.status: -1})
+    await db.run_sync(apply_rollup_deltas, {(order.creation_date, order.status): -1})
+    mark_orders_changed(db.sync_session, [id])
+    await db.commit()
+    return order
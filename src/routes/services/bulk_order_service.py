@@ -0,0 +1,133 @@
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from pydantic import ValidationError
+
+from src.database.db import get_session
+from src.database.models import Order
+from src.routes.services.repository import add_orders
+from src.schemas.orders import OrderSchema
+
+BULK_CREATE_BATCH_SIZE = 1000
+STRING_FIELDS = ('name', 'description', 'status')
+
+
+def iter_ndjson_records(lines: Iterable[bytes]) -> Iterator[Tuple[int, Any]]:
+    """
+    Decodes newline-delimited JSON, one record per line.
+
+    Blank lines are skipped. A line that is not valid JSON is yielded as its decoding error,
+    so the caller can report it and carry on with the following lines.
+
+    Args:
+        lines (Iterable[bytes]): The lines of the NDJSON document.
+
+    Yields:
+        Tuple[int, Any]: The 1-based line number and the decoded record, or the json.JSONDecodeError
+        of an invalid line.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, e
+
+
+def _validate_record(record: Any) -> OrderSchema:
+    """
+    Validates a single record of a bulk creation request.
+
+    Besides the schema, the strings are checked against the length of their column, like the file importers do,
+    so a single oversized value cannot fail the insert of its whole batch.
+
+    Args:
+        record (Any): The decoded record, or the json.JSONDecodeError of an invalid line.
+
+    Returns:
+        OrderSchema: The validated order details.
+
+    Raises:
+        ValueError: If the record is not valid JSON, not a JSON object or has strings too long for their column;
+                    the message is the error list.
+        ValidationError: If the record does not describe a valid order.
+    """
+    if isinstance(record, json.JSONDecodeError):
+        raise ValueError([{"type": "json_invalid", "msg": f"Invalid JSON: {record.msg}"}])
+    if not isinstance(record, dict):
+        raise ValueError([{"type": "dict_type", "msg": "Input should be a JSON object"}])
+    order = OrderSchema(**record)
+    errors = []
+    for field in STRING_FIELDS:
+        value = getattr(order, field)
+        max_length = Order.__table__.c[field].type.length
+        if value is not None and len(value) > max_length:
+            errors.append({"type": "string_too_long", "loc": [field],
+                           "msg": f"String should have at most {max_length} characters"})
+    if errors:
+        raise ValueError(errors)
+    return order
+
+
+def _insert_batch(orders: List[OrderSchema]) -> List[int]:
+    """
+    Inserts a batch of validated orders in one transaction.
+
+    Args:
+        orders (List[OrderSchema]): The orders to insert.
+
+    Returns:
+        List[int]: The IDs of the new orders.
+    """
+    db = get_session()
+    try:
+        ids = add_orders(db, orders)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return ids
+
+
+def bulk_create_orders(records: Iterable[Tuple[int, Any]],
+                       batch_size: int = BULK_CREATE_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Validates and creates orders in batches.
+
+    Records are validated as they are read. Valid orders are inserted with one multi-row insert
+    and committed every ``batch_size`` orders, so neither the request body nor the whole batch of
+    orders is held in memory. Invalid records are reported and skipped without stopping the import.
+    If a batch cannot be inserted, the import stops there; the orders of the batches committed before
+    it are kept and returned along with the 'error'.
+
+    Args:
+        records (Iterable[Tuple[int, Any]]): The line number, or position, and decoded record of each order.
+        batch_size (int): The number of orders inserted per transaction. Defaults to BULK_CREATE_BATCH_SIZE.
+
+    Returns:
+        Dict[str, Any]: A dictionary with the 'created_count', the 'created_ids' in input order, and the
+        validation 'errors' of each rejected record by 'line', plus the 'error' that stopped the import, if any.
+    """
+    created_ids = []
+    errors = []
+    batch = []
+    try:
+        for line, record in records:
+            try:
+                batch.append(_validate_record(record))
+            except ValidationError as e:
+                errors.append({"line": line, "errors": e.errors(include_url=False, include_context=False)})
+                continue
+            except ValueError as e:
+                errors.append({"line": line, "errors": e.args[0]})
+                continue
+            if len(batch) >= batch_size:
+                created_ids.extend(_insert_batch(batch))
+                batch = []
+
+        if batch:
+            created_ids.extend(_insert_batch(batch))
+    except Exception as e:
+        return {"created_count": len(created_ids), "created_ids": created_ids, "errors": errors, "error": str(e)}
+    return {"created_count": len(created_ids), "created_ids": created_ids, "errors": errors}
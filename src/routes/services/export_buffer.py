@@ -0,0 +1,32 @@
+import tempfile
+from typing import Any, BinaryIO, Callable
+
+# Exports up to this size are kept in memory; larger ones roll over to an anonymous temporary file
+EXPORT_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+def spool_export(write: Callable[[BinaryIO], Any],
+                 max_size: int = EXPORT_SPOOL_MAX_SIZE) -> tempfile.SpooledTemporaryFile:
+    """
+    Writes an export into a new spooled buffer owned by the caller.
+
+    The buffer stays in memory until it grows beyond ``max_size`` bytes, then it moves to an unnamed
+    temporary file that is deleted when the buffer is closed. Every export gets its own buffer,
+    so concurrent exports never share a file.
+
+    Args:
+        write (Callable[[BinaryIO], Any]): Writes the export to the binary stream it is given.
+        max_size (int): The size in bytes up to which the buffer is kept in memory.
+                        Defaults to EXPORT_SPOOL_MAX_SIZE.
+
+    Returns:
+        tempfile.SpooledTemporaryFile: The buffer holding the export, positioned at its start.
+    """
+    buffer = tempfile.SpooledTemporaryFile(max_size=max_size)
+    try:
+        write(buffer)
+        buffer.seek(0)
+    except BaseException:
+        buffer.close()
+        raise
+    return buffer
@@ -0,0 +1,39 @@
+import importlib
+import sys
+from types import ModuleType
+from typing import Dict, List
+
+# The services of the file formats backed by heavy third-party libraries, by format name. They are imported
+# on the first request that needs them, so processes that never handle a format do not load its libraries.
+FORMAT_BACKENDS: Dict[str, str] = {
+    'hdf5': 'src.routes.services.hdf5_service',
+    'xlsx': 'src.routes.services.report_service'
+}
+
+
+def get_backend(format: str) -> ModuleType:
+    """
+    Returns the service module of a file format, importing it and its libraries on first use.
+
+    Args:
+        format (str): The name of the format, one of FORMAT_BACKENDS.
+
+    Returns:
+        ModuleType: The service module.
+
+    Raises:
+        ValueError: If the format has no backend.
+    """
+    if format not in FORMAT_BACKENDS:
+        raise ValueError(f"Unsupported format '{format}'")
+    return importlib.import_module(FORMAT_BACKENDS[format])
+
+
+def get_loaded_backends() -> List[str]:
+    """
+    Returns the formats whose service modules have been imported in the current process.
+
+    Returns:
+        List[str]: The names of the loaded formats.
+    """
+    return [format for format, module_name in FORMAT_BACKENDS.items() if module_name in sys.modules]
@@ -1,74 +1,331 @@
-import os
+from datetime import datetime
+from tempfile import SpooledTemporaryFile
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple, Union
 import h5py
-import pandas as pd
-from src.database.db import get_db
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from src.database.db import get_session
 from src.database.models import Order
+from src.routes.services.export_buffer import EXPORT_SPOOL_MAX_SIZE, spool_export
+from src.routes.services.repository import upsert_orders_batch
 
+EXPORT_BLOCK_SIZE = 1000
+IMPORT_BATCH_SIZE = 1000
+COMPRESSIONS = ('gzip', 'lzf')
+TIMESTAMP_UNITS = 'microseconds since 1970-01-01T00:00:00'
+STRING_COLUMNS = ('name', 'description', 'status')
 
-def export_orders_to_hdf5() -> str:
+
+def _string_dtype(column: str, fixed_width: bool) -> np.dtype:
     """
-    Export all orders to an HDF5 file.
+    Returns the UTF-8 string dtype of an HDF5 dataset for an order column.
+
+    Fixed-width strings are sized for the longest value the database column can hold,
+    which compresses well; variable-length strings take no padding but cannot be compressed.
 
-    This function retrieves all orders from the database, converts the data into a DataFrame,
-    converts datetime columns to strings, and saves the data to an HDF5 file in the 'reports' directory.
+    Args:
+        column (str): The name of the order column.
+        fixed_width (bool): Whether to use a fixed-width instead of a variable-length string.
 
     Returns:
-        str: The file path of the created HDF5 file.
+        np.dtype: The h5py string dtype.
+    """
+    if not fixed_width:
+        return h5py.string_dtype('utf-8')
+    # A UTF-8 encoded character takes up to 4 bytes
+    return h5py.string_dtype('utf-8', length=Order.__table__.c[column].type.length * 4)
+
+
+def write_orders_hdf5(file: Union[str, BinaryIO], block_size: int = EXPORT_BLOCK_SIZE,
+                      compression: Optional[str] = 'gzip', fixed_width_strings: bool = True,
+                      on_progress: Optional[Callable[[int], None]] = None, since: Optional[datetime] = None,
+                      until: Optional[datetime] = None) -> int:
     """
-    db = next(get_db())
-    orders = db.query(Order).all()
+    Write all orders, or the orders changed in a range of time, to an HDF5 file.
 
-    data = [order.to_dict() for order in orders]
-    df = pd.DataFrame(data)
+    Orders are read from a server-side database cursor in blocks of ``block_size`` rows and appended
+    to resizable, chunked datasets, one per column, so memory usage is bounded by the block size.
+    Strings are stored as UTF-8 and 'creation_date' as int64 microseconds since the Unix epoch
+    (missing dates are stored as the smallest int64, numpy's NaT).
 
-    for column in df.select_dtypes(include=['datetime64[ns]']).columns:
-        df[column] = df[column].astype(str)
+    Args:
+        file (Union[str, BinaryIO]): The path or binary stream of the HDF5 file to write.
+        block_size (int): The number of rows fetched and written at a time, and the chunk size
+                          of the datasets. Defaults to EXPORT_BLOCK_SIZE.
+        compression (Optional[str]): The compression filter, 'gzip', 'lzf' or None. Defaults to 'gzip'.
+        fixed_width_strings (bool): Whether to store strings as fixed-width instead of variable-length
+                                    strings. Defaults to True.
+        on_progress (Optional[Callable[[int], None]]): Called with the number of exported orders so far
+                                                       after each block. Defaults to None.
+        since (Optional[datetime]): Only orders changed after this are exported. Defaults to None.
+        until (Optional[datetime]): Only orders changed at or before this are exported. Defaults to None.
+
+    Returns:
+        int: The number of exported orders.
 
-    reports_dir = os.path.join(os.getcwd(), 'reports')
-    if not os.path.exists(reports_dir):
-        os.makedirs(reports_dir)
+    Raises:
+        ValueError: If the compression filter is not supported.
+    """
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(f"Unsupported compression '{compression}'")
+
+    db = get_session()
+    query = (select(Order.id, Order.name, Order.description, Order.creation_date, Order.status)
+             .order_by(Order.id)
+             .execution_options(yield_per=block_size))
+    if since is not None:
+        query = query.where(Order.updated_at > since)
+    if until is not None:
+        query = query.where(Order.updated_at <= until)
 
-    file_path = os.path.join(reports_dir, "orders.hdf5")
+    with h5py.File(file, 'w') as f:
+        dataset_options = dict(shape=(0,), maxshape=(None,), chunks=(block_size,), compression=compression)
+        datasets = {
+            'id': f.create_dataset('id', dtype='int64', **dataset_options),
+            'creation_date': f.create_dataset('creation_date', dtype='int64', **dataset_options),
+        }
+        datasets['creation_date'].attrs['units'] = TIMESTAMP_UNITS
+        for column in STRING_COLUMNS:
+            datasets[column] = f.create_dataset(column, dtype=_string_dtype(column, fixed_width_strings),
+                                                **dataset_options)
 
-    with h5py.File(file_path, 'w') as f:
-        for column in df.columns:
-            f.create_dataset(column, data=df[column].values)
+        count = 0
+        for rows in db.execute(query).partitions():
+            ids, names, descriptions, creation_dates, statuses = zip(*rows)
+            block = {
+                'id': np.array(ids, dtype='int64'),
+                'name': names,
+                'description': [description or '' for description in descriptions],
+                'creation_date': np.array(creation_dates, dtype='datetime64[us]').astype('int64'),
+                'status': statuses,
+            }
+            for column, values in block.items():
+                dataset = datasets[column]
+                dataset.resize((count + len(rows),))
+                if column in STRING_COLUMNS:
+                    values = np.array([value.encode('utf-8') for value in values], dtype=object)
+                    if fixed_width_strings:
+                        values = values.astype(dataset.dtype)
+                dataset[count:count + len(rows)] = values
+            count += len(rows)
+            if on_progress is not None:
+                on_progress(count)
 
-    return file_path
+    return count
 
 
-def import_orders_from_hdf5(file_path: str) -> None:
+def export_orders_to_hdf5(block_size: int = EXPORT_BLOCK_SIZE, compression: Optional[str] = 'gzip',
+                          fixed_width_strings: bool = True, since: Optional[datetime] = None,
+                          until: Optional[datetime] = None,
+                          spool_max_size: int = EXPORT_SPOOL_MAX_SIZE) -> SpooledTemporaryFile:
     """
-    Import orders from an HDF5 file.
+    Export all orders, or the orders changed in a range of time, to an HDF5 file in a spooled buffer.
 
-    This function reads order data from an HDF5 file, converts the data into a DataFrame,
-    decodes byte strings, converts appropriate columns back to datetime, and merges the data into the database.
+    This function streams the orders from the database in blocks into chunked, optionally compressed
+    datasets of an HDF5 file, see write_orders_hdf5 for the file layout. The file is written into a
+    buffer of its own, kept in memory up to ``spool_max_size`` bytes and in a temporary file beyond.
 
     Args:
-        file_path (str): The file path of the HDF5 file to import.
+        block_size (int): The number of rows fetched and written at a time. Defaults to EXPORT_BLOCK_SIZE.
+        compression (Optional[str]): The compression filter, 'gzip', 'lzf' or None. Defaults to 'gzip'.
+        fixed_width_strings (bool): Whether to store strings as fixed-width instead of variable-length
+                                    strings. Defaults to True.
+        since (Optional[datetime]): Only orders changed after this are exported. Defaults to None.
+        until (Optional[datetime]): Only orders changed at or before this are exported. Defaults to None.
+        spool_max_size (int): The size in bytes up to which the file is kept in memory.
+                              Defaults to EXPORT_SPOOL_MAX_SIZE.
+
+    Returns:
+        SpooledTemporaryFile: The buffer holding the HDF5 file, positioned at its start; the caller closes it.
     """
-    db = next(get_db())
+    return spool_export(lambda buffer: write_orders_hdf5(buffer, block_size=block_size, compression=compression,
+                                                         fixed_width_strings=fixed_width_strings, since=since,
+                                                         until=until),
+                        max_size=spool_max_size)
 
-    with h5py.File(file_path, 'r') as f:
-        data = {key: f[key][:] for key in f.keys()}
 
-    df = pd.DataFrame(data)
+def _read_strings(f: h5py.File, column: str, start: int, stop: int) -> np.ndarray:
+    """
+    Read a slice of a string dataset as an object array of Python strings.
+
+    Missing datasets and empty strings are read as None.
+
+    Args:
+        f (h5py.File): The open HDF5 file.
+        column (str): The name of the dataset.
+        start (int): The first row of the slice.
+        stop (int): The row after the last row of the slice.
+
+    Returns:
+        np.ndarray: The decoded strings.
+    """
+    if column not in f:
+        return np.full(stop - start, None, dtype=object)
+    values = f[column].asstr()[start:stop]
+    values[values == ''] = None
+    return values
 
-    # Convert string columns back to datetime
-    for column in df.columns:
-        if df[column].dtype == object:
+
+def _read_timestamps(f: h5py.File, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Read a slice of the 'creation_date' dataset as a datetime64[us] array.
+
+    Both int64 epoch timestamps written by write_orders_hdf5 and ISO 8601 strings written by older
+    exports are supported. Missing and unparsable dates are returned as NaT.
+
+    Args:
+        f (h5py.File): The open HDF5 file.
+        start (int): The first row of the slice.
+        stop (int): The row after the last row of the slice.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The timestamps and a boolean mask of the unparsable dates.
+    """
+    unparsable = np.zeros(stop - start, dtype=bool)
+    if 'creation_date' not in f:
+        return np.full(stop - start, np.datetime64('NaT'), dtype='datetime64[us]'), unparsable
+    dataset = f['creation_date']
+    if np.issubdtype(dataset.dtype, np.integer):
+        return dataset[start:stop].astype('int64').view('datetime64[us]'), unparsable
+
+    values = dataset.asstr()[start:stop]
+    try:
+        return values.astype('datetime64[us]'), unparsable
+    except ValueError:
+        timestamps = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[us]')
+        for index, value in enumerate(values):
             try:
-                df[column] = pd.to_datetime(df[column].astype(str), errors='ignore')
+                timestamps[index] = np.datetime64(value, 'us')
             except ValueError:
-                pass
-
-    for _, row in df.iterrows():
-        order = Order(
-            id=row['id'],
-            name=row['name'],
-            description=row['description'],
-            creation_date=row['creation_date'],
-            status=row['status']
-        )
-        db.merge(order)
-    db.commit()
+                unparsable[index] = value not in ('', 'None')
+        return timestamps, unparsable
+
+
+def _valid_strings(values: np.ndarray, column: str, required: bool) -> np.ndarray:
+    """
+    Check which strings fit into a database column.
+
+    Args:
+        values (np.ndarray): The strings to check, with None for missing values.
+        column (str): The name of the order column.
+        required (bool): Whether missing values are invalid.
+
+    Returns:
+        np.ndarray: A boolean mask of the valid values.
+    """
+    max_length = Order.__table__.c[column].type.length
+    return np.array([(not required) if value is None else len(value) <= max_length for value in values], dtype=bool)
+
+
+def read_orders_slice(f: h5py.File, start: int, stop: int) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Reads and validates a slice of the orders of an HDF5 file.
+
+    Each column is converted with its known dtype. Rows without an ID, name or status, with values
+    too long for their column, or with an unparsable creation date are rejected.
+
+    Args:
+        f (h5py.File): The open HDF5 file.
+        start (int): The index of the first row of the slice.
+        stop (int): The index after the last row of the slice.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], int]: The valid orders, as dictionaries with the keys 'id', 'name',
+        'description', 'creation_date' and 'status', and the number of rejected rows.
+    """
+    ids = f['id'][start:stop].astype('int64')
+    names = _read_strings(f, 'name', start, stop)
+    descriptions = _read_strings(f, 'description', start, stop)
+    statuses = _read_strings(f, 'status', start, stop)
+    creation_dates, unparsable_dates = _read_timestamps(f, start, stop)
+
+    valid = (_valid_strings(names, 'name', required=True)
+             & _valid_strings(descriptions, 'description', required=False)
+             & _valid_strings(statuses, 'status', required=True)
+             & ~unparsable_dates)
+
+    rows = [
+        {'id': id, 'name': name, 'description': description, 'creation_date': creation_date, 'status': status}
+        for id, name, description, creation_date, status in zip(
+            ids[valid].tolist(), names[valid], descriptions[valid], creation_dates[valid].tolist(),
+            statuses[valid])
+    ]
+    return rows, int((~valid).sum())
+
+
+def read_orders_file_slice(file_path: str, start: int, stop: int) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Reads and validates a slice of the orders of an HDF5 file given by its path, see read_orders_slice.
+
+    Args:
+        file_path (str): The file path of the HDF5 file.
+        start (int): The index of the first row of the slice.
+        stop (int): The index after the last row of the slice.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], int]: The valid orders and the number of rejected rows.
+    """
+    with h5py.File(file_path, 'r') as f:
+        return read_orders_slice(f, start, stop)
+
+
+def count_orders_hdf5(file_path: str) -> int:
+    """
+    Returns the number of orders, valid or not, in an HDF5 file.
+
+    Args:
+        file_path (str): The file path of the HDF5 file.
+
+    Returns:
+        int: The number of rows of the datasets.
+    """
+    with h5py.File(file_path, 'r') as f:
+        return len(f['id'])
+
+
+def write_orders_batch(db: Session, rows: List[Dict[str, Any]], rejected: int, result: Dict[str, int]) -> None:
+    """
+    Upserts a batch of validated orders in its own transaction and adds its counts to the import result.
+
+    Args:
+        db (Session): The database session.
+        rows (List[Dict[str, Any]]): The valid orders of the batch.
+        rejected (int): The number of rows of the batch rejected by validation.
+        result (Dict[str, int]): The running 'inserted', 'updated', 'unchanged' and 'rejected' counts.
+    """
+    upsert_orders_batch(db, rows, result)
+    result["rejected"] += rejected
+
+
+def import_orders_from_hdf5(file_path: str, batch_size: int = IMPORT_BATCH_SIZE,
+                            on_progress: Optional[Callable[[int], None]] = None) -> Dict[str, int]:
+    """
+    Import orders from an HDF5 file.
+
+    This function reads the datasets of the HDF5 file in slices of ``batch_size`` rows, converts and
+    validates them with read_orders_slice, and writes each slice with a single bulk upsert statement in
+    its own transaction. Rows identical to their stored order are counted as unchanged and not written.
+
+    Args:
+        file_path (str): The file path of the HDF5 file to import.
+        batch_size (int): The number of rows read and upserted at a time. Defaults to IMPORT_BATCH_SIZE.
+        on_progress (Optional[Callable[[int], None]]): Called with the number of processed rows so far
+                                                       after each slice. Defaults to None.
+
+    Returns:
+        Dict[str, int]: A dictionary with the number of 'inserted', 'updated', 'unchanged' and 'rejected' orders.
+    """
+    db = get_session()
+    result = {"inserted": 0, "updated": 0, "unchanged": 0, "rejected": 0}
+
+    with h5py.File(file_path, 'r') as f:
+        total = len(f['id'])
+        for start in range(0, total, batch_size):
+            stop = min(start + batch_size, total)
+            rows, rejected = read_orders_slice(f, start, stop)
+            write_orders_batch(db, rows, rejected, result)
+            if on_progress is not None:
+                on_progress(stop)
+
+    return result
@@ -0,0 +1,291 @@
+import multiprocessing
+import os
+import re
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from src.database.db import get_session
+from src.routes.services import xml_service
+from src.routes.services.format_backends import get_backend
+from src.routes.services.repository import upsert_orders_batch
+
+IMPORT_BATCH_SIZE = 1000
+# Target size of the byte ranges an XML file is split into
+PIPELINE_CHUNK_BYTES = 1024 * 1024
+SCAN_BLOCK_SIZE = 64 * 1024
+ORDER_START_TAG = b'<order>'
+ORDERS_END_TAG = b'</orders>'
+XML_DECLARATION = re.compile(rb'\s*(<\?xml[^>]*\?>)')
+
+# A parsing task: the function run by a worker and its arguments
+Task = Tuple[Callable[..., Any], tuple]
+
+
+class _InlineExecutor(Executor):
+    """
+    An executor running each task in the calling thread as soon as it is submitted.
+
+    Used when the pipeline is configured without worker processes, e.g. in tests.
+    """
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        """
+        Runs a task and returns its completed future.
+
+        Args:
+            fn (Callable[..., Any]): The task.
+            *args (Any): The positional arguments of the task.
+            **kwargs (Any): The keyword arguments of the task.
+
+        Returns:
+            Future: The future holding the result or exception of the task.
+        """
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def default_workers() -> int:
+    """
+    Returns the default number of worker processes of the pipeline.
+
+    Returns:
+        int: The number of CPUs.
+    """
+    return os.cpu_count() or 1
+
+
+def _create_executor(workers: int) -> Executor:
+    """
+    Creates the executor running the parsing stage of the pipeline.
+
+    Worker processes are spawned rather than forked, so they do not inherit the pooled database
+    connections and threads of the application.
+
+    Args:
+        workers (int): The number of worker processes; 0 parses in the calling thread.
+
+    Returns:
+        Executor: The executor.
+    """
+    if workers <= 0:
+        return _InlineExecutor()
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def run_pipeline(tasks: Iterable[Task], write: Callable[[Any], int], workers: int,
+                 max_pending: Optional[int] = None, on_progress: Optional[Callable[[int], None]] = None) -> None:
+    """
+    Runs parsing tasks on a pool of worker processes and writes their results in the calling thread.
+
+    At most ``max_pending`` tasks are submitted and not yet written at any time: once the limit is
+    reached, the next task is only submitted after the writer has consumed the oldest result. This
+    back-pressure bounds the memory held by parsed chunks when the database is slower than the parsers.
+    Results are written in submission order, so later records in the file still win over earlier ones.
+
+    Args:
+        tasks (Iterable[Task]): The parsing tasks, in file order.
+        write (Callable[[Any], int]): Writes the result of a task to the database and returns the number
+                                      of input records it covered.
+        workers (int): The number of worker processes; 0 parses in the calling thread.
+        max_pending (Optional[int]): The maximum number of tasks in flight. Defaults to None (twice the
+                                     number of workers).
+        on_progress (Optional[Callable[[int], None]]): Called with the number of processed records so far
+                                                       after each written result. Defaults to None.
+    """
+    if max_pending is None:
+        max_pending = 2 * workers
+    max_pending = max(max_pending, 1)
+    processed = 0
+    pending: Deque[Future] = deque()
+
+    def write_oldest() -> None:
+        nonlocal processed
+        processed += write(pending.popleft().result())
+        if on_progress is not None:
+            on_progress(processed)
+
+    executor = _create_executor(workers)
+    try:
+        for fn, args in tasks:
+            pending.append(executor.submit(fn, *args))
+            if len(pending) >= max_pending:
+                write_oldest()
+        while pending:
+            write_oldest()
+    except BaseException:
+        executor.shutdown(wait=True, cancel_futures=True)
+        raise
+    executor.shutdown(wait=True)
+
+
+def import_orders_from_hdf5_pipeline(file_path: str, batch_size: int = IMPORT_BATCH_SIZE,
+                                     workers: Optional[int] = None, max_pending: Optional[int] = None,
+                                     on_progress: Optional[Callable[[int], None]] = None) -> Dict[str, int]:
+    """
+    Import orders from an HDF5 file, reading and validating row slices on a pool of worker processes.
+
+    Each slice of ``batch_size`` rows is converted and validated by a worker, and the calling thread
+    upserts the valid orders of each slice in its own transaction, in file order. The result is the
+    same as that of hdf5_service.import_orders_from_hdf5.
+
+    Args:
+        file_path (str): The file path of the HDF5 file to import.
+        batch_size (int): The number of rows per slice and transaction. Defaults to IMPORT_BATCH_SIZE.
+        workers (Optional[int]): The number of worker processes. Defaults to None (the number of CPUs).
+        max_pending (Optional[int]): The maximum number of slices in flight. Defaults to None (twice the
+                                     number of workers).
+        on_progress (Optional[Callable[[int], None]]): Called with the number of processed rows so far
+                                                       after each slice. Defaults to None.
+
+    Returns:
+        Dict[str, int]: A dictionary with the number of 'inserted', 'updated', 'unchanged' and 'rejected' orders.
+    """
+    hdf5_service = get_backend('hdf5')
+    db = get_session()
+    result = {"inserted": 0, "updated": 0, "unchanged": 0, "rejected": 0}
+    total = hdf5_service.count_orders_hdf5(file_path)
+
+    def write(parsed: Tuple[List[Dict[str, Any]], int]) -> int:
+        rows, rejected = parsed
+        hdf5_service.write_orders_batch(db, rows, rejected, result)
+        return len(rows) + rejected
+
+    tasks = ((hdf5_service.read_orders_file_slice, (file_path, start, min(start + batch_size, total)))
+             for start in range(0, total, batch_size))
+    run_pipeline(tasks, write, default_workers() if workers is None else workers, max_pending, on_progress)
+    return result
+
+
+def _find(f, token: bytes, offset: int) -> int:
+    """
+    Finds the first occurrence of a token in a binary file at or after an offset.
+
+    Args:
+        f: The binary file.
+        token (bytes): The token to find.
+        offset (int): The offset the search starts at.
+
+    Returns:
+        int: The offset of the token, or -1 if it does not occur.
+    """
+    f.seek(offset)
+    position = offset
+    carry = b''
+    while True:
+        block = f.read(SCAN_BLOCK_SIZE)
+        if not block:
+            return -1
+        data = carry + block
+        index = data.find(token)
+        if index >= 0:
+            return position - len(carry) + index
+        # Keep the end of the block, in case the token spans two blocks
+        carry = data[-(len(token) - 1):]
+        position += len(block)
+
+
+def xml_chunk_ranges(file_path: str, chunk_bytes: int = PIPELINE_CHUNK_BYTES) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    Splits an XML file of orders into byte ranges of whole <order> elements.
+
+    Each range starts at an ``<order>`` start tag, the first one found at least ``chunk_bytes`` after the
+    start of the previous range, and the last range ends at the closing ``</orders>`` tag. The file is
+    expected in the layout written by the XML export: <order> elements without attributes, directly inside
+    the <orders> root element, with no ``<order>`` text in comments or CDATA sections.
+
+    Args:
+        file_path (str): The file path of the XML file.
+        chunk_bytes (int): The target size of a range in bytes. Defaults to PIPELINE_CHUNK_BYTES.
+
+    Returns:
+        Tuple[bytes, List[Tuple[int, int]]]: The XML declaration of the file, if any, and the start and
+        end offsets of the ranges.
+
+    Raises:
+        ValueError: If the file has orders but no closing </orders> tag.
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        match = XML_DECLARATION.match(f.read(SCAN_BLOCK_SIZE))
+        declaration = match.group(1) if match else b''
+        start = _find(f, ORDER_START_TAG, 0)
+        if start < 0:
+            return declaration, []
+
+        tail_start = max(size - SCAN_BLOCK_SIZE, 0)
+        f.seek(tail_start)
+        index = f.read().rfind(ORDERS_END_TAG)
+        if index < 0:
+            raise ValueError(f"{os.path.basename(file_path)} has no closing {ORDERS_END_TAG.decode()} tag")
+        end = tail_start + index
+
+        ranges = []
+        while start < end:
+            stop = _find(f, ORDER_START_TAG, start + chunk_bytes) if start + chunk_bytes < end else -1
+            stop = stop if 0 <= stop < end else end
+            ranges.append((start, stop))
+            start = stop
+    return declaration, ranges
+
+
+def _parse_xml_range(file_path: str, declaration: bytes, start: int, stop: int) -> List[Dict[str, Any]]:
+    """
+    Parses the <order> elements in a byte range of an XML file, in a worker process.
+
+    Args:
+        file_path (str): The file path of the XML file.
+        declaration (bytes): The XML declaration of the file, which carries its encoding.
+        start (int): The offset of the first <order> start tag of the range.
+        stop (int): The offset after the last </order> end tag of the range.
+
+    Returns:
+        List[Dict[str, Any]]: The orders of the range, in document order.
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(stop - start)
+    return xml_service.parse_orders_xml(declaration + b'<orders>' + data + ORDERS_END_TAG)
+
+
+def import_orders_from_xml_pipeline(file_path: str, batch_size: int = IMPORT_BATCH_SIZE,
+                                    chunk_bytes: int = PIPELINE_CHUNK_BYTES, workers: Optional[int] = None,
+                                    max_pending: Optional[int] = None,
+                                    on_progress: Optional[Callable[[int], None]] = None) -> Dict[str, int]:
+    """
+    Import orders from an XML file, parsing byte ranges of the file on a pool of worker processes.
+
+    The file is split into ranges of about ``chunk_bytes`` bytes on <order> boundaries (see xml_chunk_ranges),
+    each range is parsed by a worker, and the calling thread upserts the orders of each range in batches of
+    ``batch_size`` orders, one transaction per batch, in file order. The result is the same as that of
+    xml_service.import_orders_from_xml.
+
+    Args:
+        file_path (str): The file path of the XML file to import.
+        batch_size (int): The number of orders upserted per transaction. Defaults to IMPORT_BATCH_SIZE.
+        chunk_bytes (int): The target size of a parsed range in bytes. Defaults to PIPELINE_CHUNK_BYTES.
+        workers (Optional[int]): The number of worker processes. Defaults to None (the number of CPUs).
+        max_pending (Optional[int]): The maximum number of ranges in flight. Defaults to None (twice the
+                                     number of workers).
+        on_progress (Optional[Callable[[int], None]]): Called with the number of processed orders so far
+                                                       after each range. Defaults to None.
+
+    Returns:
+        Dict[str, int]: A dictionary with the number of 'inserted', 'updated' and 'unchanged' orders.
+    """
+    db = get_session()
+    result = {"inserted": 0, "updated": 0, "unchanged": 0}
+    declaration, ranges = xml_chunk_ranges(file_path, chunk_bytes)
+
+    def write(orders: List[Dict[str, Any]]) -> int:
+        for start in range(0, len(orders), batch_size):
+            upsert_orders_batch(db, orders[start:start + batch_size], result)
+        return len(orders)
+
+    tasks = ((_parse_xml_range, (file_path, declaration, start, stop)) for start, stop in ranges)
+    run_pipeline(tasks, write, default_workers() if workers is None else workers, max_pending, on_progress)
+    return result
@@ -0,0 +1,644 @@
+import json
+import logging
+import os
+import socket
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from flask import Flask, current_app
+from sqlalchemy import func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from src.database.db import SessionLocal, get_session
+from src.database.models import Job
+from src.routes.services.format_backends import get_backend
+from src.routes.services.import_pipeline import import_orders_from_hdf5_pipeline, import_orders_from_xml_pipeline
+from src.routes.services.status_count_service import get_status_counts
+from src.routes.services.xml_service import import_orders_from_xml, write_orders_xml
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('queued', 'running')
+# The key of the PostgreSQL advisory lock serializing job submissions
+SUBMIT_LOCK_KEY = 0x6A6F6273
+
+# File names of the artifacts produced by each kind of job
+ARTIFACT_NAMES = {
+    'export_hdf5': 'orders.hdf5',
+    'export_xml': 'orders.xml',
+    'report': 'orders_report.xlsx'
+}
+
+
+class JobLimitExceeded(Exception):
+    """
+    Raised when a job is submitted while the maximum number of queued and running jobs is reached.
+    """
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a running job when its cancellation was requested.
+    """
+
+
+class JobContext:
+    """
+    Gives a running job access to its parameters and lets it report progress.
+
+    Attributes:
+        job_id (str): The ID of the job.
+        params (dict): The parameters the job was submitted with.
+        artifact_path (Optional[str]): The path the job should write its artifact to, if it produces one.
+    """
+
+    def __init__(self, job_id: str, params: dict, artifact_path: Optional[str]):
+        self.job_id = job_id
+        self.params = params
+        self.artifact_path = artifact_path
+
+    def set_total(self, total: Optional[int]) -> None:
+        """
+        Records the total number of orders the job will process.
+
+        Args:
+            total (Optional[int]): The total number of orders, or None if unknown.
+        """
+        with SessionLocal() as db:
+            db.execute(update(Job).where(Job.id == self.job_id).values(total=total))
+            db.commit()
+
+    def report_progress(self, progress: int) -> None:
+        """
+        Records the number of orders processed so far and checks for cancellation.
+
+        Args:
+            progress (int): The number of orders processed so far.
+
+        Raises:
+            JobCancelled: If cancellation of the job was requested.
+        """
+        with SessionLocal() as db:
+            db.execute(update(Job).where(Job.id == self.job_id).values(progress=progress,
+                                                                      heartbeat_at=datetime.utcnow()))
+            cancel_requested = db.scalar(select(Job.cancel_requested).where(Job.id == self.job_id))
+            db.commit()
+        if cancel_requested:
+            raise JobCancelled(f'Job {self.job_id} was cancelled')
+
+
+def _total_orders() -> int:
+    """
+    Returns the total number of orders from the status counters.
+
+    Returns:
+        int: The number of orders.
+    """
+    return sum(get_status_counts().values())
+
+
+def _changes_window(context: JobContext) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Reads the range of changes covered by an export job and sets its total for full exports.
+
+    Args:
+        context (JobContext): The context of the running export job.
+
+    Returns:
+        Tuple[Optional[datetime], Optional[datetime]]: The 'since' and 'until' bounds of the export.
+    """
+    since, until = (context.params.get(key) for key in ('since', 'until'))
+    if since is None:
+        context.set_total(_total_orders())
+    return (datetime.fromisoformat(since) if since else None,
+            datetime.fromisoformat(until) if until else None)
+
+
+def _export_result(exported: int, context: JobContext) -> Dict[str, Any]:
+    """
+    Builds the result of an export job.
+
+    Args:
+        exported (int): The number of exported orders.
+        context (JobContext): The context of the export job.
+
+    Returns:
+        Dict[str, Any]: The number of exported orders and, if known, the watermark of the next delta export.
+    """
+    result = {'exported': exported}
+    if context.params.get('watermark'):
+        result['watermark'] = context.params['watermark']
+    return result
+
+
+def _export_hdf5(context: JobContext) -> Dict[str, Any]:
+    """
+    Exports all orders, or the orders changed since a watermark, to an HDF5 artifact.
+
+    Args:
+        context (JobContext): The context of the running job.
+
+    Returns:
+        Dict[str, Any]: The result of the job.
+    """
+    since, until = _changes_window(context)
+    exported = get_backend('hdf5').write_orders_hdf5(context.artifact_path, block_size=context.params['batch_size'],
+                                                     compression=context.params.get('compression'),
+                                                     on_progress=context.report_progress, since=since, until=until)
+    return _export_result(exported, context)
+
+
+def _export_xml(context: JobContext) -> Dict[str, Any]:
+    """
+    Exports all orders, or the orders changed since a watermark, to an XML artifact.
+
+    Args:
+        context (JobContext): The context of the running job.
+
+    Returns:
+        Dict[str, Any]: The result of the job.
+    """
+    since, until = _changes_window(context)
+    with open(context.artifact_path, 'wb') as f:
+        exported = write_orders_xml(f, batch_size=context.params['batch_size'], on_progress=context.report_progress,
+                                    since=since, until=until)
+    return _export_result(exported, context)
+
+
+def _report(context: JobContext) -> Dict[str, Any]:
+    """
+    Generates the XLSX report of all orders as an artifact.
+
+    Args:
+        context (JobContext): The context of the running job.
+
+    Returns:
+        Dict[str, Any]: The result of the job.
+    """
+    context.set_total(_total_orders())
+    exported = get_backend('xlsx').write_orders_xlsx(context.artifact_path, batch_size=context.params['batch_size'],
+                                                     on_progress=context.report_progress)
+    return {'exported': exported}
+
+
+def _import_hdf5(context: JobContext) -> Dict[str, Any]:
+    """
+    Imports orders from an uploaded HDF5 file and removes the file afterwards.
+
+    With the 'pipeline_workers' parameter set, the file is parsed on that many worker processes.
+
+    Args:
+        context (JobContext): The context of the running job.
+
+    Returns:
+        Dict[str, Any]: The result of the job.
+    """
+    file_path = context.params['file_path']
+    hdf5_service = get_backend('hdf5')
+    try:
+        context.set_total(hdf5_service.count_orders_hdf5(file_path))
+        if context.params.get('pipeline_workers') is not None:
+            return import_orders_from_hdf5_pipeline(file_path, batch_size=context.params['batch_size'],
+                                                    workers=context.params['pipeline_workers'],
+                                                    on_progress=context.report_progress)
+        return hdf5_service.import_orders_from_hdf5(file_path, batch_size=context.params['batch_size'],
+                                                    on_progress=context.report_progress)
+    finally:
+        os.remove(file_path)
+
+
+def _import_xml(context: JobContext) -> Dict[str, Any]:
+    """
+    Imports orders from an uploaded XML file and removes the file afterwards.
+
+    With the 'pipeline_workers' parameter set, the file is parsed on that many worker processes.
+
+    Args:
+        context (JobContext): The context of the running job.
+
+    Returns:
+        Dict[str, Any]: The result of the job.
+    """
+    file_path = context.params['file_path']
+    try:
+        if context.params.get('pipeline_workers') is not None:
+            return import_orders_from_xml_pipeline(file_path, batch_size=context.params['batch_size'],
+                                                   workers=context.params['pipeline_workers'],
+                                                   on_progress=context.report_progress)
+        return import_orders_from_xml(file_path, batch_size=context.params['batch_size'],
+                                      on_progress=context.report_progress)
+    finally:
+        os.remove(file_path)
+
+
+JOB_KINDS: Dict[str, Callable[[JobContext], Dict[str, Any]]] = {
+    'export_hdf5': _export_hdf5,
+    'export_xml': _export_xml,
+    'report': _report,
+    'import_hdf5': _import_hdf5,
+    'import_xml': _import_xml
+}
+
+
+class JobExecutor:
+    """
+    Runs submitted jobs on a bounded thread pool.
+
+    Jobs spend most of their time waiting on the database and on file I/O, so threads sharing the
+    application are used rather than processes. With the 'sync' executor setting, jobs run inline
+    when submitted, which is meant for tests.
+
+    Attributes:
+        app (Flask): The Flask application the jobs run in.
+        max_pending (int): The maximum number of queued and running jobs.
+        artifact_dir (str): The directory job artifacts are written to.
+        stale_timeout (float): The number of seconds without a heartbeat after which an active job is abandoned.
+        artifact_ttl (float): The number of seconds after which the artifacts of finished jobs are deleted.
+    """
+
+    def __init__(self, app: Flask):
+        self.app = app
+        self.max_pending = app.config['JOB_MAX_PENDING']
+        self.artifact_dir = app.config['JOB_ARTIFACT_DIR']
+        self.stale_timeout = app.config['JOB_STALE_TIMEOUT']
+        self.artifact_ttl = app.config['JOB_ARTIFACT_TTL']
+        self.synchronous = app.config['JOB_EXECUTOR'] == 'sync'
+        self._pool = None if self.synchronous else ThreadPoolExecutor(
+            max_workers=app.config['JOB_MAX_WORKERS'], thread_name_prefix='job')
+        self._futures: Dict[str, Future] = {}
+
+    def submit(self, job_id: str) -> None:
+        """
+        Schedules a queued job to run.
+
+        Args:
+            job_id (str): The ID of the job.
+        """
+        if self.synchronous:
+            run_job(job_id, self.artifact_dir)
+        else:
+            future = self._pool.submit(self._run_in_app_context, job_id)
+            self._futures[job_id] = future
+            future.add_done_callback(lambda _: self._futures.pop(job_id, None))
+
+    def shutdown(self, timeout: Optional[float] = None) -> List[str]:
+        """
+        Stops taking jobs and waits for the jobs of this process to finish, before the process exits.
+
+        Jobs that have not started are dropped. Jobs still running after ``timeout`` seconds are abandoned.
+        Both are marked 'failed', so they do not stay active and count against the job limit forever.
+
+        Args:
+            timeout (Optional[float]): The number of seconds to wait for the running jobs. Defaults to None
+                                       (wait until they finish).
+
+        Returns:
+            List[str]: The IDs of the jobs marked as failed.
+        """
+        if self._pool is None:
+            return []
+        futures = dict(self._futures)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        wait(futures.values(), timeout=timeout)
+        unfinished = [job_id for job_id, future in futures.items() if future.cancelled() or not future.done()]
+        fail_jobs(unfinished, 'The worker process exited before the job finished')
+        return unfinished
+
+    def _run_in_app_context(self, job_id: str) -> None:
+        """
+        Runs a job in a pool thread within an application context, which closes its session on teardown.
+
+        Args:
+            job_id (str): The ID of the job.
+        """
+        with self.app.app_context():
+            run_job(job_id, self.artifact_dir)
+
+
+def init_app(app: Flask) -> None:
+    """
+    Creates the job executor of the application.
+
+    Args:
+        app (Flask): The Flask application.
+    """
+    app.extensions['jobs'] = JobExecutor(app)
+
+
+def _finish_job(job_id: str, status: str, result: Optional[dict] = None, error: Optional[str] = None,
+                artifact_path: Optional[str] = None) -> bool:
+    """
+    Records the final status of a running job.
+
+    A job that is no longer running, e.g. failed by the shutdown of its worker, keeps its status.
+
+    Args:
+        job_id (str): The ID of the job.
+        status (str): The final status, 'completed', 'failed' or 'cancelled'.
+        result (Optional[dict]): The result of a completed job. Defaults to None.
+        error (Optional[str]): The error message of a failed job. Defaults to None.
+        artifact_path (Optional[str]): The path of the artifact of a completed job. Defaults to None.
+
+    Returns:
+        bool: Whether the status was recorded.
+    """
+    with SessionLocal() as db:
+        finished = db.execute(update(Job).where(Job.id == job_id, Job.status == 'running').values(
+            status=status,
+            result=json.dumps(result) if result is not None else None,
+            error=error,
+            artifact_path=artifact_path,
+            finished_at=datetime.utcnow()
+        )).rowcount
+        db.commit()
+    return finished == 1
+
+
+def fail_jobs(job_ids: List[str], error: str) -> None:
+    """
+    Marks the jobs among the given ones that are still queued or running as failed.
+
+    Args:
+        job_ids (List[str]): The IDs of the jobs.
+        error (str): The error message recorded on the jobs.
+    """
+    if not job_ids:
+        return
+    with SessionLocal() as db:
+        db.execute(update(Job).where(Job.id.in_(job_ids), Job.status.in_(ACTIVE_STATUSES)).values(
+            status='failed', error=error, finished_at=datetime.utcnow()
+        ))
+        db.commit()
+
+
+def get_worker_id() -> str:
+    """
+    Returns the ID of the current process as recorded on the jobs it runs.
+
+    Returns:
+        str: The '<host>:<pid>' of the current process.
+    """
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _process_exists(pid: int) -> bool:
+    """
+    Checks whether a process of the current host is alive.
+
+    Args:
+        pid (int): The ID of the process.
+
+    Returns:
+        bool: Whether the process exists.
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _is_abandoned(worker: Optional[str], last_seen: Optional[datetime], cutoff: datetime) -> bool:
+    """
+    Checks whether an active job was abandoned by the process running it.
+
+    Args:
+        worker (Optional[str]): The '<host>:<pid>' of the process the job was submitted to.
+        last_seen (Optional[datetime]): The last heartbeat of the job.
+        cutoff (datetime): The time before which a heartbeat is too old.
+
+    Returns:
+        bool: Whether the job has no recent heartbeat or its process, on the current host, has exited.
+    """
+    if last_seen is None or last_seen < cutoff:
+        return True
+    host, _, pid = (worker or '').rpartition(':')
+    return host == socket.gethostname() and pid.isdigit() and not _process_exists(int(pid))
+
+
+def recover_stale_jobs(stale_timeout: float) -> List[str]:
+    """
+    Marks the active jobs abandoned by their process as failed and removes their uploaded files.
+
+    The queue of a process lives in its memory, so the jobs of a process that crashed or was killed never
+    finish. A job is abandoned if its process on the current host has exited, or if it has not sent a
+    heartbeat, on submission, start or progress, for ``stale_timeout`` seconds.
+
+    Args:
+        stale_timeout (float): The number of seconds without a heartbeat after which a job is abandoned.
+
+    Returns:
+        List[str]: The IDs of the jobs marked as failed.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_timeout)
+    with SessionLocal() as db:
+        active = db.execute(select(Job.id, Job.params, Job.worker, func.coalesce(Job.heartbeat_at, Job.created_at))
+                            .where(Job.status.in_(ACTIVE_STATUSES))).all()
+    stale = [(job_id, params) for job_id, params, worker, last_seen in active
+             if _is_abandoned(worker, last_seen, cutoff)]
+    fail_jobs([job_id for job_id, _ in stale], 'The job was abandoned by its worker process')
+    for job_id, params in stale:
+        file_path = json.loads(params or '{}').get('file_path')
+        if file_path and os.path.exists(file_path):
+            os.remove(file_path)
+        logger.warning('Job %s was abandoned by its worker process', job_id)
+    return [job_id for job_id, _ in stale]
+
+
+def delete_expired_artifacts(artifact_ttl: float) -> int:
+    """
+    Deletes the artifacts of the jobs that finished more than ``artifact_ttl`` seconds ago.
+
+    Args:
+        artifact_ttl (float): The number of seconds artifacts are kept after their job finished.
+
+    Returns:
+        int: The number of deleted artifacts.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=artifact_ttl)
+    with SessionLocal() as db:
+        expired = db.execute(select(Job.id, Job.artifact_path)
+                             .where(Job.artifact_path.is_not(None), Job.finished_at < cutoff)).all()
+        for _, artifact_path in expired:
+            if os.path.exists(artifact_path):
+                os.remove(artifact_path)
+        if expired:
+            db.execute(update(Job).where(Job.id.in_([job_id for job_id, _ in expired])).values(artifact_path=None))
+            db.commit()
+    return len(expired)
+
+
+def cleanup_jobs(stale_timeout: float, artifact_ttl: float) -> Dict[str, int]:
+    """
+    Fails the jobs abandoned by their process and deletes the expired job artifacts.
+
+    Args:
+        stale_timeout (float): The number of seconds without a heartbeat after which a job is abandoned.
+        artifact_ttl (float): The number of seconds artifacts are kept after their job finished.
+
+    Returns:
+        Dict[str, int]: The number of 'failed' jobs and 'deleted_artifacts'.
+    """
+    return {
+        'failed': len(recover_stale_jobs(stale_timeout)),
+        'deleted_artifacts': delete_expired_artifacts(artifact_ttl)
+    }
+
+
+def run_job(job_id: str, artifact_dir: str) -> None:
+    """
+    Runs a queued job and records its outcome.
+
+    The job is claimed by atomically moving it from 'queued' to 'running', so a job cancelled
+    before it started is skipped. Artifacts of failed or cancelled jobs are removed.
+
+    Args:
+        job_id (str): The ID of the job.
+        artifact_dir (str): The directory to write the job's artifact to.
+    """
+    with SessionLocal() as db:
+        claimed = db.execute(
+            update(Job).where(Job.id == job_id, Job.status == 'queued')
+            .values(status='running', started_at=datetime.utcnow(), heartbeat_at=datetime.utcnow())
+        ).rowcount
+        job = db.get(Job, job_id)
+        kind, params = job.kind, json.loads(job.params or '{}')
+        db.commit()
+    if not claimed:
+        return
+
+    artifact_path = None
+    if kind in ARTIFACT_NAMES:
+        os.makedirs(artifact_dir, exist_ok=True)
+        artifact_path = os.path.join(artifact_dir, f'{job_id}_{ARTIFACT_NAMES[kind]}')
+
+    try:
+        result = JOB_KINDS[kind](JobContext(job_id, params, artifact_path))
+        # End the transaction the job read the orders in before recording its outcome
+        get_session().commit()
+    except Exception as e:
+        if artifact_path is not None and os.path.exists(artifact_path):
+            os.remove(artifact_path)
+        if isinstance(e, JobCancelled):
+            _finish_job(job_id, 'cancelled')
+        else:
+            logger.exception('Job %s (%s) failed', job_id, kind)
+            _finish_job(job_id, 'failed', error=str(e))
+    else:
+        recorded = _finish_job(job_id, 'completed', result=result, artifact_path=artifact_path)
+        if not recorded and artifact_path is not None and os.path.exists(artifact_path):
+            os.remove(artifact_path)
+
+
+def _insert_within_limit(db: Session, values: Dict[str, Any], max_pending: int) -> bool:
+    """
+    Inserts a job unless the maximum number of queued and running jobs is reached, in a single statement.
+
+    The limit is checked by the ``INSERT ... SELECT ... WHERE`` statement itself, so concurrent submissions
+    cannot both pass it. On PostgreSQL, submissions are also serialized with a transaction-level advisory
+    lock, as concurrent statements would not see each other's uncommitted jobs.
+
+    Args:
+        db (Session): The database session.
+        values (Dict[str, Any]): The column values of the job.
+        max_pending (int): The maximum number of queued and running jobs.
+
+    Returns:
+        bool: Whether the job was inserted.
+    """
+    if db.get_bind().dialect.name == 'postgresql':
+        db.execute(select(func.pg_advisory_xact_lock(SUBMIT_LOCK_KEY)))
+    active = select(func.count()).select_from(Job).where(Job.status.in_(ACTIVE_STATUSES)).scalar_subquery()
+    row = select(*(literal(value, Job.__table__.c[key].type) for key, value in values.items()))
+    return db.execute(insert(Job).from_select(list(values), row.where(active < max_pending))).rowcount == 1
+
+
+def submit_job(kind: str, params: Optional[dict] = None) -> Job:
+    """
+    Submits a job to run in the background.
+
+    Jobs abandoned by their process are failed first, so they do not count against the limit.
+
+    Args:
+        kind (str): The kind of job, one of the keys of JOB_KINDS.
+        params (Optional[dict]): The JSON serializable parameters of the job. Defaults to None.
+
+    Returns:
+        Job: The submitted job.
+
+    Raises:
+        ValueError: If the kind of job is unknown.
+        JobLimitExceeded: If the maximum number of queued and running jobs is reached.
+    """
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind '{kind}'")
+    executor = current_app.extensions['jobs']
+
+    recover_stale_jobs(executor.stale_timeout)
+
+    db = get_session()
+    now = datetime.utcnow()
+    job_id = str(uuid.uuid4())
+    values = {'id': job_id, 'kind': kind, 'params': json.dumps(params or {}), 'status': 'queued', 'progress': 0,
+              'cancel_requested': False, 'worker': get_worker_id(), 'heartbeat_at': now, 'created_at': now}
+    try:
+        inserted = _insert_within_limit(db, values, executor.max_pending)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    if not inserted:
+        raise JobLimitExceeded(f'Too many active jobs ({executor.max_pending}), try again later')
+
+    executor.submit(job_id)
+    return get_job(job_id)
+
+
+def get_job(job_id: str) -> Job:
+    """
+    Retrieves a job by its ID.
+
+    Args:
+        job_id (str): The ID of the job.
+
+    Returns:
+        Job: The job.
+
+    Raises:
+        ValueError: If the job with the given ID does not exist.
+    """
+    job = get_session().get(Job, job_id, populate_existing=True)
+    if job is None:
+        raise ValueError(f'Job {job_id} not found')
+    return job
+
+
+def cancel_job(job_id: str) -> Job:
+    """
+    Cancels a job.
+
+    A queued job is cancelled immediately. A running job is asked to stop and is cancelled
+    the next time it reports progress. Finished jobs are left unchanged.
+
+    Args:
+        job_id (str): The ID of the job.
+
+    Returns:
+        Job: The job.
+
+    Raises:
+        ValueError: If the job with the given ID does not exist.
+    """
+    db = get_session()
+    cancelled = db.execute(
+        update(Job).where(Job.id == job_id, Job.status == 'queued')
+        .values(status='cancelled', finished_at=datetime.utcnow())
+    ).rowcount
+    if not cancelled:
+        db.execute(update(Job).where(Job.id == job_id, Job.status == 'running').values(cancel_requested=True))
+    db.commit()
+    return get_job(job_id)
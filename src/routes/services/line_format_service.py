@@ -0,0 +1,286 @@
+import csv
+import gzip
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.database.db import get_session
+from src.database.models import Order
+from src.routes.services.bulk_order_service import iter_ndjson_records
+from src.routes.services.repository import IMPORT_FIELDS, ORDER_FIELDS, iter_order_rows, upsert_orders_batch
+from src.schemas.orders import to_naive_utc
+
+EXPORT_BATCH_SIZE = 1000
+IMPORT_BATCH_SIZE = 1000
+LINE_FORMATS = ('csv', 'ndjson')
+GZIP_LEVEL = 6
+GZIP_MAGIC = b'\x1f\x8b'
+# The size of the reads from the upload stream
+READ_BUFFER_SIZE = 64 * 1024
+
+
+def _json_default(value: Any) -> str:
+    """
+    Serializes the values the json module does not handle, the dates of the orders.
+
+    Args:
+        value (Any): The value to serialize.
+
+    Returns:
+        str: The ISO 8601 representation of the date.
+
+    Raises:
+        TypeError: If the value is not a date.
+    """
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def iter_orders_csv(batch_size: int = EXPORT_BATCH_SIZE, since: Optional[datetime] = None,
+                    until: Optional[datetime] = None) -> Iterator[bytes]:
+    """
+    Iterates over all orders, or the orders changed in a range of time, as a CSV document.
+
+    The first line holds the field names. Orders are read from a server-side database cursor and each
+    batch of rows is encoded and yielded on its own, so memory usage does not depend on the number of orders.
+    The query runs on the first chunk, which also holds the header.
+
+    Args:
+        batch_size (int): The number of rows fetched from the cursor and yielded at a time.
+                          Defaults to EXPORT_BATCH_SIZE.
+        since (Optional[datetime]): Only orders changed after this are exported. Defaults to None.
+        until (Optional[datetime]): Only orders changed at or before this are exported. Defaults to None.
+
+    Yields:
+        bytes: The next chunk of the UTF-8 encoded document.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(ORDER_FIELDS)
+    count = 0
+    for row in iter_order_rows(ORDER_FIELDS, batch_size=batch_size, updated_after=since, updated_until=until):
+        writer.writerow('' if value is None else value.isoformat() if isinstance(value, datetime) else value
+                        for value in row)
+        count += 1
+        if count % batch_size == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def iter_orders_ndjson(batch_size: int = EXPORT_BATCH_SIZE, since: Optional[datetime] = None,
+                       until: Optional[datetime] = None) -> Iterator[bytes]:
+    """
+    Iterates over all orders, or the orders changed in a range of time, as newline-delimited JSON.
+
+    Each order is a JSON object on a line of its own. Orders are read from a server-side database cursor
+    and each batch of lines is yielded on its own, so memory usage does not depend on the number of orders.
+
+    Args:
+        batch_size (int): The number of rows fetched from the cursor and yielded at a time.
+                          Defaults to EXPORT_BATCH_SIZE.
+        since (Optional[datetime]): Only orders changed after this are exported. Defaults to None.
+        until (Optional[datetime]): Only orders changed at or before this are exported. Defaults to None.
+
+    Yields:
+        bytes: The next chunk of the UTF-8 encoded document.
+    """
+    lines = []
+    for row in iter_order_rows(ORDER_FIELDS, batch_size=batch_size, updated_after=since, updated_until=until):
+        lines.append(json.dumps(row._asdict(), default=_json_default, ensure_ascii=False))
+        if len(lines) >= batch_size:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def iter_orders_lines(format: str, batch_size: int = EXPORT_BATCH_SIZE, since: Optional[datetime] = None,
+                      until: Optional[datetime] = None) -> Iterator[bytes]:
+    """
+    Iterates over all orders, or the orders changed in a range of time, in a line-based format.
+
+    Args:
+        format (str): The format of the document, one of LINE_FORMATS.
+        batch_size (int): The number of rows fetched from the cursor and yielded at a time.
+                          Defaults to EXPORT_BATCH_SIZE.
+        since (Optional[datetime]): Only orders changed after this are exported. Defaults to None.
+        until (Optional[datetime]): Only orders changed at or before this are exported. Defaults to None.
+
+    Returns:
+        Iterator[bytes]: The chunks of the document, see iter_orders_csv and iter_orders_ndjson.
+
+    Raises:
+        ValueError: If the format is not supported.
+    """
+    if format == 'csv':
+        return iter_orders_csv(batch_size=batch_size, since=since, until=until)
+    if format == 'ndjson':
+        return iter_orders_ndjson(batch_size=batch_size, since=since, until=until)
+    raise ValueError(f"Unsupported format '{format}'")
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = GZIP_LEVEL) -> Iterator[bytes]:
+    """
+    Compresses a stream of chunks into a gzip stream on the fly.
+
+    Args:
+        chunks (Iterable[bytes]): The uncompressed chunks.
+        level (int): The compression level, from 1 (fastest) to 9 (smallest). Defaults to GZIP_LEVEL.
+
+    Yields:
+        bytes: The next non-empty chunk of the gzip stream.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def open_upload(stream: BinaryIO) -> BinaryIO:
+    """
+    Opens an uploaded document for incremental reading, decompressing it if it is gzip-compressed.
+
+    Compression is detected from the first bytes of the stream, so it does not depend on the file name
+    or the request headers.
+
+    Args:
+        stream (BinaryIO): The upload, a file-like object or a request body stream.
+
+    Returns:
+        BinaryIO: The buffered stream of the uncompressed document.
+    """
+    buffered = io.BufferedReader(stream, READ_BUFFER_SIZE) if not hasattr(stream, 'peek') else stream
+    if buffered.peek(len(GZIP_MAGIC))[:len(GZIP_MAGIC)] == GZIP_MAGIC:
+        return io.BufferedReader(gzip.GzipFile(fileobj=buffered, mode='rb'), READ_BUFFER_SIZE)
+    return buffered
+
+
+def _iter_csv_records(stream: BinaryIO) -> Iterator[Tuple[int, Any]]:
+    """
+    Decodes a CSV document whose first line holds the field names, one record per row.
+
+    Empty values are read as missing.
+
+    Args:
+        stream (BinaryIO): The uncompressed document.
+
+    Yields:
+        Tuple[int, Any]: The 1-based row number, header excluded, and the record.
+
+    Raises:
+        ValueError: If the header does not name the 'id', 'name' and 'status' fields.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    missing = {'id', 'name', 'status'} - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"The CSV header is missing the fields {', '.join(sorted(missing))}")
+    for row_number, record in enumerate(reader, start=1):
+        yield row_number, {key: value or None for key, value in record.items() if key is not None}
+
+
+def _parse_id(value: Any) -> int:
+    """
+    Reads the ID of a record, a JSON integer or the digits of a CSV value.
+
+    Args:
+        value (Any): The decoded ID.
+
+    Returns:
+        int: The ID.
+
+    Raises:
+        TypeError: If the value is neither an integer nor a string, e.g. a JSON number with a fraction or a boolean.
+        ValueError: If the string is not an integer.
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise TypeError(f"Invalid order ID {value!r}")
+    return int(value)
+
+
+def _order_from_record(record: Any) -> Optional[Dict[str, Any]]:
+    """
+    Builds an order row from a decoded record, validating it like the HDF5 import.
+
+    Args:
+        record (Any): The decoded record, or the json.JSONDecodeError of an invalid NDJSON line.
+
+    Returns:
+        Optional[Dict[str, Any]]: The order, with the keys of IMPORT_FIELDS and a naive UTC creation date,
+        or None if the record is not an object, has no ID, name or status, has values too long for their
+        column, an ID that is not an integer or an unparsable creation date.
+    """
+    if not isinstance(record, dict):
+        return None
+    try:
+        creation_date = datetime.fromisoformat(record['creation_date']) if record.get('creation_date') else None
+        order = {
+            'id': _parse_id(record['id']),
+            'name': record['name'],
+            'description': record.get('description'),
+            'creation_date': to_naive_utc(creation_date),
+            'status': record['status']
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
+    for field in IMPORT_FIELDS:
+        column = Order.__table__.c[field]
+        length = getattr(column.type, 'length', None)
+        if order[field] is None:
+            if not column.nullable:
+                return None
+        elif length is not None and (not isinstance(order[field], str) or len(order[field]) > length):
+            return None
+    return order
+
+
+def import_orders_from_lines(stream: BinaryIO, format: str,
+                             batch_size: int = IMPORT_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Import orders from a CSV or NDJSON document, optionally gzip-compressed.
+
+    The document is read and decompressed incrementally and the orders are upserted into the database,
+    committing every ``batch_size`` records, so memory usage does not depend on the size of the document.
+    Records that do not describe a valid order are rejected, see _order_from_record. Orders identical to
+    their stored version are not written.
+
+    Args:
+        stream (BinaryIO): The document, a file-like object or a request body stream.
+        format (str): The format of the document, one of LINE_FORMATS.
+        batch_size (int): The number of records processed per transaction. Defaults to IMPORT_BATCH_SIZE.
+
+    Returns:
+        Dict[str, int]: A dictionary with the number of 'inserted', 'updated', 'unchanged' and 'rejected' orders.
+
+    Raises:
+        ValueError: If the format is not supported, or the CSV header is missing a required field.
+    """
+    if format not in LINE_FORMATS:
+        raise ValueError(f"Unsupported format '{format}'")
+    stream = open_upload(stream)
+    records = _iter_csv_records(stream) if format == 'csv' else iter_ndjson_records(stream)
+
+    db = get_session()
+    result = {"inserted": 0, "updated": 0, "unchanged": 0, "rejected": 0}
+    batch: List[Dict[str, Any]] = []
+    processed = 0
+    for _, record in records:
+        order = _order_from_record(record)
+        if order is None:
+            result["rejected"] += 1
+        else:
+            batch.append(order)
+        processed += 1
+        if processed % batch_size == 0:
+            upsert_orders_batch(db, batch, result)
+            batch = []
+    if batch:
+        upsert_orders_batch(db, batch, result)
+    return result
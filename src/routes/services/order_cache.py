@@ -0,0 +1,209 @@
+"""
+This module caches serialized orders in memory for the single-order endpoint.
+
+The cache belongs to the process. Changed orders are invalidated when the transaction that changed them
+ends, through a session event; other processes only see the change once their entries expire, so their
+TTL is capped when several server workers run.
+
+Classes:
+    OrderCache: A thread-safe, bounded LRU cache with a time to live for serialized orders.
+
+Functions:
+    init_app(app): Creates the order cache of the application.
+    limit_to_workers(app, workers): Bounds the staleness of the cache under several processes.
+    get_order_cache(): Returns the order cache of the current application.
+    mark_orders_changed(db, ids): Records the orders changed in the session's current transaction.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Key of the session info holding the IDs of the orders changed in the current transaction
+CHANGED_ORDER_IDS = 'changed_order_ids'
+
+
+class OrderCache:
+    """
+    A thread-safe, bounded LRU cache with a time to live for serialized orders, keyed by order ID.
+
+    Every invalidation bumps a version number. A value read from the database is only stored if no
+    invalidation happened since the read started, so a concurrent write cannot be overwritten by
+    a stale read.
+
+    Attributes:
+        maxsize (int): The maximum number of cached orders; 0 disables the cache.
+        ttl (float): The number of seconds an entry stays valid.
+        hits (int): The number of lookups answered from the cache.
+        misses (int): The number of lookups that went to the database.
+        version (int): The number of invalidations so far.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.version = 0
+        self._clock = clock
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: int) -> Optional[Dict[str, Any]]:
+        """
+        Looks up an entry and marks it as most recently used.
+
+        Args:
+            key (int): The order ID.
+
+        Returns:
+            Optional[Dict[str, Any]]: The cached order, or None if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: int, value: Dict[str, Any], version: int) -> None:
+        """
+        Stores an entry, evicting the least recently used one if the cache is full.
+
+        Args:
+            key (int): The order ID.
+            value (Dict[str, Any]): The serialized order.
+            version (int): The cache version read before the order was loaded; the entry is dropped
+                           if orders were invalidated since.
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if version != self.version:
+                return
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, keys: Iterable[int]) -> None:
+        """
+        Removes the entries of the given orders.
+
+        Args:
+            keys (Iterable[int]): The order IDs.
+        """
+        with self._lock:
+            self.version += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Removes all entries.
+        """
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the cache statistics.
+
+        Returns:
+            Dict[str, Any]: The number of 'hits', 'misses' and cached orders ('size'), the 'maxsize',
+            the 'ttl' in seconds and the 'hit_ratio'.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hit_ratio': self.hits / lookups if lookups else None
+            }
+
+
+def init_app(app: Flask) -> None:
+    """
+    Creates the order cache of the application from the ORDER_CACHE_SIZE and ORDER_CACHE_TTL settings.
+
+    Args:
+        app (Flask): The Flask application.
+    """
+    app.extensions['order_cache'] = OrderCache(app.config['ORDER_CACHE_SIZE'], app.config['ORDER_CACHE_TTL'])
+
+
+def limit_to_workers(app: Flask, workers: int) -> None:
+    """
+    Bounds the staleness of the order cache when several processes serve the application.
+
+    Each process has its own cache and a commit only invalidates the cache of the process that made it,
+    so with more than one worker the TTL is capped to ORDER_CACHE_PREFORK_TTL, or the cache is disabled
+    if that is 0.
+
+    Args:
+        app (Flask): The Flask application.
+        workers (int): The number of processes serving the application.
+    """
+    cache = app.extensions.get('order_cache')
+    if cache is None or workers <= 1:
+        return
+    ttl = app.config['ORDER_CACHE_PREFORK_TTL']
+    if ttl <= 0:
+        cache.maxsize = 0
+    else:
+        cache.ttl = min(cache.ttl, ttl)
+    cache.clear()
+
+
+def get_order_cache() -> Optional[OrderCache]:
+    """
+    Returns the order cache of the current application.
+
+    Returns:
+        Optional[OrderCache]: The order cache, or None outside an application context.
+    """
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('order_cache')
+
+
+def mark_orders_changed(db: Session, ids: Iterable[int]) -> None:
+    """
+    Records that orders are changed in the session's current transaction.
+
+    Their cache entries are invalidated once the transaction commits, so a lookup
+    cannot cache the old values again before the change is visible.
+
+    Args:
+        db (Session): The database session.
+        ids (Iterable[int]): The IDs of the changed orders.
+    """
+    db.info.setdefault(CHANGED_ORDER_IDS, set()).update(ids)
+
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def _invalidate_changed_orders(session: Session) -> None:
+    """
+    Invalidates the cache entries of the orders changed in a transaction when it ends.
+
+    Args:
+        session (Session): The session whose transaction ended.
+    """
+    ids = session.info.pop(CHANGED_ORDER_IDS, None)
+    cache = get_order_cache()
+    if ids and cache is not None:
+        cache.invalidate(ids)
@@ -1,26 +1,120 @@
-from typing import Dict
+from datetime import datetime
+from typing import Dict, Optional
 
-import pandas as pd
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.sql.elements import ColumnElement
 
-from src.database.db import get_db
+from src.database.db import get_session
 from src.database.models import Order
+from src.routes.services.status_count_service import get_status_counts
 
+PERIODS = ('day', 'week', 'month')
 
-def get_order_statistics() -> Dict[str, str]:
+
+def period_start(column: ColumnElement, period: str, dialect_name: str) -> ColumnElement:
+    """
+    Builds a SQL expression truncating a datetime column to the start of its period.
+
+    The expression renders the period start as a 'YYYY-MM-DD' string. Weeks start on Monday.
+
+    Args:
+        column (ColumnElement): The datetime column to truncate.
+        period (str): The period to truncate to, one of 'day', 'week' or 'month'.
+        dialect_name (str): The name of the database dialect, 'postgresql' or 'sqlite'.
+
+    Returns:
+        ColumnElement: The SQL expression for the start of the period.
+
+    Raises:
+        ValueError: If the period or the dialect is not supported.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Unsupported period '{period}'")
+    if dialect_name == 'postgresql':
+        # Inline the literals so the expression is identical in the SELECT and GROUP BY clauses
+        return func.to_char(func.date_trunc(literal_column(f"'{period}'"), column), literal_column("'YYYY-MM-DD'"))
+    if dialect_name == 'sqlite':
+        if period == 'day':
+            return func.date(column)
+        if period == 'week':
+            return func.date(column, 'weekday 0', '-6 days')
+        return func.strftime('%Y-%m-01', column)
+    raise ValueError(f"Unsupported database dialect '{dialect_name}'")
+
+
+def _date_filters(date_from: Optional[datetime], date_to: Optional[datetime]) -> list:
+    """
+    Builds the WHERE clauses restricting orders to a creation date range.
+
+    Args:
+        date_from (Optional[datetime]): The inclusive lower bound of the creation date.
+        date_to (Optional[datetime]): The exclusive upper bound of the creation date.
+
+    Returns:
+        list: The list of SQL conditions.
+    """
+    filters = []
+    if date_from is not None:
+        filters.append(Order.creation_date >= date_from)
+    if date_to is not None:
+        filters.append(Order.creation_date < date_to)
+    return filters
+
+
+def get_order_statistics() -> Dict[str, int]:
     """
     Retrieves statistics about the orders, such as the count of each status.
 
+    The counts are read from the incrementally maintained status counters,
+    so the cost does not depend on the number of orders.
+
     Returns:
-        Dict[str, str]: A dictionary with order status counts.
+        Dict[str, int]: A dictionary with order status counts.
+    """
+    return get_status_counts()
+
+
+def get_order_statistics_by_period(period: str, date_from: Optional[datetime] = None,
+                                   date_to: Optional[datetime] = None) -> Dict[str, Dict[str, int]]:
     """
-    db = next(get_db())
-    orders = db.query(Order).all()
+    Retrieves the count of each status per day, week or month.
 
-    # Convert orders to a list of dictionaries and then to a DataFrame
-    data = [order.to_dict() for order in orders]
-    df = pd.DataFrame(data)
+    Args:
+        period (str): The period to group by, one of 'day', 'week' or 'month'.
+        date_from (Optional[datetime]): The inclusive lower bound of the creation date. Defaults to None.
+        date_to (Optional[datetime]): The exclusive upper bound of the creation date. Defaults to None.
 
-    # Count the occurrences of each status
-    status_counts = df['status'].value_counts().to_dict()
+    Returns:
+        Dict[str, Dict[str, int]]: A dictionary mapping the start date of each period to its status counts,
+        in chronological order.
+    """
+    db = get_session()
+    start = period_start(Order.creation_date, period, db.get_bind().dialect.name).label('period_start')
+    query = (select(start, Order.status, func.count())
+             .where(*_date_filters(date_from, date_to))
+             .group_by(start, Order.status)
+             .order_by(start))
 
-    return status_counts
+    statistics = {}
+    for period_start_date, status, count in db.execute(query):
+        statistics.setdefault(period_start_date, {})[status] = count
+    return statistics
+
+
+def get_creation_date_range_by_status(date_from: Optional[datetime] = None,
+                                      date_to: Optional[datetime] = None) -> Dict[str, Dict[str, datetime]]:
+    """
+    Retrieves the oldest and newest creation date of the orders in each status.
+
+    Args:
+        date_from (Optional[datetime]): The inclusive lower bound of the creation date. Defaults to None.
+        date_to (Optional[datetime]): The exclusive upper bound of the creation date. Defaults to None.
+
+    Returns:
+        Dict[str, Dict[str, datetime]]: A dictionary mapping each status to its 'oldest' and 'newest' creation date.
+    """
+    db = get_session()
+    query = (select(Order.status, func.min(Order.creation_date), func.max(Order.creation_date))
+             .where(*_date_filters(date_from, date_to))
+             .group_by(Order.status))
+    return {status: {'oldest': oldest, 'newest': newest} for status, oldest, newest in db.execute(query)}
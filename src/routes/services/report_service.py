@@ -1,71 +1,128 @@
-import os
+from datetime import datetime
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO, Callable, Optional, Union
 
-import pandas as pd
-from openpyxl.styles import PatternFill
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle, PatternFill
 from openpyxl.workbook import Workbook
+from sqlalchemy import select
 
-from src.database.db import get_db
+from src.database.db import get_session
 from src.database.models import Order
+from src.routes.services.export_buffer import EXPORT_SPOOL_MAX_SIZE, spool_export
 
+REPORT_BATCH_SIZE = 1000
+REPORT_COLUMNS = (Order.id, Order.name, Order.description, Order.creation_date, Order.status)
 
-def generate_report_xlsx() -> str:
+# Define colors for different order statuses
+STATUS_COLORS = {
+    "New": "0000FF",  # Blue
+    "In Progress": "FFFF00",  # Yellow
+    "Completed": "00FF00"  # Green
+}
+DEFAULT_COLOR = "FFFFFF"  # White
+DATETIME_FORMAT = 'yyyy-mm-dd h:mm:ss'
+
+
+def _register_status_styles(wb: Workbook) -> dict:
+    """
+    Registers the named cell styles of each order status in the workbook.
+
+    Each status gets a plain style and a style for datetime cells, which keeps the date number format.
+
+    Args:
+        wb (Workbook): The workbook to register the styles in.
+
+    Returns:
+        dict: A dictionary mapping each status, and None for unknown statuses, to the names of its
+        plain and datetime styles.
+    """
+    style_names = {}
+    for status, color in list(STATUS_COLORS.items()) + [(None, DEFAULT_COLOR)]:
+        names = []
+        for suffix, number_format in (('', 'General'), (' Date', DATETIME_FORMAT)):
+            style = NamedStyle(name=f"Status {status or 'Other'}{suffix}", number_format=number_format)
+            style.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+            wb.add_named_style(style)
+            names.append(style.name)
+        style_names[status] = tuple(names)
+    return style_names
+
+
+def write_orders_xlsx(file: Union[str, BinaryIO], batch_size: int = REPORT_BATCH_SIZE,
+                      on_progress: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Writes all orders to an XLSX workbook and colors the rows based on the order status.
+
+    The workbook is built with a write-only worksheet: rows are read from a server-side database
+    cursor and written out as they arrive, and every cell of a row reuses the shared named style
+    of its status, so memory usage does not depend on the number of orders.
+
+    Args:
+        file (Union[str, BinaryIO]): The path or binary stream of the XLSX file to write.
+        batch_size (int): The number of rows fetched from the cursor at a time. Defaults to REPORT_BATCH_SIZE.
+        on_progress (Optional[Callable[[int], None]]): Called with the number of written orders so far
+                                                       after each batch. Defaults to None.
+
+    Returns:
+        int: The number of orders written.
+    """
+    db = get_session()
+    query = select(*REPORT_COLUMNS).order_by(Order.id).execution_options(yield_per=batch_size)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Orders")
+    style_names = _register_status_styles(wb)
+
+    # Append headers to the sheet
+    ws.append([column.key for column in REPORT_COLUMNS])
+
+    count = 0
+    for row in db.execute(query):
+        style_name, datetime_style_name = style_names.get(row.status, style_names[None])
+        cells = []
+        for value in row:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = datetime_style_name if isinstance(value, datetime) else style_name
+            cells.append(cell)
+        ws.append(cells)
+        count += 1
+        if on_progress is not None and count % batch_size == 0:
+            on_progress(count)
+
+    wb.save(file)
+    if on_progress is not None:
+        on_progress(count)
+    return count
+
+
+def generate_report_xlsx(batch_size: int = REPORT_BATCH_SIZE,
+                         spool_max_size: int = EXPORT_SPOOL_MAX_SIZE) -> SpooledTemporaryFile:
     """
     Generates an XLSX report containing all orders in the system.
 
-    This function queries the database for all orders, converts the data to a DataFrame,
-    creates an Excel workbook with a sheet containing the order data, and colors the rows
-    based on the order status:
+    This function streams the orders from the database into a write-only Excel workbook with a sheet
+    containing the order data, and colors the rows based on the order status:
         - "New" orders are colored blue.
         - "In Progress" orders are colored yellow.
         - "Completed" orders are colored green.
 
-    The generated report is saved in the 'reports' directory.
+    The report is written into a buffer of its own, kept in memory up to ``spool_max_size`` bytes
+    and in a temporary file beyond.
+
+    Args:
+        batch_size (int): The number of rows fetched from the database at a time. Defaults to REPORT_BATCH_SIZE.
+        spool_max_size (int): The size in bytes up to which the report is kept in memory.
+                              Defaults to EXPORT_SPOOL_MAX_SIZE.
 
     Returns:
-        str: The file path of the generated XLSX report.
-    """
-    db = next(get_db())
-    orders = db.query(Order).all()
+        SpooledTemporaryFile: The buffer holding the XLSX report, positioned at its start; the caller closes it.
 
-    # Convert orders to a list of dictionaries and then to a DataFrame
-    data = [order.to_dict() for order in orders]
-    if not data:
+    Raises:
+        ValueError: If there are no orders to report.
+    """
+    db = get_session()
+    if db.scalar(select(Order.id).limit(1)) is None:
         raise ValueError("No orders found to generate report.")
 
-    df = pd.DataFrame(data)
-
-    # Create a new Excel workbook and add a sheet
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Orders"
-
-    # Append headers to the sheet
-    headers = df.columns.tolist()
-    ws.append(headers)
-
-    # Define colors for different order statuses
-    status_colors = {
-        "New": "0000FF",  # Blue
-        "In Progress": "FFFF00",  # Yellow
-        "Completed": "00FF00"  # Green
-    }
-
-    # Append data rows to the sheet and apply colors based on status
-    for index, row in df.iterrows():
-        ws.append(row.tolist())
-        status = row['status']
-        fill = PatternFill(start_color=status_colors.get(status, "FFFFFF"),
-                           end_color=status_colors.get(status, "FFFFFF"), fill_type="solid")
-        for cell in ws[index + 2]:
-            cell.fill = fill
-
-    # Define the reports directory and create it if it doesn't exist
-    reports_dir = os.path.join(os.getcwd(), 'reports')
-    if not os.path.exists(reports_dir):
-        os.makedirs(reports_dir)
-
-    # Define the file path for the XLSX report
-    report_path = os.path.join(reports_dir, "orders_report.xlsx")
-    wb.save(report_path)
-
-    return report_path
+    return spool_export(lambda buffer: write_orders_xlsx(buffer, batch_size=batch_size), max_size=spool_max_size)
@@ -1,8 +1,21 @@
-from typing import List, Optional, Union, Dict
+from typing import Any, Iterator, List, Mapping, Optional, Sequence, Tuple, Union, Dict
+from sqlalchemy import Row, Select, and_, or_, select, update
+from sqlalchemy.orm import Session
 from src.database.models import Order
-from src.database.db import get_db
-from src.schemas.orders import OrderSchema
-from datetime import datetime
+from src.database.db import get_insert, get_session
+from src.routes.services.order_cache import get_order_cache, mark_orders_changed
+from src.routes.services.rollup_service import apply_rollup_deltas
+from src.routes.services.status_count_service import apply_status_deltas
+from src.schemas.orders import OrderSchema, to_naive_utc
+from datetime import datetime, timedelta
+from collections import Counter
+
+STATUS_UPDATE_CHUNK_SIZE = 500
+# Sort orders of the order list; a leading '-' sorts descending
+ORDER_SORTS = ('id', '-id', 'creation_date', '-creation_date')
+ORDER_FIELDS = tuple(column.key for column in Order.__table__.columns)
+# Fields of an imported order; 'updated_at' is maintained by the write paths
+IMPORT_FIELDS = ('id', 'name', 'description', 'creation_date', 'status')
 
 
 def add_order(order: OrderSchema) -> Order:
@@ -15,29 +28,328 @@ def add_order(order: OrderSchema) -> Order:
     Returns:
         Order: The newly created order object.
     """
-    db = next(get_db())
+    db = get_session()
+    now = datetime.utcnow()
     new_order = Order(
         name=order.name,
         description=order.description,
         status=order.status,
-        creation_date=order.creation_date or datetime.utcnow(),
+        creation_date=order.creation_date or now,
+        updated_at=now
     )
     db.add(new_order)
+    apply_status_deltas(db, {new_order.status: 1})
+    apply_rollup_deltas(db, {(new_order.creation_date, new_order.status): 1})
     db.commit()
     db.refresh(new_order)
     return new_order
 
 
-def get_orders() -> List[Order]:
+def add_orders(db: Session, orders: List[OrderSchema]) -> List[int]:
+    """
+    Adds new orders to the database with a single multi-row insert statement.
+
+    The status and rollup counters are adjusted in the same transaction; committing is left to the caller.
+
+    Args:
+        db (Session): The database session.
+        orders (List[OrderSchema]): The order details to be added.
+
+    Returns:
+        List[int]: The IDs of the new orders, in the order they were given.
+    """
+    if not orders:
+        return []
+    now = datetime.utcnow()
+    rows = [{
+        'name': order.name,
+        'description': order.description,
+        'status': order.status,
+        'creation_date': order.creation_date or now,
+        'updated_at': now
+    } for order in orders]
+    ids = db.scalars(
+        get_insert(db)(Order.__table__).returning(Order.id, sort_by_parameter_order=True),
+        rows
+    ).all()
+    apply_status_deltas(db, Counter(row['status'] for row in rows))
+    apply_rollup_deltas(db, Counter((row['creation_date'], row['status']) for row in rows))
+    return list(ids)
+
+
+def _filter_conditions(statuses: Optional[List[str]] = None, date_from: Optional[datetime] = None,
+                       date_to: Optional[datetime] = None, name_prefix: Optional[str] = None,
+                       updated_after: Optional[datetime] = None, updated_until: Optional[datetime] = None) -> list:
+    """
+    Builds the WHERE clauses of the order list filters.
+
+    Args:
+        statuses (Optional[List[str]]): Only orders in one of these statuses are kept. Defaults to None.
+        date_from (Optional[datetime]): The inclusive lower bound of the creation date. Defaults to None.
+        date_to (Optional[datetime]): The exclusive upper bound of the creation date. Defaults to None.
+        name_prefix (Optional[str]): Only orders whose name starts with this are kept. Defaults to None.
+        updated_after (Optional[datetime]): The exclusive lower bound of the last change. Defaults to None.
+        updated_until (Optional[datetime]): The inclusive upper bound of the last change. Defaults to None.
+
+    Returns:
+        list: The list of SQL conditions.
+    """
+    conditions = []
+    if statuses:
+        conditions.append(Order.status.in_(statuses))
+    if date_from is not None:
+        conditions.append(Order.creation_date >= date_from)
+    if date_to is not None:
+        conditions.append(Order.creation_date < date_to)
+    if name_prefix:
+        conditions.append(Order.name.startswith(name_prefix, autoescape=True))
+    if updated_after is not None:
+        conditions.append(Order.updated_at > updated_after)
+    if updated_until is not None:
+        conditions.append(Order.updated_at <= updated_until)
+    return conditions
+
+
+def _after_condition(db: Session, after_id: int, sort: str) -> Any:
+    """
+    Builds the keyset condition selecting the orders that come after a given order in the sort order.
+
+    Orders sorted by creation date are ordered by (creation_date, id), with orders without a
+    creation date last in ascending and first in descending order.
+
+    Args:
+        db (Session): The database session.
+        after_id (int): The ID of the last order of the previous page.
+        sort (str): The sort order, one of ORDER_SORTS.
+
+    Returns:
+        Any: The SQL condition.
+
+    Raises:
+        ValueError: If the sort order is by creation date and the order with the given ID does not exist.
+    """
+    descending = sort.startswith('-')
+    if sort.lstrip('-') == 'id':
+        return Order.id < after_id if descending else Order.id > after_id
+
+    cursor = db.execute(select(Order.creation_date).where(Order.id == after_id)).first()
+    if cursor is None:
+        raise ValueError(f"Order with id {after_id} does not exist")
+    creation_date = cursor.creation_date
+    if descending:
+        if creation_date is None:
+            return or_(Order.creation_date.is_not(None), Order.id < after_id)
+        return or_(Order.creation_date < creation_date,
+                   and_(Order.creation_date == creation_date, Order.id < after_id))
+    if creation_date is None:
+        return and_(Order.creation_date.is_(None), Order.id > after_id)
+    return or_(Order.creation_date > creation_date, Order.creation_date.is_(None),
+               and_(Order.creation_date == creation_date, Order.id > after_id))
+
+
+def orders_query(db: Session, *entities: Any, after_id: Optional[int] = None, sort: str = 'id',
+                  **filters: Any) -> Select:
+    """
+    Builds the query of a filtered and sorted order list.
+
+    When sorting by creation date, the cursor order is looked up with the session, so an AsyncSession
+    builds the query through ``run_sync``.
+
+    Args:
+        db (Session): The database session.
+        *entities (Any): The entities or columns to select.
+        after_id (Optional[int]): Only orders after the order with this ID in the sort order are returned.
+                                  Defaults to None.
+        sort (str): The sort order, one of ORDER_SORTS. Defaults to 'id'.
+        **filters (Any): The filters accepted by _filter_conditions.
+
+    Returns:
+        Select: The query.
+
+    Raises:
+        ValueError: If the sort order is not supported.
+    """
+    if sort not in ORDER_SORTS:
+        raise ValueError(f"Unsupported sort order '{sort}'")
+    query = select(*entities).where(*_filter_conditions(**filters))
+    if after_id is not None:
+        query = query.where(_after_condition(db, after_id, sort))
+
+    if sort == 'id':
+        return query.order_by(Order.id)
+    if sort == '-id':
+        return query.order_by(Order.id.desc())
+    if sort == 'creation_date':
+        return query.order_by(Order.creation_date.asc().nulls_last(), Order.id)
+    return query.order_by(Order.creation_date.desc().nulls_first(), Order.id.desc())
+
+
+def get_orders(limit: Optional[int] = None, after_id: Optional[int] = None, sort: str = 'id',
+               **filters: Any) -> List[Order]:
     """
-    Retrieves all orders from the database.
+    Retrieves a page of orders from the database using keyset pagination.
+
+    Orders are filtered and sorted in SQL. The ID of the last order in a page is the cursor for
+    the next one, whatever the sort order.
+
+    Args:
+        limit (Optional[int]): The maximum number of orders to return. Defaults to None (no limit).
+        after_id (Optional[int]): Only orders after the order with this ID in the sort order are returned.
+                                  Defaults to None.
+        sort (str): The sort order, one of ORDER_SORTS. Defaults to 'id'.
+        **filters (Any): 'statuses', 'date_from', 'date_to', 'name_prefix', 'updated_after' and 'updated_until'
+                         filters.
 
     Returns:
-        List[Order]: A list of all orders.
+        List[Order]: A list of orders.
+
+    Raises:
+        ValueError: If the sort order is not supported or the cursor order does not exist.
     """
-    db = next(get_db())
-    orders = db.query(Order).all()
-    return orders
+    db = get_session()
+    query = orders_query(db, Order, after_id=after_id, sort=sort, **filters)
+    if limit is not None:
+        query = query.limit(limit)
+    return list(db.scalars(query))
+
+
+def iter_orders(after_id: Optional[int] = None, batch_size: int = 1000, sort: str = 'id',
+                **filters: Any) -> Iterator[Order]:
+    """
+    Iterates over orders without loading the whole table.
+
+    Rows are fetched from a server-side cursor in batches of ``batch_size``, so memory
+    usage stays flat regardless of the number of orders.
+
+    Args:
+        after_id (Optional[int]): Only orders after the order with this ID in the sort order are returned.
+                                  Defaults to None.
+        batch_size (int): The number of rows fetched from the cursor at a time. Defaults to 1000.
+        sort (str): The sort order, one of ORDER_SORTS. Defaults to 'id'.
+        **filters (Any): 'statuses', 'date_from', 'date_to', 'name_prefix', 'updated_after' and 'updated_until'
+                         filters.
+
+    Yields:
+        Order: The next order.
+
+    Raises:
+        ValueError: If the sort order is not supported or the cursor order does not exist.
+    """
+    db = get_session()
+    query = orders_query(db, Order, after_id=after_id, sort=sort, **filters).execution_options(yield_per=batch_size)
+    yield from db.scalars(query)
+
+
+def order_columns(fields: Optional[Sequence[str]] = None) -> List[Any]:
+    """
+    Returns the columns selected for a projection of orders.
+
+    The requested columns come first, in the requested order, followed by the ID if it was not
+    requested, as it is the pagination cursor. Zipping a row with the requested fields therefore
+    yields exactly the requested values.
+
+    Args:
+        fields (Optional[Sequence[str]]): The requested fields, a subset of ORDER_FIELDS.
+                                          Defaults to None (all fields).
+
+    Returns:
+        List[Any]: The columns to select.
+
+    Raises:
+        ValueError: If a field is not one of ORDER_FIELDS.
+    """
+    fields = fields or ORDER_FIELDS
+    unknown = [field for field in fields if field not in ORDER_FIELDS]
+    if unknown:
+        raise ValueError(f"Unsupported fields: {', '.join(unknown)}. Supported fields: {', '.join(ORDER_FIELDS)}")
+    columns = [Order.__table__.c[field] for field in dict.fromkeys(fields)]
+    if 'id' not in fields:
+        columns.append(Order.__table__.c.id)
+    return columns
+
+
+def get_order_rows(fields: Optional[Sequence[str]] = None, limit: Optional[int] = None,
+                   after_id: Optional[int] = None, sort: str = 'id', **filters: Any) -> List[Row]:
+    """
+    Retrieves a page of orders as plain rows holding only the requested columns.
+
+    Unlike get_orders, the rows are selected through SQLAlchemy Core, so no ORM objects are built
+    and the identity map is not involved.
+
+    Args:
+        fields (Optional[Sequence[str]]): The requested fields. Defaults to None (all fields).
+        limit (Optional[int]): The maximum number of orders to return. Defaults to None (no limit).
+        after_id (Optional[int]): Only orders after the order with this ID in the sort order are returned.
+                                  Defaults to None.
+        sort (str): The sort order, one of ORDER_SORTS. Defaults to 'id'.
+        **filters (Any): 'statuses', 'date_from', 'date_to', 'name_prefix', 'updated_after' and 'updated_until'
+                         filters.
+
+    Returns:
+        List[Row]: The rows, with the columns returned by order_columns.
+
+    Raises:
+        ValueError: If a field or the sort order is not supported or the cursor order does not exist.
+    """
+    db = get_session()
+    query = orders_query(db, *order_columns(fields), after_id=after_id, sort=sort, **filters)
+    if limit is not None:
+        query = query.limit(limit)
+    return db.execute(query).all()
+
+
+def iter_order_rows(fields: Optional[Sequence[str]] = None, after_id: Optional[int] = None,
+                    batch_size: int = 1000, sort: str = 'id', **filters: Any) -> Iterator[Row]:
+    """
+    Iterates over orders as plain rows holding only the requested columns, without loading the whole table.
+
+    Args:
+        fields (Optional[Sequence[str]]): The requested fields. Defaults to None (all fields).
+        after_id (Optional[int]): Only orders after the order with this ID in the sort order are returned.
+                                  Defaults to None.
+        batch_size (int): The number of rows fetched from the cursor at a time. Defaults to 1000.
+        sort (str): The sort order, one of ORDER_SORTS. Defaults to 'id'.
+        **filters (Any): 'statuses', 'date_from', 'date_to', 'name_prefix', 'updated_after' and 'updated_until'
+                         filters.
+
+    Yields:
+        Row: The next row, with the columns returned by order_columns.
+
+    Raises:
+        ValueError: If a field or the sort order is not supported or the cursor order does not exist.
+    """
+    db = get_session()
+    query = orders_query(db, *order_columns(fields), after_id=after_id, sort=sort, **filters)
+    yield from db.execute(query.execution_options(yield_per=batch_size))
+
+
+def get_changes_window(since: Optional[datetime] = None,
+                       lag: float = 0) -> Tuple[Optional[datetime], Optional[datetime], datetime]:
+    """
+    Returns the range of changes covered by an export of the orders changed since a watermark.
+
+    The watermark to pass as ``since`` to the next export trails the current time by ``lag`` seconds:
+    a transaction sets 'updated_at' before it commits, so a change stamped just before the export may
+    only become visible after it. As long as no write transaction takes longer than ``lag``, every change
+    stamped at or before the watermark is visible to the export. A delta export covers the orders with
+    ``since < updated_at <= watermark``, leaving the most recent changes to the next one; a full export
+    covers all orders, so the next delta export may repeat the changes of its last ``lag`` seconds.
+
+    Args:
+        since (Optional[datetime]): The watermark of the previous export; timezone-aware values are
+                                    converted to naive UTC. Defaults to None (all orders).
+        lag (float): The longest expected write transaction, in seconds. Defaults to 0.
+
+    Returns:
+        Tuple[Optional[datetime], Optional[datetime], datetime]: The naive UTC lower and upper bounds of the
+        changes, None if unbounded, and the watermark of the next export.
+    """
+    since = to_naive_utc(since)
+    watermark = datetime.utcnow() - timedelta(seconds=lag)
+    if since is None:
+        return None, None, watermark
+    watermark = max(watermark, since)
+    return since, watermark, watermark
 
 
 def get_order(id: int) -> Optional[Order]:
@@ -53,13 +365,44 @@ def get_order(id: int) -> Optional[Order]:
     Raises:
         ValueError: If the order with the given ID does not exist.
     """
-    db = next(get_db())
+    db = get_session()
     order = db.get(Order, id)
     if order is None:
         raise ValueError(f'Order {id} not found')
     return order
 
 
+def get_order_dict(id: int) -> Dict[str, Any]:
+    """
+    Retrieves a single order by its ID as a dictionary, reading through the order cache.
+
+    On a cache miss, the order is selected as a plain row, without building an ORM object.
+
+    Changed orders are invalidated in the cache when their transaction commits; entries also expire
+    after the configured time to live, which bounds staleness across processes.
+
+    Args:
+        id (int): The ID of the order to retrieve.
+
+    Returns:
+        Dict[str, Any]: A dictionary representation of the order.
+
+    Raises:
+        ValueError: If the order with the given ID does not exist.
+    """
+    cache = get_order_cache()
+    order = cache.get(id) if cache is not None else None
+    if order is None:
+        version = cache.version if cache is not None else None
+        row = get_session().execute(select(*order_columns()).where(Order.id == id)).first()
+        if row is None:
+            raise ValueError(f'Order {id} not found')
+        order = row._asdict()
+        if cache is not None:
+            cache.set(id, order, version)
+    return order
+
+
 def edit_order(id: int, updated_order: OrderSchema) -> Order:
     """
     Edits an existing order with the provided updated order details.
@@ -74,13 +417,19 @@ def edit_order(id: int, updated_order: OrderSchema) -> Order:
     Raises:
         ValueError: If the order with the given ID does not exist.
     """
-    db = next(get_db())
+    db = get_session()
     order = db.get(Order, id)
     if order is None:
         raise ValueError(f'Order {id} not found')
+    if order.status != updated_order.status:
+        apply_status_deltas(db, {order.status: -1, updated_order.status: 1})
+        apply_rollup_deltas(db, {(order.creation_date, order.status): -1,
+                                 (order.creation_date, updated_order.status): 1})
     order.name = updated_order.name
     order.description = updated_order.description
     order.status = updated_order.status
+    order.updated_at = datetime.utcnow()
+    mark_orders_changed(db, [id])
     db.commit()
     db.refresh(order)
     return order
@@ -99,41 +448,191 @@ def delete_order(id: int) -> Order:
     Raises:
         ValueError: If the order with the given ID does not exist.
     """
-    db = next(get_db())
+    db = get_session()
     order = db.get(Order, id)
     if order is None:
         raise ValueError(f'Order {id} not found')
     db.delete(order)
+    apply_status_deltas(db, {order.status: -1})
+    apply_rollup_deltas(db, {(order.creation_date, order.status): -1})
+    mark_orders_changed(db, [id])
     db.commit()
     return order
 
 
-def update_status(ids: List[int], new_status: str) -> Dict[str, Union[List[Order], List[str]]]:
+def update_status(ids: List[int], new_status: str, return_orders: bool = True,
+                  chunk_size: int = STATUS_UPDATE_CHUNK_SIZE) -> Dict[str, Union[List[Order], List[str], int]]:
     """
-    Updates the status of multiple orders.
+    Updates the status of multiple orders in a single transaction.
+
+    The IDs are split into chunks of ``chunk_size`` and each chunk is updated with one
+    set-based ``UPDATE ... WHERE id IN (...)`` statement, after the affected rows are locked
+    to adjust the status and rollup counters. On backends that support it,
+    the updated rows are read back with ``RETURNING``; otherwise they are selected after
+    the update within the same transaction. IDs that were not updated are reported as not found.
 
     Args:
         ids (List[int]): A list of order IDs to update.
         new_status (str): The new status to set for the orders.
+        return_orders (bool): Whether to return the updated orders. If False, only the number of
+                              updated orders is returned. Defaults to True.
+        chunk_size (int): The maximum number of IDs per UPDATE statement. Defaults to STATUS_UPDATE_CHUNK_SIZE.
 
     Returns:
-        Dict[str, Union[List[Order], List[str]]]: A dictionary containing lists of updated orders and not found order IDs.
+        Dict[str, Union[List[Order], List[str], int]]: A dictionary containing the number of updated orders,
+        the list of updated orders (if requested) and the list of not found order IDs.
     """
-    db = next(get_db())
+    db = get_session()
+    requested_ids = list(dict.fromkeys(ids))
+    supports_returning = db.get_bind().dialect.update_returning
+    execution_options = {'synchronize_session': False, 'populate_existing': True}
+    now = datetime.utcnow()
     updated_orders = []
-    not_found_orders = []
-
-    for id in ids:
-        order = db.get(Order, id)
-        if order:
-            order.status = new_status
-            db.commit()
-            db.refresh(order)
-            updated_orders.append(order)
-        else:
-            not_found_orders.append(f"Order ID {id} not found")
-
-    return {
-        "updated_orders": updated_orders,
+    updated_ids = set()
+
+    try:
+        mark_orders_changed(db, requested_ids)
+        for start in range(0, len(requested_ids), chunk_size):
+            chunk = requested_ids[start:start + chunk_size]
+            # Lock the rows and read their current statuses to keep the status and rollup counters exact
+            current_rows = db.execute(
+                select(Order.creation_date, Order.status).where(Order.id.in_(chunk)).with_for_update()
+            ).all()
+            status_deltas = Counter()
+            rollup_deltas = Counter()
+            for creation_date, status in current_rows:
+                status_deltas[status] -= 1
+                status_deltas[new_status] += 1
+                rollup_deltas[creation_date, status] -= 1
+                rollup_deltas[creation_date, new_status] += 1
+            apply_status_deltas(db, status_deltas)
+            apply_rollup_deltas(db, rollup_deltas)
+
+            statement = update(Order).where(Order.id.in_(chunk)).values(status=new_status, updated_at=now)
+            if supports_returning:
+                returned = statement.returning(Order if return_orders else Order.id)
+                rows = db.scalars(returned, execution_options=execution_options).all()
+            else:
+                db.execute(statement, execution_options={'synchronize_session': False})
+                selected = select(Order if return_orders else Order.id).where(Order.id.in_(chunk))
+                rows = db.scalars(selected, execution_options=execution_options).all()
+
+            if return_orders:
+                updated_orders.extend(rows)
+                updated_ids.update(order.id for order in rows)
+            else:
+                updated_ids.update(rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    not_found_orders = [f"Order ID {id} not found" for id in requested_ids if id not in updated_ids]
+    result = {
+        "updated_count": len(updated_ids),
         "not_found_orders": not_found_orders
     }
+    if return_orders:
+        position = {id: index for index, id in enumerate(requested_ids)}
+        result["updated_orders"] = sorted(updated_orders, key=lambda order: position[order.id])
+    return result
+
+
+def _fetch_stored_orders(db: Session, ids: List[int]) -> Dict[int, Row]:
+    """
+    Fetches the stored columns of the orders with the given IDs.
+
+    If the IDs are dense, as in an export re-imported in ID order, the orders are fetched with a single
+    ``id BETWEEN`` range scan; otherwise they are looked up in chunks of STATUS_UPDATE_CHUNK_SIZE IDs.
+
+    Args:
+        db (Session): The database session.
+        ids (List[int]): The order IDs.
+
+    Returns:
+        Dict[int, Row]: The stored orders, by order ID, with the columns of IMPORT_FIELDS.
+    """
+    columns = order_columns(IMPORT_FIELDS)
+    low, high = min(ids), max(ids)
+    if high - low + 1 <= 2 * len(ids):
+        wanted = set(ids)
+        rows = db.execute(select(*columns).where(Order.id.between(low, high)))
+        return {row.id: row for row in rows if row.id in wanted}
+
+    stored = {}
+    for start in range(0, len(ids), STATUS_UPDATE_CHUNK_SIZE):
+        chunk = ids[start:start + STATUS_UPDATE_CHUNK_SIZE]
+        stored.update((row.id, row) for row in db.execute(select(*columns).where(Order.id.in_(chunk))))
+    return stored
+
+
+def upsert_orders(db: Session, orders: List[Mapping[str, Any]]) -> Dict[str, int]:
+    """
+    Inserts new orders and updates changed ones with a single bulk upsert statement.
+
+    The stored versions of the orders are fetched first, and orders identical to their stored
+    version are skipped, so re-importing mostly unchanged data only writes the differences.
+    The statement is an ``INSERT ... ON CONFLICT (id) DO UPDATE`` with one VALUES row per new or
+    changed order. If an ID occurs more than once, the last occurrence wins. The status and rollup
+    counters are adjusted in the same transaction and the 'updated_at' of the written orders is set;
+    committing is left to the caller. Timezone-aware creation dates are stored as naive UTC.
+
+    Args:
+        db (Session): The database session.
+        orders (List[Mapping[str, Any]]): The orders to upsert, as dictionaries with the keys of IMPORT_FIELDS.
+
+    Returns:
+        Dict[str, int]: A dictionary with the number of 'inserted', 'updated' and 'unchanged' orders.
+    """
+    rows = list({order['id']: {**{field: order[field] for field in IMPORT_FIELDS},
+                               'creation_date': to_naive_utc(order['creation_date'])}
+                 for order in orders}.values())
+    if not rows:
+        return {"inserted": 0, "updated": 0, "unchanged": 0}
+
+    stored = _fetch_stored_orders(db, [row['id'] for row in rows])
+    changed_rows = [row for row in rows
+                    if row['id'] not in stored or tuple(row.values()) != tuple(stored[row['id']])]
+    inserted = sum(1 for row in changed_rows if row['id'] not in stored)
+    result = {"inserted": inserted, "updated": len(changed_rows) - inserted,
+              "unchanged": len(rows) - len(changed_rows)}
+    if not changed_rows:
+        return result
+
+    mark_orders_changed(db, [row['id'] for row in changed_rows])
+    status_deltas = Counter(row['status'] for row in changed_rows)
+    status_deltas.subtract(stored[row['id']].status for row in changed_rows if row['id'] in stored)
+    apply_status_deltas(db, status_deltas)
+    rollup_deltas = Counter((row['creation_date'], row['status']) for row in changed_rows)
+    rollup_deltas.subtract((stored[row['id']].creation_date, stored[row['id']].status)
+                           for row in changed_rows if row['id'] in stored)
+    apply_rollup_deltas(db, rollup_deltas)
+
+    now = datetime.utcnow()
+    insert = get_insert(db)
+    statement = insert(Order.__table__).values([{**row, 'updated_at': now} for row in changed_rows])
+    statement = statement.on_conflict_do_update(
+        index_elements=[Order.id],
+        set_={column: statement.excluded[column] for column in IMPORT_FIELDS[1:] + ('updated_at',)}
+    )
+    db.execute(statement)
+    return result
+
+
+def upsert_orders_batch(db: Session, orders: List[Mapping[str, Any]], result: Dict[str, int]) -> None:
+    """
+    Upserts a batch of orders in its own transaction and adds its counts to the running result of an import.
+
+    Args:
+        db (Session): The database session.
+        orders (List[Mapping[str, Any]]): The orders to upsert, as dictionaries with the keys of IMPORT_FIELDS.
+        result (Dict[str, int]): The running 'inserted', 'updated' and 'unchanged' counts of the import.
+    """
+    try:
+        counts = upsert_orders(db, orders)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    for key, count in counts.items():
+        result[key] += count
@@ -0,0 +1,187 @@
+"""
+This module maintains the hourly order rollups behind the order trends.
+
+Every write path adds its deltas to the counter of the UTC hour each order was created in, by status,
+in the transaction that changes the orders. Days and weeks are summed from the hourly counters.
+
+Functions:
+    hour_bucket(value): Truncates a datetime to the naive UTC start of its hour.
+    apply_rollup_deltas(db, deltas): Adds deltas to the rollup counters in the current transaction.
+    get_order_timeseries(granularity, date_from, date_to): Retrieves the order counts per period and status.
+    hour_start(column, dialect_name): Builds a SQL expression truncating a datetime column to its hour.
+    backfill_order_rollups(date_from): Recounts the rollup counters from the orders table.
+"""
+
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Mapping, Optional, Tuple
+
+from sqlalchemy import delete, distinct, func, literal_column, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from src.database.db import get_insert, get_session
+from src.database.models import Order, OrderRollup
+from src.routes.services.order_statistic_service import period_start
+from src.schemas.orders import to_naive_utc
+
+GRANULARITIES = ('hour', 'day', 'week')
+
+
+def hour_bucket(value: datetime) -> datetime:
+    """
+    Truncates a datetime to the start of its hour, the bucket of the rollup counters.
+
+    Timezone-aware datetimes are converted to naive UTC first, so every write path buckets them
+    like the stored creation dates and aware and naive values can be counted together.
+
+    Args:
+        value (datetime): The datetime to truncate.
+
+    Returns:
+        datetime: The naive UTC start of the hour.
+    """
+    return to_naive_utc(value).replace(minute=0, second=0, microsecond=0)
+
+
+def apply_rollup_deltas(db: Session, deltas: Mapping[Tuple[Optional[datetime], str], int]) -> None:
+    """
+    Adds the given deltas to the rollup counters of the hours the orders were created in.
+
+    The counters are upserted in the session's current transaction; committing is left to the caller,
+    so the counters change atomically with the orders. Orders without a creation date are not counted.
+    The counters are locked in the order of their hour and status, so concurrent transactions cannot
+    deadlock each other.
+
+    Args:
+        db (Session): The database session.
+        deltas (Mapping[Tuple[Optional[datetime], str], int]): The change of the order count for each
+                                                               creation date and status.
+    """
+    bucket_deltas = Counter()
+    for (creation_date, status), delta in deltas.items():
+        if creation_date is not None:
+            bucket_deltas[hour_bucket(creation_date), status] += delta
+    rows = [{'bucket': bucket, 'status': status, 'count': delta}
+            for (bucket, status), delta in sorted(bucket_deltas.items()) if delta]
+    if not rows:
+        return
+    insert = get_insert(db)
+    statement = insert(OrderRollup)
+    statement = statement.on_conflict_do_update(
+        index_elements=[OrderRollup.bucket, OrderRollup.status],
+        set_={'count': OrderRollup.count + statement.excluded.count}
+    )
+    db.execute(statement, rows)
+
+
+def get_order_timeseries(granularity: str, date_from: Optional[datetime] = None,
+                         date_to: Optional[datetime] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Retrieves the number of orders created per hour, day or week, by status, from the rollup counters.
+
+    Only the hourly counters of the requested range are read, and they are summed per day or week in the
+    database, so the cost depends on the length of the range and the number of statuses, not on the number
+    of orders. Weeks start on Monday.
+
+    Args:
+        granularity (str): The length of the periods, one of GRANULARITIES.
+        date_from (Optional[datetime]): The inclusive lower bound of the creation date, truncated to its hour.
+                                        Defaults to None.
+        date_to (Optional[datetime]): The exclusive upper bound of the start of the hours. Defaults to None.
+
+    Returns:
+        Dict[str, Dict[str, int]]: A dictionary mapping the start of each period with orders to its status counts,
+        in chronological order. Hours are keyed by their ISO 8601 datetime, days and weeks by their 'YYYY-MM-DD' date.
+
+    Raises:
+        ValueError: If the granularity or the database dialect is not supported.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported granularity '{granularity}'")
+    db = get_session()
+    if granularity == 'hour':
+        start = OrderRollup.bucket
+        query = select(start, OrderRollup.status, OrderRollup.count).where(OrderRollup.count > 0)
+    else:
+        start = period_start(OrderRollup.bucket, granularity, db.get_bind().dialect.name).label('period_start')
+        total = func.sum(OrderRollup.count)
+        query = select(start, OrderRollup.status, total).group_by(start, OrderRollup.status).having(total > 0)
+    if date_from is not None:
+        query = query.where(OrderRollup.bucket >= hour_bucket(date_from))
+    if date_to is not None:
+        query = query.where(OrderRollup.bucket < date_to)
+
+    timeseries = {}
+    for period, status, count in db.execute(query.order_by(start)):
+        key = period.isoformat() if isinstance(period, datetime) else period
+        timeseries.setdefault(key, {})[status] = count
+    return timeseries
+
+
+def hour_start(column: ColumnElement, dialect_name: str) -> ColumnElement:
+    """
+    Builds a SQL expression truncating a datetime column to the start of its hour, like hour_bucket.
+
+    On SQLite, the hour is rendered in the format SQLAlchemy stores datetimes in, so the counters written
+    by the database and by the application share their keys.
+
+    Args:
+        column (ColumnElement): The datetime column to truncate.
+        dialect_name (str): The name of the database dialect, 'postgresql' or 'sqlite'.
+
+    Returns:
+        ColumnElement: The SQL expression for the start of the hour.
+
+    Raises:
+        ValueError: If the dialect is not supported.
+    """
+    if dialect_name == 'postgresql':
+        return func.date_trunc(literal_column("'hour'"), column)
+    if dialect_name == 'sqlite':
+        return func.strftime('%Y-%m-%d %H:00:00.000000', column)
+    raise ValueError(f"Unsupported database dialect '{dialect_name}'")
+
+
+def backfill_order_rollups(date_from: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Rebuilds the rollup counters from the orders table, entirely or from a point in time on.
+
+    The counters are deleted and recounted in one transaction, with a single
+    ``INSERT ... SELECT ... GROUP BY`` statement, so the orders never leave the database.
+    Use this to fill the counters after the table is created, or to reconcile them after orders were
+    changed outside the application.
+
+    Args:
+        date_from (Optional[datetime]): Only rebuild the counters of the hours from the one holding this
+                                        datetime on. Defaults to None (all counters).
+
+    Returns:
+        Dict[str, int]: The number of counted 'orders' and of rebuilt 'buckets'.
+
+    Raises:
+        ValueError: If the database dialect is not supported.
+    """
+    db = get_session()
+    start = hour_bucket(date_from) if date_from is not None else None
+    bucket = hour_start(Order.creation_date, db.get_bind().dialect.name)
+    counts = select(bucket, Order.status, func.count()).where(Order.creation_date.is_not(None))
+    stale = delete(OrderRollup)
+    rebuilt = select(func.coalesce(func.sum(OrderRollup.count), 0), func.count(distinct(OrderRollup.bucket)))
+    if start is not None:
+        counts = counts.where(Order.creation_date >= start)
+        stale = stale.where(OrderRollup.bucket >= start)
+        rebuilt = rebuilt.where(OrderRollup.bucket >= start)
+
+    try:
+        db.execute(stale)
+        db.execute(OrderRollup.__table__.insert().from_select(
+            ['bucket', 'status', 'count'],
+            counts.group_by(bucket, Order.status)
+        ))
+        orders, buckets = db.execute(rebuilt).one()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return {'orders': orders, 'buckets': buckets}
@@ -0,0 +1,78 @@
+"""
+This module maintains the per-status order counters the order statistics are read from.
+
+Every write path adds its status deltas to the counters in the transaction that changes the orders,
+so reading the statistics does not depend on the number of orders.
+
+Functions:
+    apply_status_deltas(db, deltas): Adds deltas to the status counters in the current transaction.
+    get_status_counts(): Retrieves the number of orders in each status from the counters.
+    rebuild_status_counts(): Recounts the status counters from the orders table.
+"""
+
+from typing import Dict, Mapping
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from src.database.db import get_insert, get_session
+from src.database.models import Order, OrderStatusCount
+
+
+def apply_status_deltas(db: Session, deltas: Mapping[str, int]) -> None:
+    """
+    Adds the given deltas to the status counters.
+
+    The counters are upserted in the session's current transaction; committing is left to the caller,
+    so the counters change atomically with the orders. The counters are locked in the order of their
+    status, so concurrent transactions updating several counters cannot deadlock each other.
+
+    Args:
+        db (Session): The database session.
+        deltas (Mapping[str, int]): The change of the order count for each status.
+    """
+    rows = [{'status': status, 'count': delta} for status, delta in sorted(deltas.items()) if delta]
+    if not rows:
+        return
+    insert = get_insert(db)
+    statement = insert(OrderStatusCount)
+    statement = statement.on_conflict_do_update(
+        index_elements=[OrderStatusCount.status],
+        set_={'count': OrderStatusCount.count + statement.excluded.count}
+    )
+    db.execute(statement, rows)
+
+
+def get_status_counts() -> Dict[str, int]:
+    """
+    Retrieves the number of orders in each status from the status counters.
+
+    Returns:
+        Dict[str, int]: A dictionary with order status counts.
+    """
+    db = get_session()
+    rows = db.execute(select(OrderStatusCount.status, OrderStatusCount.count).where(OrderStatusCount.count > 0))
+    return {status: count for status, count in rows}
+
+
+def rebuild_status_counts() -> Dict[str, int]:
+    """
+    Rebuilds the status counters from scratch by counting the orders in each status.
+
+    Use this to reconcile the counters after orders were changed outside the application.
+
+    Returns:
+        Dict[str, int]: A dictionary with the rebuilt order status counts.
+    """
+    db = get_session()
+    try:
+        db.execute(delete(OrderStatusCount))
+        db.execute(OrderStatusCount.__table__.insert().from_select(
+            ['status', 'count'],
+            select(Order.status, func.count()).group_by(Order.status)
+        ))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return get_status_counts()
@@ -1,69 +1,154 @@
-import os
+from datetime import datetime
+from tempfile import SpooledTemporaryFile
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
 
-import pandas as pd
-
-from src.database.db import get_db
-from src.database.models import Order
+from src.database.db import get_session
+from src.routes.services.export_buffer import EXPORT_SPOOL_MAX_SIZE, spool_export
+from src.routes.services.repository import iter_orders, upsert_orders_batch
 import xml.etree.ElementTree as ET
 
-def export_orders_to_xml() -> str:
+EXPORT_BATCH_SIZE = 1000
+IMPORT_BATCH_SIZE = 1000
+
+
+def write_orders_xml(output: BinaryIO, batch_size: int = EXPORT_BATCH_SIZE,
+                     on_progress: Optional[Callable[[int], None]] = None, since: Optional[datetime] = None,
+                     until: Optional[datetime] = None) -> int:
     """
-    Export all orders to an XML file.
+    Write all orders, or the orders changed in a range of time, as an XML document to a binary stream.
 
-    This function retrieves all orders from the database and saves the data to an XML file in the 'reports' directory.
+    Orders are read from a server-side database cursor and each <order> element is serialized
+    and written as soon as it is built, so memory usage does not depend on the number of orders.
+
+    Args:
+        output (BinaryIO): The binary stream to write the XML document to.
+        batch_size (int): The number of rows fetched from the cursor at a time. Defaults to EXPORT_BATCH_SIZE.
+        on_progress (Optional[Callable[[int], None]]): Called with the number of exported orders so far
+                                                       after each batch. Defaults to None.
+        since (Optional[datetime]): Only orders changed after this are exported. Defaults to None.
+        until (Optional[datetime]): Only orders changed at or before this are exported. Defaults to None.
 
     Returns:
-        str: The file path of the created XML file.
+        int: The number of exported orders.
     """
-    db = next(get_db())
-    orders = db.query(Order).all()
-
-    root = ET.Element("orders")
-    for order in orders:
+    count = 0
+    output.write(b'<orders>')
+    for order in iter_orders(batch_size=batch_size, updated_after=since, updated_until=until):
         order_elem = ET.Element("order")
         for key, value in order.to_dict().items():
-            child = ET.Element(key)
-            child.text = str(value)
-            order_elem.append(child)
-        root.append(order_elem)
+            child = ET.SubElement(order_elem, key)
+            if value is not None:
+                child.text = str(value)
+        output.write(ET.tostring(order_elem))
+        count += 1
+        if on_progress is not None and count % batch_size == 0:
+            on_progress(count)
+    output.write(b'</orders>')
+    if on_progress is not None:
+        on_progress(count)
+    return count
+
+
+def export_orders_to_xml(batch_size: int = EXPORT_BATCH_SIZE, since: Optional[datetime] = None,
+                         until: Optional[datetime] = None,
+                         spool_max_size: int = EXPORT_SPOOL_MAX_SIZE) -> SpooledTemporaryFile:
+    """
+    Export all orders, or the orders changed in a range of time, to an XML document in a spooled buffer.
 
-    tree = ET.ElementTree(root)
+    This function streams the orders from the database into a buffer of its own, kept in memory
+    up to ``spool_max_size`` bytes and in a temporary file beyond.
 
-    reports_dir = "reports"
-    if not os.path.exists(reports_dir):
-        os.makedirs(reports_dir)
+    Args:
+        batch_size (int): The number of rows fetched from the database at a time. Defaults to EXPORT_BATCH_SIZE.
+        since (Optional[datetime]): Only orders changed after this are exported. Defaults to None.
+        until (Optional[datetime]): Only orders changed at or before this are exported. Defaults to None.
+        spool_max_size (int): The size in bytes up to which the document is kept in memory.
+                              Defaults to EXPORT_SPOOL_MAX_SIZE.
+
+    Returns:
+        SpooledTemporaryFile: The buffer holding the XML document, positioned at its start; the caller closes it.
+    """
+    return spool_export(lambda buffer: write_orders_xml(buffer, batch_size=batch_size, since=since, until=until),
+                        max_size=spool_max_size)
 
-    file_path = os.path.join(reports_dir, "orders.xml")
-    tree.write(file_path)
 
-    return file_path
+def _order_from_element(order_elem: ET.Element) -> Dict[str, Any]:
+    """
+    Build an order row from an <order> XML element.
 
+    Args:
+        order_elem (ET.Element): The <order> element.
 
-def import_orders_from_xml(file_path: str) -> None:
+    Returns:
+        Dict[str, Any]: The order described by the element, with the keys 'id', 'name', 'description',
+        'creation_date' and 'status'.
+    """
+    order_data = {child.tag: child.text for child in order_elem}
+    creation_date: Optional[str] = order_data.get('creation_date')
+    return {
+        'id': int(order_data['id']),
+        'name': order_data['name'],
+        'description': order_data.get('description'),
+        'creation_date': datetime.fromisoformat(creation_date) if creation_date else None,
+        'status': order_data['status']
+    }
+
+
+def parse_orders_xml(data: bytes) -> List[Dict[str, Any]]:
+    """
+    Parses the orders of a complete XML document held in memory.
+
+    Args:
+        data (bytes): The XML document, an <orders> element holding <order> elements.
+
+    Returns:
+        List[Dict[str, Any]]: The orders, in document order, as built by _order_from_element.
+    """
+    return [_order_from_element(order_elem) for order_elem in ET.fromstring(data).iter('order')]
+
+
+def import_orders_from_xml(file_path: str, batch_size: int = IMPORT_BATCH_SIZE,
+                           on_progress: Optional[Callable[[int], None]] = None) -> Dict[str, int]:
     """
     Import orders from an XML file.
 
-    This function reads order data from an XML file and merges the data into the database.
+    This function parses the XML file incrementally and upserts the orders into the database,
+    committing every ``batch_size`` orders. Each processed <order> element is discarded,
+    so memory usage does not depend on the size of the file. Orders identical to their stored
+    version are not written.
 
     Args:
         file_path (str): The file path of the XML file to import.
+        batch_size (int): The number of orders upserted per transaction. Defaults to IMPORT_BATCH_SIZE.
+        on_progress (Optional[Callable[[int], None]]): Called with the number of processed orders so far
+                                                       after each batch. Defaults to None.
+
+    Returns:
+        Dict[str, int]: A dictionary with the number of 'inserted', 'updated' and 'unchanged' orders.
     """
-    db = next(get_db())
-
-    tree = ET.parse(file_path)
-    root = tree.getroot()
-
-    for order_elem in root.findall('order'):
-        order_data = {child.tag: child.text for child in order_elem}
-        order_data['id'] = int(order_data['id'])
-        order_data['creation_date'] = pd.to_datetime(order_data['creation_date'])
-
-        order = Order(
-            id=order_data['id'],
-            name=order_data['name'],
-            description=order_data['description'],
-            creation_date=order_data['creation_date'],
-            status=order_data['status']
-        )
-        db.merge(order)
-    db.commit()
+    db = get_session()
+    result = {"inserted": 0, "updated": 0, "unchanged": 0}
+    processed = 0
+    batch = []
+
+    context = ET.iterparse(file_path, events=('start', 'end'))
+    _, root = next(context)
+    for event, elem in context:
+        if event != 'end' or elem.tag != 'order':
+            continue
+        batch.append(_order_from_element(elem))
+        # Drop the processed <order> elements from the partially built tree
+        root.clear()
+        if len(batch) >= batch_size:
+            upsert_orders_batch(db, batch, result)
+            processed += len(batch)
+            batch = []
+            if on_progress is not None:
+                on_progress(processed)
+
+    if batch:
+        upsert_orders_batch(db, batch, result)
+        processed += len(batch)
+    if on_progress is not None:
+        on_progress(processed)
+    return result
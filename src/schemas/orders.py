@@ -1,6 +1,23 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, field_validator
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
+
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Converts a datetime to the naive UTC datetimes the database stores.
+
+    Naive datetimes are taken to be in UTC already and returned as they are.
+
+    Args:
+        value (Optional[datetime]): The datetime to convert.
+
+    Returns:
+        Optional[datetime]: The naive UTC datetime, or None if the value is None.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
 
 
 class OrderSchema(BaseModel):
@@ -10,4 +27,12 @@ class OrderSchema(BaseModel):
     creation_date: Optional[datetime] = None
     status: str
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator('creation_date')
+    @classmethod
+    def creation_date_to_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        """
+        Stores the creation date as naive UTC, so an offset is converted rather than dropped.
+        """
+        return to_naive_utc(value)
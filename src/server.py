@@ -0,0 +1,316 @@
+"""
+This module provides a pre-forking WSGI server for running the application in production.
+
+The master process loads and warms up the application once, binds the listening socket and forks the
+worker processes, which inherit both. Each worker replaces the connection pool inherited from the master,
+serves one request at a time from the shared socket and exits gracefully after a number of requests or
+once its memory grows past a threshold; the master then forks a replacement. Before exiting, a worker stops
+taking requests and waits for the background jobs it runs to finish, see JobExecutor.shutdown. As each worker
+has its own order cache, the staleness of the cache is bounded when there are several workers.
+
+Classes:
+    PreforkServer: Master process forking and supervising the worker processes.
+
+Functions:
+    warm_up(app): Prepares the application before the workers are forked.
+    get_memory_usage(): Returns the resident memory of the current process.
+
+Signals:
+    SIGTERM, SIGINT: Stop the server; workers finish the request in progress before exiting.
+    SIGHUP: Recycle all workers gracefully.
+"""
+
+import logging
+import os
+import random
+import resource
+import signal
+import socket
+import time
+from typing import Any, Optional, Set
+
+from flask import Flask
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import configure_mappers
+from werkzeug.serving import BaseWSGIServer
+
+from src.database import db as database
+from src.routes.services import order_cache
+from src.routes.services.job_service import cleanup_jobs
+
+logger = logging.getLogger(__name__)
+
+# The number of seconds a worker waits for a connection before checking whether it should exit
+WORKER_POLL_INTERVAL = 1.0
+# The number of seconds between checks of the master for exited workers
+MASTER_POLL_INTERVAL = 0.1
+LISTEN_BACKLOG = 2048
+
+
+def warm_up(app: Flask) -> None:
+    """
+    Prepares the application before the workers are forked, so they share the work and its memory.
+
+    The ORM mappers are configured and the URL map is compiled, which would otherwise happen on the
+    first request of each worker.
+
+    Args:
+        app (Flask): The Flask application.
+    """
+    configure_mappers()
+    app.url_map.update()
+
+
+def get_memory_usage() -> int:
+    """
+    Returns the resident memory of the current process.
+
+    Returns:
+        int: The resident set size in bytes, or the peak resident set size where the current one is
+        not available.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _WorkerServer(BaseWSGIServer):
+    """
+    The WSGI server of a worker process, counting the requests it handled.
+
+    Attributes:
+        requests_handled (int): The number of connections handled so far.
+    """
+
+    timeout = WORKER_POLL_INTERVAL
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.requests_handled = 0
+
+    def process_request(self, request: socket.socket, client_address: Any) -> None:
+        """
+        Handles a connection and counts it.
+
+        Args:
+            request (socket.socket): The client connection.
+            client_address (Any): The address of the client.
+        """
+        super().process_request(request, client_address)
+        self.requests_handled += 1
+
+
+class PreforkServer:
+    """
+    Master process forking and supervising the worker processes serving the application.
+
+    Attributes:
+        app (Flask): The Flask application.
+        host (str): The host the server listens on.
+        port (int): The port the server listens on.
+        workers (int): The number of worker processes.
+        max_requests (int): The number of requests after which a worker is recycled; 0 never recycles.
+        max_requests_jitter (int): The upper bound of a random number added to max_requests for each worker,
+                                   so the workers are not all recycled at once.
+        max_memory (int): The resident memory in bytes past which a worker is recycled; 0 never recycles.
+        graceful_timeout (float): The number of seconds workers get to finish their requests on shutdown
+                                  before they are killed.
+    """
+
+    def __init__(self, app: Flask, host: str, port: int, workers: int, max_requests: int = 0,
+                 max_requests_jitter: int = 0, max_memory: int = 0, graceful_timeout: float = 30):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.max_memory = max_memory
+        self.graceful_timeout = graceful_timeout
+        self._socket: Optional[socket.socket] = None
+        self._worker_pids: Set[int] = set()
+        self._stopping = False
+
+    def run(self) -> None:
+        """
+        Runs the server until it receives SIGTERM or SIGINT.
+
+        Must be called from the main thread, which handles the signals.
+        """
+        warm_up(self.app)
+        order_cache.limit_to_workers(self.app, self.workers)
+        self._cleanup_jobs()
+        self._socket = socket.create_server((self.host, self.port), backlog=LISTEN_BACKLOG)
+        # Idle workers poll the shared socket; a non-blocking accept lets those that lose the race move on
+        self._socket.setblocking(False)
+        self.port = self._socket.getsockname()[1]
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_recycle)
+        logger.info('Listening on http://%s:%d with %d workers', self.host, self.port, self.workers)
+        try:
+            for _ in range(self.workers):
+                self._spawn_worker()
+            self._supervise()
+        finally:
+            self._socket.close()
+        logger.info('Server stopped')
+
+    def _cleanup_jobs(self) -> None:
+        """
+        Fails the background jobs left behind by a previous run and deletes the expired job artifacts.
+        """
+        config = self.app.config
+        try:
+            with self.app.app_context():
+                result = cleanup_jobs(config['JOB_STALE_TIMEOUT'], config['JOB_ARTIFACT_TTL'])
+        except SQLAlchemyError as e:
+            logger.warning('Could not clean up the background jobs: %s', e)
+            return
+        if any(result.values()):
+            logger.info('Failed %d abandoned jobs, deleted %d expired artifacts',
+                        result['failed'], result['deleted_artifacts'])
+
+    def _handle_stop(self, signum: int, frame: Any) -> None:
+        """
+        Stops the server, letting the workers finish the requests in progress.
+
+        Args:
+            signum (int): The received signal.
+            frame (Any): The interrupted stack frame.
+        """
+        if not self._stopping:
+            logger.info('Stopping, waiting up to %ss for the workers to finish', self.graceful_timeout)
+        self._stopping = True
+        self._signal_workers(signal.SIGTERM)
+
+    def _handle_recycle(self, signum: int, frame: Any) -> None:
+        """
+        Recycles all workers gracefully; the master forks their replacements as they exit.
+
+        Args:
+            signum (int): The received signal.
+            frame (Any): The interrupted stack frame.
+        """
+        logger.info('Recycling all workers')
+        self._signal_workers(signal.SIGTERM)
+
+    def _signal_workers(self, signum: int) -> None:
+        """
+        Sends a signal to all worker processes.
+
+        Args:
+            signum (int): The signal to send.
+        """
+        for pid in list(self._worker_pids):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def _supervise(self) -> None:
+        """
+        Replaces exited workers until the server stops, then waits for the workers to exit.
+
+        Workers still running after graceful_timeout seconds of the shutdown are killed.
+        """
+        deadline = None
+        while self._worker_pids:
+            if self._stopping and deadline is None:
+                deadline = time.monotonic() + self.graceful_timeout
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                if deadline is not None and time.monotonic() > deadline:
+                    logger.warning('Killing %d workers after the graceful timeout', len(self._worker_pids))
+                    self._signal_workers(signal.SIGKILL)
+                    deadline = float('inf')
+                time.sleep(MASTER_POLL_INTERVAL)
+                continue
+            self._worker_pids.discard(pid)
+            if os.waitstatus_to_exitcode(status) != 0:
+                logger.warning('Worker %d exited with status %d', pid, os.waitstatus_to_exitcode(status))
+            if not self._stopping:
+                self._spawn_worker()
+
+    def _spawn_worker(self) -> None:
+        """
+        Forks a worker process.
+        """
+        pid = os.fork()
+        if pid:
+            self._worker_pids.add(pid)
+            return
+
+        exit_code = 1
+        try:
+            exit_code = self._run_worker()
+        except BaseException:
+            logger.exception('Worker %d failed', os.getpid())
+        finally:
+            logging.shutdown()
+            os._exit(exit_code)
+
+    def _run_worker(self) -> int:
+        """
+        Serves requests in a worker process until it is stopped or due for recycling.
+
+        Returns:
+            int: The exit code of the worker.
+        """
+        stopping = False
+        # The master kills the workers graceful_timeout seconds after it asks them to stop
+        deadline = None
+
+        def handle_stop(signum: int, frame: Any) -> None:
+            nonlocal stopping, deadline
+            stopping = True
+            if deadline is None:
+                deadline = time.monotonic() + self.graceful_timeout
+
+        signal.signal(signal.SIGTERM, handle_stop)
+        signal.signal(signal.SIGINT, handle_stop)
+        signal.signal(signal.SIGHUP, signal.SIG_DFL)
+        random.seed()
+
+        database.dispose_engine_after_fork()
+        try:
+            # Open the first pooled connection before accepting traffic
+            database.engine.connect().close()
+        except SQLAlchemyError as e:
+            logger.warning('Worker %d could not connect to the database: %s', os.getpid(), e)
+
+        max_requests = self.max_requests + random.randint(0, self.max_requests_jitter) if self.max_requests else 0
+        server = _WorkerServer(self.host, self.port, self.app, fd=self._socket.fileno())
+        logger.info('Worker %d started', os.getpid())
+        try:
+            while not stopping:
+                server.handle_request()
+                if max_requests and server.requests_handled >= max_requests:
+                    logger.info('Recycling worker %d after %d requests', os.getpid(), server.requests_handled)
+                    break
+                if self.max_memory and get_memory_usage() > self.max_memory:
+                    logger.info('Recycling worker %d using %d MiB', os.getpid(), get_memory_usage() // 2 ** 20)
+                    break
+        finally:
+            server.server_close()
+            self._finish_jobs(deadline)
+            database.engine.dispose()
+        return 0
+
+    def _finish_jobs(self, deadline: Optional[float]) -> None:
+        """
+        Waits for the background jobs of a worker process to finish before it exits.
+
+        Jobs still running at the deadline, or after graceful_timeout seconds when the worker is recycled,
+        are marked as failed.
+
+        Args:
+            deadline (Optional[float]): The monotonic time by which the worker must exit, or None if it exits
+                                        on its own.
+        """
+        timeout = self.graceful_timeout if deadline is None else max(0.0, deadline - time.monotonic() - 1)
+        failed = self.app.extensions['jobs'].shutdown(timeout=timeout)
+        if failed:
+            logger.warning('Worker %d exited with %d unfinished jobs, marked as failed', os.getpid(), len(failed))
@@ -0,0 +1,154 @@
+"""
+This module measures the cold start of the application: the time and memory it takes to import the
+application and create it, and the import cost of each module.
+
+The measurement runs in a fresh interpreter started with ``-X importtime``, so modules already imported
+by the calling process do not hide their cost.
+
+Functions:
+    measure_startup(config_name): Measures the cold start of the application in a new process.
+    parse_import_times(output): Parses the output of ``python -X importtime``.
+    summarize_import_times(imports, top): Sums the import times by package and lists the costliest modules.
+    format_startup_report(report, budget_seconds): Formats a startup measurement as a text report.
+
+Usage:
+    Run ``flask startup-report`` to print the report, optionally failing if a budget is exceeded.
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+FIRST_PARTY_PACKAGE = 'src'
+
+# Run in the measured interpreter; prints the measurements as JSON on stdout
+_MEASURE_SCRIPT = '''
+import json, resource, sys, time
+started = time.perf_counter()
+from src.app import create_app
+imported = time.perf_counter()
+create_app(sys.argv[1])
+created = time.perf_counter()
+from src.routes.services.format_backends import get_loaded_backends
+print(json.dumps({
+    'import_seconds': imported - started,
+    'create_app_seconds': created - imported,
+    'max_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'loaded_modules': len(sys.modules),
+    'loaded_backends': get_loaded_backends(),
+}))
+'''
+
+
+def parse_import_times(output: str) -> List[Dict[str, Any]]:
+    """
+    Parses the output of ``python -X importtime``.
+
+    Args:
+        output (str): The standard error of the interpreter.
+
+    Returns:
+        List[Dict[str, Any]]: One entry per imported module, in the order their imports finished, with the
+        'module' name, its 'self_us' and 'cumulative_us' import times in microseconds and its nesting 'depth'.
+    """
+    imports = []
+    for line in output.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            imports.append({
+                'module': match.group(4),
+                'self_us': int(match.group(1)),
+                'cumulative_us': int(match.group(2)),
+                'depth': len(match.group(3)) // 2
+            })
+    return imports
+
+
+def summarize_import_times(imports: List[Dict[str, Any]], top: int = 15) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Sums the import times by top-level package and lists the costliest modules of the application.
+
+    Args:
+        imports (List[Dict[str, Any]]): The imported modules, as returned by parse_import_times.
+        top (int): The number of packages and modules to list. Defaults to 15.
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: The 'packages' with the largest total import time ('self_ms', the
+        sum of the own import times of their modules) and the application 'modules' with the largest
+        'cumulative_ms' import time, which includes the modules they imported first.
+    """
+    packages = Counter()
+    for entry in imports:
+        packages[entry['module'].split('.')[0]] += entry['self_us']
+    modules = sorted((entry for entry in imports if entry['module'].split('.')[0] == FIRST_PARTY_PACKAGE),
+                     key=lambda entry: entry['cumulative_us'], reverse=True)
+    return {
+        'packages': [{'package': package, 'self_ms': self_us / 1000}
+                     for package, self_us in packages.most_common(top)],
+        'modules': [{'module': entry['module'], 'cumulative_ms': entry['cumulative_us'] / 1000}
+                    for entry in modules[:top]]
+    }
+
+
+def measure_startup(config_name: str, top: int = 15) -> Dict[str, Any]:
+    """
+    Measures the cold start of the application in a new process.
+
+    Args:
+        config_name (str): The configuration name the application is created with.
+        top (int): The number of packages and modules to list. Defaults to 15.
+
+    Returns:
+        Dict[str, Any]: The 'startup_seconds' (import and create_app), 'import_seconds', 'create_app_seconds',
+        the peak resident memory 'max_rss_mib', the number of 'loaded_modules', the 'loaded_backends' and the
+        import times by 'packages' and application 'modules', see summarize_import_times.
+
+    Raises:
+        RuntimeError: If the application cannot be started.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', _MEASURE_SCRIPT, config_name],
+                             cwd=root, capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"The application failed to start: {process.stderr.strip().splitlines()[-1:]}")
+    measurements = json.loads(process.stdout.strip().splitlines()[-1])
+    max_rss_kib = measurements.pop('max_rss_kib')
+    # ru_maxrss is in bytes on macOS and in kibibytes elsewhere
+    max_rss_mib = max_rss_kib / 2 ** 20 if sys.platform == 'darwin' else max_rss_kib / 1024
+    return {
+        'startup_seconds': measurements['import_seconds'] + measurements['create_app_seconds'],
+        **measurements,
+        'max_rss_mib': max_rss_mib,
+        **summarize_import_times(parse_import_times(process.stderr), top)
+    }
+
+
+def format_startup_report(report: Dict[str, Any], budget_seconds: Optional[float] = None) -> str:
+    """
+    Formats a startup measurement as a text report.
+
+    Args:
+        report (Dict[str, Any]): The measurement, as returned by measure_startup.
+        budget_seconds (Optional[float]): The startup time budget to show. Defaults to None.
+
+    Returns:
+        str: The report.
+    """
+    budget = f" (budget {budget_seconds:.2f} s)" if budget_seconds is not None else ''
+    lines = [
+        f"Startup: {report['startup_seconds']:.3f} s{budget}, import {report['import_seconds']:.3f} s, "
+        f"create_app {report['create_app_seconds']:.3f} s",
+        f"Peak RSS: {report['max_rss_mib']:.1f} MiB, {report['loaded_modules']} modules loaded",
+        f"Format backends loaded at startup: {', '.join(report['loaded_backends']) or 'none'}",
+        '',
+        'Packages by import time:'
+    ]
+    lines.extend(f"  {entry['package']:<40} {entry['self_ms']:>9.1f} ms" for entry in report['packages'])
+    lines.extend(['', 'Application modules by cumulative import time:'])
+    lines.extend(f"  {entry['module']:<40} {entry['cumulative_ms']:>9.1f} ms" for entry in report['modules'])
+    return '\n'.join(lines)
@@ -1,7 +1,8 @@
 import pytest
 from src.app import create_app
-from src.database.db import get_engine, SessionLocal, get_db
+from src.database.db import get_engine, SessionLocal, get_db, remove_session
 from src.database.models import Base
+from sqlalchemy import event
 from sqlalchemy.orm import sessionmaker
 
 
@@ -18,6 +19,16 @@ def engine(app):
     Returns session-wide initialized database engine.
     """
     engine = get_engine(app.config['SQLALCHEMY_DATABASE_URI'])
+
+    # Let SQLAlchemy emit BEGIN itself so pysqlite supports the SAVEPOINTs used by the session fixture
+    @event.listens_for(engine, 'connect')
+    def do_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def do_begin(connection):
+        connection.exec_driver_sql('BEGIN')
+
     SessionLocal.configure(bind=engine)
     return engine
 
@@ -40,13 +51,17 @@ def session(engine, tables, request):
     connection = engine.connect()
     transaction = connection.begin()
 
+    # Sessions opened by the application join the test transaction, committing to savepoints
+    SessionLocal.configure(bind=connection, join_transaction_mode='create_savepoint')
     options = dict(bind=connection, binds={})
     session = SessionLocal(**options)
 
     def teardown():
+        remove_session()
+        session.close()
         transaction.rollback()
         connection.close()
-        session.close()
+        SessionLocal.configure(bind=engine, join_transaction_mode='conditional_savepoint')
 
     request.addfinalizer(teardown)
     return session
@@ -0,0 +1,24 @@
+import json
+import subprocess
+import sys
+from benchmarks.compare import compare
+
+
+def test_benchmark_suite_smoke(tmpdir):
+    output = str(tmpdir.join("results.json"))
+    subprocess.run([sys.executable, '-m', 'benchmarks', '--sizes', '50', '--repeat', '1',
+                    '--benchmark', 'repository.get_order*', '--benchmark', 'xml_service.*',
+                    '--data-dir', str(tmpdir), '--output', output], check=True, capture_output=True)
+
+    with open(output) as f:
+        document = json.load(f)
+    assert document['metadata']['database'] == 'sqlite'
+    names = [result['benchmark'] for result in document['results']]
+    assert names == ['repository.get_orders', 'repository.get_orders_filtered', 'repository.get_order_rows',
+                     'repository.get_order', 'repository.get_order_dict',
+                     'xml_service.write_orders_xml', 'xml_service.import_orders_from_xml']
+    result = document['results'][3]
+    assert (result['size'], result['rows'], result['queries']) == (50, 50, 50)
+    assert result['peak_memory_bytes'] > 0
+
+    assert not any(comparison['regressions'] for comparison in compare(document, document))
@@ -1,11 +1,38 @@
+import asyncio
+import gzip
+import io
 import json
+import re
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import threading
 import os
 import h5py
+import pytest
+import numpy as np
 import xml.etree.ElementTree as ET
-from datetime import datetime
-from src.database.models import Order
-from src.routes.services.hdf5_service import export_orders_to_hdf5
-from src.routes.services.xml_service import export_orders_to_xml
+from urllib.request import urlopen
+from datetime import datetime, timedelta
+from src import metrics
+from src.asgi import AsyncOrderApp
+from src.database import db as database
+from src.database.db import db_session, get_async_engine, get_engine
+from src.database.models import Base, Job, Order
+from src.routes.services import bulk_order_service
+from src.routes.services.hdf5_service import export_orders_to_hdf5, import_orders_from_hdf5
+from src.routes.services.xml_service import export_orders_to_xml, import_orders_from_xml
+from src.routes.services.job_service import JOB_KINDS, JobExecutor, submit_job
+from src.routes.services.import_pipeline import import_orders_from_xml_pipeline, xml_chunk_ranges
+from src.routes.services.order_cache import OrderCache, limit_to_workers
+from src.routes.services.repository import update_status
+from src.routes.services.status_count_service import rebuild_status_counts
+from src.routes.services.report_service import generate_report_xlsx
+from src.startup_report import measure_startup
+from openpyxl import load_workbook
+from sqlalchemy import select, text
 
 
 def test_add_order(client, session):
@@ -19,6 +46,17 @@ def test_add_order(client, session):
     assert response.json['name'] == "Test Order"
 
 
+def test_add_order_converts_creation_date_to_utc(client, session):
+    response = client.post('/api/orders', data=json.dumps({
+        "name": "Order",
+        "status": "New",
+        "creation_date": "2024-01-01T10:00:00+02:00"
+    }), content_type='application/json')
+
+    assert response.status_code == 201
+    assert response.json['creation_date'] == "2024-01-01T08:00:00"
+
+
 def test_get_orders(client, session):
     client.post('/api/orders', data=json.dumps({
         "name": "Another Test Order",
@@ -31,6 +69,56 @@ def test_get_orders(client, session):
     assert isinstance(response.json, list)
 
 
+def test_get_orders_pagination(client, session):
+    for i in range(3):
+        client.post('/api/orders', data=json.dumps({
+            "name": f"Order {i}",
+            "status": "New"
+        }), content_type='application/json')
+
+    response = client.get('/api/orders?limit=2')
+    assert response.status_code == 200
+    assert [order['name'] for order in response.json] == ["Order 0", "Order 1"]
+    assert 'rel="next"' in response.headers['Link']
+
+    response = client.get(f"/api/orders?limit=2&after_id={response.headers['X-Next-Cursor']}")
+    assert response.status_code == 200
+    assert [order['name'] for order in response.json] == ["Order 2"]
+    assert 'Link' not in response.headers
+
+    response = client.get('/api/orders?limit=abc')
+    assert response.status_code == 400
+
+
+def test_get_orders_stream(client, session):
+    for i in range(3):
+        client.post('/api/orders', data=json.dumps({
+            "name": f"Order {i}",
+            "status": "New"
+        }), content_type='application/json')
+
+    response = client.get('/api/orders?stream=true')
+    assert response.status_code == 200
+    assert [order['name'] for order in json.loads(response.data)] == ["Order 0", "Order 1", "Order 2"]
+
+    response = client.get('/api/orders?stream=true&sort=creation_date&after_id=999')
+    assert response.status_code == 400
+    assert 'error' in response.json
+
+
+def test_request_session_is_closed_on_teardown(client, session):
+    response = client.get('/api/orders')
+    assert response.status_code == 200
+    assert not db_session.registry.has()
+
+
+def test_get_pool_status(client, session):
+    response = client.get('/api/monitoring/pool')
+    assert response.status_code == 200
+    assert response.json['pool_class']
+    assert 'checked_out' in response.json
+
+
 def test_get_order(client, session):
     response = client.post('/api/orders', data=json.dumps({
         "name": "Order to Retrieve",
@@ -96,6 +184,46 @@ def test_bulk_update_status(client, session):
     assert all(order['status'] == "Completed" for order in response.json['updated_orders'])
 
 
+def test_bulk_update_status_not_found_without_orders(client, session):
+    response = client.post('/api/orders', data=json.dumps({
+        "name": "Order",
+        "status": "New"
+    }), content_type='application/json')
+    order_id = response.json['id']
+
+    response = client.put('/api/orders/update', data=json.dumps({
+        "order_ids": [order_id, 999],
+        "status": "Completed",
+        "return_orders": False
+    }), content_type='application/json')
+
+    assert response.status_code == 200
+    assert response.json['updated_count'] == 1
+    assert response.json['not_found_orders'] == ["Order ID 999 not found"]
+    assert 'updated_orders' not in response.json
+
+    response = client.put('/api/orders/update', data=json.dumps({
+        "order_ids": [order_id],
+        "status": "New",
+        "return_orders": "false"
+    }), content_type='application/json')
+    assert response.status_code == 400
+
+
+def test_update_status_in_chunks(session):
+    orders = [Order(name=f"Order {i}", status="New") for i in range(5)]
+    session.add_all(orders)
+    session.commit()
+    order_ids = [order.id for order in orders]
+
+    result = update_status(list(reversed(order_ids)) + [999], "Completed", chunk_size=2)
+
+    assert result['updated_count'] == 5
+    assert [order.id for order in result['updated_orders']] == list(reversed(order_ids))
+    assert all(order.status == "Completed" for order in result['updated_orders'])
+    assert result['not_found_orders'] == ["Order ID 999 not found"]
+
+
 def test_get_order_statistics(client, session):
     client.post('/api/orders', data=json.dumps({
         "name": "Order 1",
@@ -120,6 +248,146 @@ def test_get_order_statistics(client, session):
     assert response.json['Completed'] == 1
 
 
+def test_get_order_statistics_empty(client, session):
+    response = client.get('/api/orders/statistics')
+    assert response.status_code == 200
+    assert response.json == {}
+
+
+def test_order_statistics_follow_writes(client, session):
+    order_ids = []
+    for status in ["New", "New", "In Progress"]:
+        response = client.post('/api/orders', data=json.dumps({
+            "name": "Order",
+            "status": status
+        }), content_type='application/json')
+        order_ids.append(response.json['id'])
+
+    client.put(f'/api/orders/{order_ids[0]}', data=json.dumps({
+        "name": "Order",
+        "status": "In Progress"
+    }), content_type='application/json')
+    client.put('/api/orders/update', data=json.dumps({
+        "order_ids": order_ids[1:],
+        "status": "Completed"
+    }), content_type='application/json')
+    client.delete(f'/api/orders/{order_ids[2]}')
+
+    response = client.get('/api/orders/statistics')
+    assert response.json == {"In Progress": 1, "Completed": 1}
+
+
+def test_rebuild_status_counts_command(runner, session):
+    session.add_all([Order(name="Order 1", status="New"), Order(name="Order 2", status="New")])
+    session.commit()
+
+    result = runner.invoke(args=['orders', 'rebuild-status-counts'])
+    assert result.exit_code == 0
+    assert 'New: 2' in result.output
+
+
+def test_get_order_statistics_by_period(client, session):
+    session.add_all([
+        Order(name="Order 1", status="New", creation_date=datetime(2024, 6, 3, 10)),
+        Order(name="Order 2", status="New", creation_date=datetime(2024, 6, 9, 23)),
+        Order(name="Order 3", status="Completed", creation_date=datetime(2024, 6, 10, 8)),
+        Order(name="Order 4", status="Completed", creation_date=datetime(2024, 7, 1, 8)),
+    ])
+    session.commit()
+    # The orders were added without the repository, so the status counters are recounted
+    rebuild_status_counts()
+
+    response = client.get('/api/orders/statistics?period=week&date_to=2024-07-01&date_range=true')
+    assert response.status_code == 200
+    assert response.json['status_counts'] == {"New": 2, "Completed": 2}
+    assert response.json['period_counts'] == {
+        "2024-06-03": {"New": 2},
+        "2024-06-10": {"Completed": 1}
+    }
+    assert set(response.json['date_range']) == {"New", "Completed"}
+
+    response = client.get('/api/orders/statistics?period=month')
+    assert response.json['period_counts'] == {
+        "2024-06-01": {"New": 2, "Completed": 1},
+        "2024-07-01": {"Completed": 1}
+    }
+
+    response = client.get('/api/orders/statistics?period=year')
+    assert response.status_code == 400
+
+
+def test_order_timeseries_follows_writes(client, runner, session):
+    order_ids = []
+    for creation_date, status in [("2024-06-03T10:15:00", "New"), ("2024-06-03T10:45:00", "New"),
+                                  ("2024-06-04T09:00:00", "In Progress"), ("2024-06-10T08:30:00", "New")]:
+        response = client.post('/api/orders', data=json.dumps({
+            "name": "Order", "status": status, "creation_date": creation_date
+        }), content_type='application/json')
+        order_ids.append(response.json['id'])
+
+    client.put(f'/api/orders/{order_ids[0]}', data=json.dumps({"name": "Order", "status": "Completed"}),
+               content_type='application/json')
+    client.put('/api/orders/update', data=json.dumps({"order_ids": order_ids[2:], "status": "Completed"}),
+               content_type='application/json')
+    client.delete(f'/api/orders/{order_ids[3]}')
+    client.post('/api/orders/import/ndjson', content_type='application/x-ndjson', data=b'\n'.join([
+        b'{"id": %d, "name": "Order", "status": "New", "creation_date": "2024-06-05T12:00:00"}' % order_ids[1],
+        b'{"id": 100, "name": "Order", "status": "New", "creation_date": "2024-06-11T07:00:00"}'
+    ]))
+
+    response = client.get('/api/orders/statistics/timeseries?granularity=hour&from=2024-06-03T10:30:00')
+    assert response.status_code == 200
+    assert response.json == {
+        "2024-06-03T10:00:00": {"Completed": 1},
+        "2024-06-04T09:00:00": {"Completed": 1},
+        "2024-06-05T12:00:00": {"New": 1},
+        "2024-06-11T07:00:00": {"New": 1}
+    }
+    expected_weeks = {"2024-06-03": {"Completed": 2, "New": 1}, "2024-06-10": {"New": 1}}
+    assert client.get('/api/orders/statistics/timeseries?granularity=week').json == expected_weeks
+    assert client.get('/api/orders/statistics/timeseries?to=2024-06-05').json == {
+        "2024-06-03": {"Completed": 1},
+        "2024-06-04": {"Completed": 1}
+    }
+
+    result = runner.invoke(args=['orders', 'backfill-rollups'])
+    assert result.exit_code == 0
+    assert 'Counted 4 orders in 4 hourly buckets.' in result.output
+    assert client.get('/api/orders/statistics/timeseries?granularity=week').json == expected_weeks
+    # Orders written after the backfill add to the counters it inserted
+    client.post('/api/orders', data=json.dumps({
+        "name": "Order", "status": "New", "creation_date": "2024-06-05T12:30:00"
+    }), content_type='application/json')
+    response = client.get('/api/orders/statistics/timeseries?granularity=hour&from=2024-06-05&to=2024-06-06')
+    assert response.json == {"2024-06-05T12:00:00": {"New": 2}}
+
+    result = runner.invoke(args=['orders', 'backfill-rollups', '--from', '2024-06-05 12:45:00'])
+    assert 'Counted 3 orders in 2 hourly buckets.' in result.output
+    assert client.get('/api/orders/statistics/timeseries?granularity=month').status_code == 400
+
+
+def test_order_rollups_mix_naive_and_aware_creation_dates(client, session):
+    response = client.post('/api/orders/bulk', data=json.dumps([
+        {"name": "Order 1", "status": "New", "creation_date": "2024-01-01T10:00:00"},
+        {"name": "Order 2", "status": "New", "creation_date": "2024-01-01T10:00:00+02:00"}
+    ]), content_type='application/json')
+    assert response.status_code == 201
+    assert response.json['created_count'] == 2
+
+    orders = client.get('/api/orders').json
+    assert [order['creation_date'] for order in orders] == ["2024-01-01T10:00:00", "2024-01-01T08:00:00"]
+
+    response = client.post('/api/orders/import/csv', content_type='text/csv', data=(
+        'id,name,description,creation_date,status\n'
+        f'{response.json["created_ids"][0]},Order 1,,2024-01-01T12:30:00+02:00,Completed\n'
+    ).encode())
+    assert response.status_code == 200
+    assert response.json['updated'] == 1
+
+    response = client.get('/api/orders/statistics/timeseries?granularity=hour')
+    assert response.json == {"2024-01-01T08:00:00": {"New": 1}, "2024-01-01T10:00:00": {"Completed": 1}}
+
+
 def test_generate_report_xlsx(client, session):
     client.post('/api/orders', data=json.dumps({
         "name": "Order for Report",
@@ -132,14 +400,59 @@ def test_generate_report_xlsx(client, session):
     assert response.headers['Content-Type'] == 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
 
 
+def test_generate_report_xlsx_content(session):
+    session.add_all([
+        Order(name="Order 1", status="New", creation_date=datetime(2024, 6, 1)),
+        Order(name="Order 2", status="Completed", creation_date=datetime(2024, 6, 2)),
+        Order(name="Order 3", status="Cancelled", creation_date=datetime(2024, 6, 3)),
+    ])
+    session.commit()
+
+    with generate_report_xlsx(batch_size=2) as report:
+        ws = load_workbook(report).active
+
+    rows = list(ws.iter_rows(values_only=True))
+    assert rows[0] == ('id', 'name', 'description', 'creation_date', 'status')
+    assert rows[2] == (2, "Order 2", None, datetime(2024, 6, 2), "Completed")
+    assert ws['A2'].fill.start_color.rgb == "000000FF"
+    assert ws['E3'].fill.start_color.rgb == "0000FF00"
+    assert ws['B4'].fill.start_color.rgb == "00FFFFFF"
+
+
 def test_export_orders_to_hdf5(session):
     order = Order(name="Order 1", description="Description 1", status="New", creation_date=datetime.utcnow())
     session.add(order)
     session.commit()
 
-    file_path = export_orders_to_hdf5()
-    assert os.path.exists(file_path)
-    os.remove(file_path)
+    with export_orders_to_hdf5() as buffer:
+        assert buffer.read(8) == b'\x89HDF\r\n\x1a\n'
+
+
+def test_export_orders_to_hdf5_layout(session, tmpdir):
+    session.add_all([
+        Order(name=f"Zamówienie {i}", description="Description", status="New", creation_date=datetime(2024, 6, 1, 12, i))
+        for i in range(5)
+    ])
+    session.commit()
+
+    file_path = str(tmpdir.join("orders.hdf5"))
+    with export_orders_to_hdf5(block_size=2, compression='lzf') as buffer, open(file_path, 'wb') as f:
+        shutil.copyfileobj(buffer, f)
+    with h5py.File(file_path, 'r') as f:
+        assert f['id'].dtype == 'int64'
+        assert f['id'].chunks == (2,)
+        assert f['id'].compression == 'lzf'
+        assert f['creation_date'].dtype == 'int64'
+        assert list(f['id'][:]) == [1, 2, 3, 4, 5]
+        assert f['name'].asstr()[0] == "Zamówienie 0"
+        assert f['creation_date'][4] == np.datetime64('2024-06-01T12:04', 'us').astype('int64')
+
+    session.query(Order).delete()
+    session.commit()
+    import_orders_from_hdf5(file_path)
+    orders = session.query(Order).order_by(Order.id).all()
+    assert [order.name for order in orders] == [f"Zamówienie {i}" for i in range(5)]
+    assert orders[4].creation_date == datetime(2024, 6, 1, 12, 4)
 
 
 def test_import_orders_from_hdf5(client, session, tmpdir):
@@ -162,14 +475,84 @@ def test_import_orders_from_hdf5(client, session, tmpdir):
     assert response.json[0]['name'] == "Test Order"
 
 
+def test_import_orders_from_hdf5_upsert(client, session, tmpdir):
+    client.post('/api/orders', data=json.dumps({
+        "name": "Existing Order",
+        "status": "New"
+    }), content_type='application/json')
+
+    file_path = tmpdir.join("orders.hdf5")
+    with h5py.File(file_path, 'w') as f:
+        f.create_dataset("id", data=[1, 2, 3, 4])
+        f.create_dataset("name", data=[b"Updated Order", b"New Order", b"", b"x" * 51])
+        f.create_dataset("description", data=[b"", b"Description", b"", b""])
+        f.create_dataset("status", data=[b"Completed", b"New", b"New", b"New"])
+        f.create_dataset("creation_date", data=[b"2024-06-22 15:24:18.453448", b"NaT", b"", b""])
+
+    with open(file_path, 'rb') as f:
+        response = client.post('/api/orders/import/hdf5', data={'file': (f, "orders.hdf5")})
+
+    assert response.status_code == 200
+    assert response.json['inserted'] == 1
+    assert response.json['updated'] == 1
+    assert response.json['unchanged'] == 0
+    assert response.json['rejected'] == 2
+
+    orders = session.query(Order).order_by(Order.id).all()
+    assert [(order.id, order.name, order.status) for order in orders] == [
+        (1, "Updated Order", "Completed"), (2, "New Order", "New")
+    ]
+    assert orders[0].description is None
+    assert orders[0].creation_date == datetime(2024, 6, 22, 15, 24, 18, 453448)
+    assert client.get('/api/orders/statistics').json == {"Completed": 1, "New": 1}
+
+
+def test_reimport_skips_unchanged_orders(client, session, tmpdir):
+    for i in range(4):
+        client.post('/api/orders', data=json.dumps({"name": f"Order {i}", "status": "New"}),
+                    content_type='application/json')
+
+    with export_orders_to_xml() as buffer:
+        root = ET.parse(buffer).getroot()
+    root.findall('order')[2].find('status').text = "Completed"
+    import_path = str(tmpdir.join("orders.xml"))
+    ET.ElementTree(root).write(import_path)
+
+    with open(import_path, 'rb') as f:
+        response = client.post('/api/orders/import/xml', data={'file': (f, "orders.xml")})
+    assert response.status_code == 200
+    assert response.json == {"message": "Orders imported successfully", "inserted": 0, "updated": 1,
+                             "unchanged": 3}
+    assert session.get(Order, 3).status == "Completed"
+    assert client.get('/api/orders/statistics').json == {"New": 3, "Completed": 1}
+
+
 def test_export_orders_to_xml(session):
     order = Order(name="Order 1", description="Description 1", status="New", creation_date=datetime.utcnow())
     session.add(order)
     session.commit()
 
-    file_path = export_orders_to_xml()
-    assert os.path.exists(file_path)
-    os.remove(file_path)
+    with export_orders_to_xml() as buffer:
+        assert ET.parse(buffer).getroot().find('order/name').text == "Order 1"
+
+
+def test_exports_use_separate_spooled_buffers(app, client, session):
+    session.add(Order(name="Order 1", status="New", creation_date=datetime(2024, 6, 1)))
+    session.commit()
+
+    with export_orders_to_xml(spool_max_size=16) as first:
+        session.add(Order(name="Order 2", status="New", creation_date=datetime(2024, 6, 2)))
+        session.commit()
+        with export_orders_to_xml() as second:
+            assert len(ET.parse(second).getroot().findall('order')) == 2
+        assert len(ET.parse(first).getroot().findall('order')) == 1
+
+    app.config['EXPORT_SPOOL_MAX_SIZE'] = 16
+    response = client.get('/api/orders/export/xml')
+    assert response.status_code == 200
+    assert response.headers['Content-Disposition'] == 'attachment; filename=orders.xml'
+    assert response.content_length == len(response.data)
+    assert response.data.count(b'<order>') == 2
 
 
 def test_import_orders_from_xml(client, session, tmpdir):
@@ -194,3 +577,600 @@ def test_import_orders_from_xml(client, session, tmpdir):
     assert response.status_code == 200
     assert len(response.json) == 1
     assert response.json[0]['name'] == "Test Order"
+
+
+def test_xml_export_import_round_trip(session, tmpdir):
+    session.add_all([
+        Order(name=f"Order {i}", description=None if i % 2 else "Description", status="New",
+              creation_date=datetime(2024, 6, 1, 12, i))
+        for i in range(5)
+    ])
+    session.commit()
+
+    with export_orders_to_xml(batch_size=2) as buffer:
+        root = ET.parse(buffer).getroot()
+    assert len(root.findall('order')) == 5
+
+    for order_elem in root.findall('order'):
+        order_elem.find('name').text += " (imported)"
+    import_path = str(tmpdir.join("orders.xml"))
+    ET.ElementTree(root).write(import_path)
+
+    assert import_orders_from_xml(import_path, batch_size=2) == {'inserted': 0, 'updated': 5, 'unchanged': 0}
+    orders = session.query(Order).order_by(Order.id).all()
+    assert len(orders) == 5
+    assert orders[0].name == "Order 0 (imported)"
+    assert orders[1].description is None
+    assert orders[4].creation_date == datetime(2024, 6, 1, 12, 4)
+
+
+def test_import_orders_from_xml_pipeline(session, tmpdir):
+    session.add_all([Order(name=f"Order {i}", status="New", creation_date=datetime(2024, 6, 1, 12, i))
+                     for i in range(7)])
+    session.commit()
+    with export_orders_to_xml() as buffer:
+        data = buffer.read().replace(b'<name>Order 3</name>', b'<name>Zam\xc3\xb3wienie 3</name>')
+    file_path = str(tmpdir.join("orders.xml"))
+    with open(file_path, 'wb') as f:
+        f.write(b'<?xml version="1.0" encoding="UTF-8"?>\n' + data)
+
+    declaration, ranges = xml_chunk_ranges(file_path, chunk_bytes=300)
+    assert declaration == b'<?xml version="1.0" encoding="UTF-8"?>'
+    assert len(ranges) > 2
+    assert all(stop == start for (_, stop), (start, _) in zip(ranges, ranges[1:]))
+
+    progress = []
+    result = import_orders_from_xml_pipeline(file_path, batch_size=2, chunk_bytes=300, workers=2, max_pending=1,
+                                             on_progress=progress.append)
+    assert result == {'inserted': 0, 'updated': 1, 'unchanged': 6}
+    assert progress[-1] == 7 and progress == sorted(progress)
+    assert session.get(Order, 4).name == "Zamówienie 3"
+
+
+def test_import_hdf5_pipeline_endpoint(app, client, session, tmpdir):
+    app.config['IMPORT_PIPELINE_WORKERS'] = 0
+    app.config['IMPORT_BATCH_SIZE'] = 2
+    file_path = tmpdir.join("orders.hdf5")
+    with h5py.File(file_path, 'w') as f:
+        f.create_dataset("id", data=[1, 2, 3, 4, 5])
+        f.create_dataset("name", data=[b"Order 1", b"", b"Order 3", b"Order 4", b"x" * 51])
+        f.create_dataset("description", data=[b""] * 5)
+        f.create_dataset("status", data=[b"New", b"New", b"Completed", b"New", b"New"])
+        f.create_dataset("creation_date", data=[b"2024-06-01 12:00:00"] * 5)
+
+    with open(file_path, 'rb') as f:
+        response = client.post('/api/orders/import/hdf5?pipeline=true', data={'file': (f, "orders.hdf5")})
+    assert response.status_code == 200
+    assert response.json == {"message": "Orders imported successfully", "inserted": 3, "updated": 0,
+                             "unchanged": 0, "rejected": 2}
+    assert client.get('/api/orders/statistics').json == {"New": 2, "Completed": 1}
+
+
+def test_export_xml_as_job(client, session):
+    client.post('/api/orders', data=json.dumps({"name": "Job Order", "status": "New"}),
+                content_type='application/json')
+
+    response = client.get('/api/orders/export/xml?async=true')
+    assert response.status_code == 202
+    job_url = response.headers['Location']
+    watermark = response.headers['X-Watermark']
+    assert job_url == f"/api/jobs/{response.json['id']}"
+
+    response = client.get(job_url)
+    assert response.status_code == 200
+    assert response.json['status'] == 'completed'
+    assert response.json['progress'] == 1
+    assert response.json['result'] == {'exported': 1, 'watermark': watermark}
+
+    response = client.get(f'{job_url}/download')
+    assert response.status_code == 200
+    assert b'<name>Job Order</name>' in response.data
+
+
+def test_delta_export_since_watermark(app, client, session):
+    order_ids = [client.post('/api/orders', data=json.dumps({"name": f"Order {i}", "status": "New"}),
+                             content_type='application/json').json['id'] for i in range(3)]
+
+    # By default the watermark trails the clock, so the changes just made are held back from delta exports
+    response = client.get('/api/orders/export/xml')
+    assert response.data.count(b'<order>') == 3
+    assert datetime.fromisoformat(response.headers['X-Watermark']) <= datetime.utcnow() - timedelta(seconds=59)
+    response = client.get(f"/api/orders/export/xml?since={response.headers['X-Watermark']}")
+    assert response.data.count(b'<order>') == 0
+
+    app.config['EXPORT_WATERMARK_LAG'] = 0
+    response = client.get('/api/orders/export/xml')
+    assert response.status_code == 200
+    assert response.data.count(b'<order>') == 3
+    watermark = response.headers['X-Watermark']
+
+    client.put(f'/api/orders/{order_ids[1]}', data=json.dumps({"name": "Edited Order", "status": "New"}),
+               content_type='application/json')
+    client.put('/api/orders/update', data=json.dumps({"order_ids": [order_ids[2]], "status": "Completed"}),
+               content_type='application/json')
+
+    response = client.get(f'/api/orders/export/xml?since={watermark}')
+    root = ET.fromstring(response.data)
+    assert [int(order.find('id').text) for order in root.findall('order')] == order_ids[1:]
+    assert root.find('order/name').text == "Edited Order"
+    next_watermark = response.headers['X-Watermark']
+    assert next_watermark > watermark
+
+    response = client.get(f'/api/orders/export/hdf5?since={watermark}')
+    with h5py.File(io.BytesIO(response.data), 'r') as f:
+        assert list(f['id'][:]) == order_ids[1:]
+    response = client.get(f'/api/orders/export/hdf5?since={next_watermark}')
+    with h5py.File(io.BytesIO(response.data), 'r') as f:
+        assert len(f['id']) == 0
+    assert client.get('/api/orders/export/xml?since=yesterday').status_code == 400
+
+
+def test_csv_gzip_export_import_round_trip(app, client, session):
+    app.config['EXPORT_BATCH_SIZE'] = 2
+    for i in range(5):
+        client.post('/api/orders', data=json.dumps({"name": f"Order, {i}", "description": "Line\nbreak",
+                                                    "status": "New"}), content_type='application/json')
+
+    response = client.get('/api/orders/export/csv?compression=gzip')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/gzip'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=orders.csv.gz'
+    assert 'X-Watermark' in response.headers
+    document = gzip.decompress(response.data)
+    assert document.startswith(b'id,name,description,creation_date,status,updated_at\n1,"Order, 0","Line\nbreak"')
+
+    response = client.post('/api/orders/import/csv', data={'file': (io.BytesIO(response.data), "orders.csv.gz")})
+    assert response.status_code == 200
+    assert response.json == {"message": "Orders imported successfully", "inserted": 0, "updated": 0,
+                             "unchanged": 5, "rejected": 0}
+    assert client.get('/api/orders/export/csv?compression=zip').status_code == 400
+    response = client.post('/api/orders/import/csv', data=b'id,description\n1,Order\n', content_type='text/csv')
+    assert response.status_code == 400
+
+
+def test_import_ndjson_from_request_body(client, session):
+    body = b'\n'.join([
+        b'{"id": 1, "name": "Order 1", "status": "New", "creation_date": "2024-06-01T10:00:00"}',
+        b'{"id": 2, "name": "Order 2", "status": "Completed"}',
+        b'',
+        b'{"id": 3, "name": "Order 3"}',
+        b'{"id": 4, "name": "' + b'x' * 51 + b'", "status": "New"}',
+        b'not json',
+        b'{"id": 1.9, "name": "Order 1.9", "status": "New"}',
+        b'{"id": true, "name": "Order true", "status": "New"}',
+        b'{"id": 5, "name": "Order 5", "status": "New", "creation_date": "2024-06-01T10:00:00+02:00"}'
+    ])
+    response = client.post('/api/orders/import/ndjson', data=body, content_type='application/x-ndjson')
+    assert response.status_code == 200
+    assert response.json == {"message": "Orders imported successfully", "inserted": 3, "updated": 0,
+                             "unchanged": 0, "rejected": 5}
+    assert session.get(Order, 1).creation_date == datetime(2024, 6, 1, 10)
+    assert session.get(Order, 5).creation_date == datetime(2024, 6, 1, 8)
+    assert client.get('/api/orders/statistics').json == {"New": 2, "Completed": 1}
+
+    response = client.get('/api/orders/export/ndjson')
+    assert response.mimetype == 'application/x-ndjson'
+    records = [json.loads(line) for line in response.data.splitlines()]
+    assert [(record['id'], record['name']) for record in records] == [(1, "Order 1"), (2, "Order 2"), (5, "Order 5")]
+    assert records[0]['creation_date'] == '2024-06-01T10:00:00'
+
+
+def test_import_hdf5_as_job(client, session, tmpdir):
+    file_path = str(tmpdir.join("orders.hdf5"))
+    with h5py.File(file_path, 'w') as f:
+        f.create_dataset('id', data=[1, 2])
+        f.create_dataset('name', data=[b'Order 1', b'Order 2'])
+        f.create_dataset('description', data=[b'', b''])
+        f.create_dataset('creation_date', data=[b'2024-06-01 12:00:00', b'2024-06-02 12:00:00'])
+        f.create_dataset('status', data=[b'New', b'Completed'])
+
+    with open(file_path, 'rb') as f:
+        response = client.post('/api/orders/import/hdf5?async=true', data={'file': (f, "orders.hdf5")})
+    assert response.status_code == 202
+
+    job = client.get(response.headers['Location']).json
+    assert job['status'] == 'completed'
+    assert job['result'] == {'inserted': 2, 'updated': 0, 'unchanged': 0, 'rejected': 0}
+    assert job['has_artifact'] is False
+    assert client.get(f"/api/jobs/{job['id']}/download").status_code == 409
+    assert client.get('/api/orders/statistics').json == {'New': 1, 'Completed': 1}
+
+
+def test_job_not_found(client, session):
+    assert client.get('/api/jobs/missing').status_code == 404
+    assert client.post('/api/jobs/missing/cancel').status_code == 404
+
+
+def test_abandoned_jobs_do_not_block_submissions(app, client, runner, session, tmpdir):
+    exited = subprocess.Popen([sys.executable, '-c', 'pass'])
+    exited.wait()
+    host = socket.gethostname()
+    artifact_path = str(tmpdir.join("orders.xml"))
+    open(artifact_path, 'w').close()
+    session.add_all([
+        Job(id='dead', kind='export_xml', status='running', progress=0, cancel_requested=False,
+            worker=f'{host}:{exited.pid}', heartbeat_at=datetime.utcnow()),
+        Job(id='expired', kind='export_xml', status='completed', progress=0, cancel_requested=False,
+            artifact_path=artifact_path, finished_at=datetime(2024, 6, 1))
+    ])
+    session.commit()
+    app.extensions['jobs'].max_pending = 1
+
+    response = client.get('/api/orders/export/xml?async=true')
+    assert response.status_code == 202
+    assert client.get('/api/jobs/dead').json['status'] == 'failed'
+
+    session.add(Job(id='alive', kind='export_xml', status='running', progress=0, cancel_requested=False,
+                    worker=f'{host}:{os.getpid()}', heartbeat_at=datetime.utcnow()))
+    session.commit()
+    assert client.get('/api/orders/export/xml?async=true').status_code == 429
+
+    result = runner.invoke(args=['orders', 'cleanup-jobs'])
+    assert 'Failed 0 abandoned jobs, deleted 1 expired artifacts.' in result.output
+    assert not os.path.exists(artifact_path)
+    assert client.get('/api/jobs/expired/download').status_code == 409
+
+
+def test_bulk_add_orders_ndjson(app, client, session):
+    app.config['BULK_CREATE_BATCH_SIZE'] = 2
+    body = "\n".join([
+        json.dumps({"name": "Order 1", "status": "New"}),
+        json.dumps({"name": "Order 2", "status": "Completed", "creation_date": "2024-06-01T12:00:00"}),
+        "",
+        "{not json",
+        json.dumps({"status": "New"}),
+        json.dumps({"name": "Order 3", "status": "New"}),
+        "[1, 2]"
+    ])
+
+    response = client.post('/api/orders/bulk', data=body, content_type='application/x-ndjson')
+    assert response.status_code == 201
+    assert response.json['created_count'] == 3
+    assert [error['line'] for error in response.json['errors']] == [4, 5, 7]
+    assert response.json['errors'][0]['errors'][0]['type'] == 'json_invalid'
+    assert response.json['errors'][1]['errors'][0]['loc'] == ['name']
+
+    orders = client.get('/api/orders').json
+    assert [order['id'] for order in orders] == response.json['created_ids']
+    assert [order['name'] for order in orders] == ["Order 1", "Order 2", "Order 3"]
+    assert client.get('/api/orders/statistics').json == {"New": 2, "Completed": 1}
+
+
+def test_bulk_add_orders_json_array(client, session):
+    response = client.post('/api/orders/bulk', data=json.dumps([
+        {"name": "Order 1", "status": "New"},
+        {"name": "Order 2"},
+        {"name": "x" * 51, "status": "New"}
+    ]), content_type='application/json')
+    assert response.status_code == 201
+    assert response.json['created_count'] == 1
+    assert [error['line'] for error in response.json['errors']] == [2, 3]
+    assert response.json['errors'][1]['errors'] == [
+        {"type": "string_too_long", "loc": ["name"], "msg": "String should have at most 50 characters"}
+    ]
+
+    response = client.post('/api/orders/bulk', data=json.dumps({"name": "Order"}), content_type='application/json')
+    assert response.status_code == 400
+
+
+def test_bulk_add_orders_reports_committed_batches_on_failure(app, client, session, monkeypatch):
+    app.config['BULK_CREATE_BATCH_SIZE'] = 2
+    add_orders = bulk_order_service.add_orders
+    calls = []
+
+    def fail_second_batch(db, orders):
+        calls.append(orders)
+        if len(calls) == 2:
+            raise RuntimeError('Database unavailable')
+        return add_orders(db, orders)
+
+    monkeypatch.setattr(bulk_order_service, 'add_orders', fail_second_batch)
+    response = client.post('/api/orders/bulk', data=json.dumps([
+        {"name": f"Order {i}", "status": "New"} for i in range(5)
+    ]), content_type='application/json')
+    assert response.status_code == 500
+    assert response.json['error'] == 'Database unavailable'
+    assert response.json['created_count'] == 2
+    assert [order['id'] for order in client.get('/api/orders').json] == response.json['created_ids']
+
+
+def test_get_orders_filtered(client, session):
+    client.post('/api/orders/bulk', data=json.dumps([
+        {"name": "Alpha 1", "status": "New", "creation_date": "2024-06-01T12:00:00"},
+        {"name": "Alpha 2", "status": "Completed", "creation_date": "2024-06-02T12:00:00"},
+        {"name": "Beta 1", "status": "New", "creation_date": "2024-06-03T12:00:00"},
+        {"name": "Alpha_3", "status": "New", "creation_date": "2024-06-04T12:00:00"},
+        {"name": "Alpha 4", "status": "In Progress", "creation_date": "2024-07-01T12:00:00"}
+    ]), content_type='application/json')
+
+    def names(query):
+        response = client.get(f'/api/orders?{query}')
+        assert response.status_code == 200
+        return [order['name'] for order in response.json]
+
+    assert names('status=New') == ["Alpha 1", "Beta 1", "Alpha_3"]
+    assert names('status=New,Completed&name_prefix=Alpha') == ["Alpha 1", "Alpha 2", "Alpha_3"]
+    assert names('name_prefix=Alpha_') == ["Alpha_3"]
+    assert names('date_from=2024-06-02&date_to=2024-07-01') == ["Alpha 2", "Beta 1", "Alpha_3"]
+    assert names('status=New&status=In Progress&sort=-creation_date') == ["Alpha 4", "Alpha_3", "Beta 1", "Alpha 1"]
+    assert client.get('/api/orders?sort=name').status_code == 400
+
+
+def test_get_orders_sorted_pagination(client, session):
+    client.post('/api/orders/bulk', data=json.dumps([
+        {"name": f"Order {i}", "status": "New", "creation_date": f"2024-06-0{day}T12:00:00"}
+        for i, day in enumerate([3, 1, 2, 1, 3])
+    ]), content_type='application/json')
+
+    names = []
+    url = '/api/orders?sort=creation_date&status=New&limit=2'
+    while url:
+        response = client.get(url)
+        names += [order['name'] for order in response.json]
+        url = response.headers.get('Link', '').partition('>')[0].lstrip('<')
+        assert 'status=New' in url or not url
+    assert names == ["Order 1", "Order 3", "Order 2", "Order 0", "Order 4"]
+
+    response = client.get('/api/orders?sort=-creation_date&stream=true')
+    assert [order['name'] for order in response.json] == ["Order 4", "Order 0", "Order 2", "Order 3", "Order 1"]
+
+
+def test_get_order_cached_with_etag(client, session):
+    order_id = client.post('/api/orders', data=json.dumps({"name": "Cached Order", "status": "New"}),
+                           content_type='application/json').json['id']
+
+    response = client.get(f'/api/orders/{order_id}')
+    etag = response.headers['ETag']
+    assert client.get(f'/api/orders/{order_id}').json['name'] == "Cached Order"
+    stats = client.get('/api/monitoring/cache').json
+    assert (stats['hits'], stats['misses'], stats['size']) == (1, 1, 1)
+
+    response = client.get(f'/api/orders/{order_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+    client.put('/api/orders/update', data=json.dumps({"order_ids": [order_id], "status": "Completed"}),
+               content_type='application/json')
+    response = client.get(f'/api/orders/{order_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json['status'] == "Completed"
+    assert response.headers['ETag'] != etag
+
+    client.delete(f'/api/orders/{order_id}')
+    assert client.get(f'/api/orders/{order_id}').status_code == 404
+
+
+def test_order_cache_eviction_and_expiry():
+    now = [0.0]
+    cache = OrderCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.set(1, {"id": 1}, cache.version)
+    cache.set(2, {"id": 2}, cache.version)
+    assert cache.get(1) == {"id": 1}
+    cache.set(3, {"id": 3}, cache.version)
+    assert cache.get(2) is None
+
+    version = cache.version
+    cache.invalidate([1])
+    cache.set(1, {"id": 1, "stale": True}, version)
+    assert cache.get(1) is None
+
+    now[0] = 11.0
+    assert cache.get(3) is None
+    assert cache.stats()['size'] == 0
+
+
+def test_order_cache_is_limited_under_several_workers(app):
+    app.extensions['order_cache'] = cache = OrderCache(maxsize=10, ttl=60)
+    limit_to_workers(app, 1)
+    assert (cache.maxsize, cache.ttl) == (10, 60)
+
+    app.config['ORDER_CACHE_PREFORK_TTL'] = 1
+    limit_to_workers(app, 4)
+    assert (cache.maxsize, cache.ttl) == (10, 1)
+
+    app.config['ORDER_CACHE_PREFORK_TTL'] = 0
+    limit_to_workers(app, 4)
+    assert cache.maxsize == 0
+
+
+def test_get_orders_fields_projection(client, session):
+    client.post('/api/orders/bulk', data=json.dumps([
+        {"name": f"Order {i}", "description": "Description", "status": "New",
+         "creation_date": f"2024-06-0{i + 1}T12:00:00"}
+        for i in range(3)
+    ]), content_type='application/json')
+
+    response = client.get('/api/orders?fields=status,creation_date&limit=2')
+    assert response.status_code == 200
+    assert response.json == [
+        {"status": "New", "creation_date": "2024-06-01T12:00:00"},
+        {"status": "New", "creation_date": "2024-06-02T12:00:00"}
+    ]
+    assert response.headers['X-Next-Cursor'] == '2'
+
+    response = client.get('/api/orders?fields=id,name&stream=true')
+    assert response.json == [{"id": i + 1, "name": f"Order {i}"} for i in range(3)]
+
+    response = client.get('/api/orders/1?fields=id,status')
+    assert response.json == {"id": 1, "status": "New"}
+    assert client.get('/api/orders/1').json['creation_date'] == "2024-06-01T12:00:00"
+
+    assert client.get('/api/orders?fields=id,price').status_code == 400
+    assert client.get('/api/orders/1?fields=price').status_code == 400
+
+
+def test_metrics_endpoint(client, session):
+    client.post('/api/orders', data=json.dumps({"name": "Order", "status": "New"}), content_type='application/json')
+    client.get('/api/orders')
+    client.get('/api/orders')
+    client.get('/api/orders/999')
+
+    response = client.get('/api/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    lines = response.get_data(as_text=True).splitlines()
+    assert 'http_request_duration_seconds_count{endpoint="/api/orders",method="GET",status="200"} 2' in lines
+    assert 'http_request_duration_seconds_count{endpoint="/api/orders/<int:id>",method="GET",status="404"} 1' in lines
+    assert 'http_request_db_statements_bucket{endpoint="/api/orders",method="GET",le="5"} 2' in lines
+    assert any(line.startswith('db_statements_total ') and float(line.split()[1]) >= 4 for line in lines)
+    assert '# TYPE db_pool_checkout_wait_seconds histogram' in lines
+
+
+def test_failed_statements_and_requests_are_recorded(app, client, session):
+    with app.app_context():
+        with database.engine.connect() as connection:
+            with pytest.raises(Exception):
+                connection.execute(text('SELECT * FROM missing_table'))
+            connection.execute(text('SELECT 1'))
+            assert connection.info[metrics.STATEMENT_START_TIMES] == []
+
+    @app.route('/api/fail')
+    def fail():
+        raise RuntimeError('Unhandled')
+
+    with pytest.raises(RuntimeError):
+        client.get('/api/fail')
+    lines = client.get('/api/metrics').get_data(as_text=True).splitlines()
+    assert 'http_request_duration_seconds_count{endpoint="/api/fail",method="GET",status="500"} 1' in lines
+
+
+def test_pool_checkouts_are_timed_after_the_pool_is_replaced(app):
+    histogram = app.extensions['metrics'].pool_checkout_wait
+
+    def checkouts():
+        return sum(series[len(histogram.buckets)] for series in histogram._series.values())
+
+    with app.app_context():
+        database.engine.connect().close()
+        before = checkouts()
+        database.dispose_engine_after_fork()
+        database.engine.connect().close()
+        assert checkouts() == before + 1
+
+
+def test_server_timing_header(app, client, session):
+    assert 'Server-Timing' not in client.get('/api/orders').headers
+
+    app.config['METRICS_SERVER_TIMING'] = True
+    timing = client.get('/api/orders').headers['Server-Timing']
+    assert [part.split(';')[0] for part in timing.split(', ')] == ['db', 'serialize', 'app', 'total']
+    assert re.search(r'db;dur=[0-9.]+;desc="[0-9]+ statements"', timing)
+
+
+def test_asgi_app_serves_orders_on_async_engine(app, tmpdir):
+    pytest.importorskip('aiosqlite')
+    database_url = f"sqlite:///{tmpdir}/orders.db"
+    sync_engine = get_engine(database_url)
+    Base.metadata.create_all(sync_engine)
+    database.init_app(app, sync_engine)
+    asgi_app = AsyncOrderApp(app, get_async_engine(database_url))
+
+    async def call(method, path, body=None, query_string=b'', headers=()):
+        messages = []
+        request_body = json.dumps(body).encode() if body is not None else b''
+
+        async def receive():
+            return {'type': 'http.request', 'body': request_body, 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query_string,
+                 'http_version': '1.1', 'headers': [(b'content-type', b'application/json'), *headers]}
+        await asgi_app(scope, receive, send)
+        response_body = b''.join(message.get('body', b'') for message in messages[1:])
+        return messages[0]['status'], dict(messages[0]['headers']), response_body
+
+    async def scenario():
+        # Concurrent requests share the event loop and the async engine's pool
+        created = await asyncio.gather(*[
+            call('POST', '/api/orders', {"name": f"Order {i}", "status": "New"}) for i in range(10)
+        ])
+        assert {status for status, _, _ in created} == {201}
+
+        status, headers, body = await call('GET', '/api/orders', query_string=b'limit=4&sort=-id')
+        assert status == 200
+        assert [order['id'] for order in json.loads(body)] == [10, 9, 8, 7]
+        assert headers[b'x-next-cursor'] == b'7'
+
+        status, headers, _ = await call('GET', '/api/orders/3')
+        assert status == 200
+        assert (await call('GET', '/api/orders/3', headers=[(b'if-none-match', headers[b'etag'])]))[0] == 304
+        status, _, body = await call('PUT', '/api/orders/3', {"name": "Edited", "status": "Completed"})
+        assert status == 200
+        assert json.loads((await call('GET', '/api/orders/3'))[2])['name'] == "Edited"
+        assert (await call('DELETE', '/api/orders/4'))[0] == 200
+        assert (await call('GET', '/api/orders/4'))[0] == 404
+
+        # Other endpoints are served by the Flask application
+        status, _, body = await call('GET', '/api/orders/statistics')
+        assert status == 200
+        assert json.loads(body) == {"New": 8, "Completed": 1}
+        await asgi_app.engine.dispose()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        sync_engine.dispose()
+
+
+def test_serve_command_recycles_workers():
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'flask', '--app', "src.app:create_app('testing')", 'serve', '--port', '0',
+         '--workers', '1', '--max-requests', '2'],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), stderr=subprocess.PIPE, text=True
+    )
+    try:
+        port = None
+        for line in process.stderr:
+            match = re.search(r'Listening on http://127\.0\.0\.1:(\d+)', line)
+            if match:
+                port = int(match.group(1))
+                break
+        statuses = [urlopen(f'http://127.0.0.1:{port}/api/monitoring/cache', timeout=10).status for _ in range(5)]
+        process.send_signal(signal.SIGTERM)
+        output = process.communicate(timeout=30)[1]
+    finally:
+        if process.poll() is None:
+            process.kill()
+
+    assert statuses == [200] * 5
+    assert process.returncode == 0
+    assert output.count('Recycling worker') == 2
+    assert len(re.findall(r'Worker \d+ started', output)) == 3
+
+
+def test_startup_does_not_load_format_backends():
+    report = measure_startup('testing', top=50)
+
+    assert report['loaded_backends'] == []
+    packages = {entry['package'] for entry in report['packages']}
+    assert packages.isdisjoint({'h5py', 'numpy', 'openpyxl', 'pandas'})
+    assert 'src' in packages
+    assert report['modules'][0]['module'] == 'src.app'
+    assert report['startup_seconds'] > 0 and report['max_rss_mib'] > 0
+
+
+def test_job_executor_shutdown_fails_unfinished_jobs(app, tmpdir, monkeypatch):
+    engine = get_engine(f"sqlite:///{tmpdir}/orders.db")
+    Base.metadata.create_all(engine)
+    database.init_app(app, engine)
+    app.config.update(JOB_EXECUTOR='thread', JOB_MAX_WORKERS=1)
+    app.extensions['jobs'] = executor = JobExecutor(app)
+    started, release = threading.Event(), threading.Event()
+
+    def wait_for_release(context):
+        started.set()
+        release.wait(5)
+        return {}
+
+    monkeypatch.setitem(JOB_KINDS, 'wait', wait_for_release)
+    with app.test_request_context():
+        job_ids = [submit_job('wait').id for _ in range(2)]
+    assert started.wait(5)
+
+    assert sorted(executor.shutdown(timeout=0.1)) == sorted(job_ids)
+    release.set()
+    with engine.connect() as connection:
+        rows = connection.execute(select(Job.status, Job.error).where(Job.id.in_(job_ids))).all()
+    assert rows == [('failed', 'The worker process exited before the job finished')] * 2